@@ -1,14 +1,52 @@
 import os
+import threading
 
 from external_api.data_sources import *
-from external_api.function_utils import MCP_FUNCTION_LIST_JSON_FILE, ToolResult, load_function_proxys
+from external_api.function_list import MCP_FUNCTION_LIST_JSON_FILE, index_function_list, load_function_list
 
-proxies = {}
-_, proxies = load_function_proxys(os.path.join(os.path.dirname(__file__), MCP_FUNCTION_LIST_JSON_FILE))
-globals().update(proxies)
+# FunctionProxy 在首次访问时才创建，导入本包时不解析函数列表，也不导入 aiohttp / pydantic
+_function_list_path = os.path.join(os.path.dirname(__file__), MCP_FUNCTION_LIST_JSON_FILE)
+_function_infos = None
+_lock = threading.RLock()
+
+
+def _get_function_infos():
+    global _function_infos
+    if _function_infos is None:
+        with _lock:
+            if _function_infos is None:
+                _function_infos = index_function_list(load_function_list(_function_list_path))
+    return _function_infos
+
+
+def _get_proxy(name):
+    from external_api.function_utils import FunctionProxy
+
+    with _lock:
+        proxy = globals().get(name)
+        if proxy is None:
+            proxy = globals()[name] = FunctionProxy(_get_function_infos()[name])
+    return proxy
+
+
+def __getattr__(name):
+    if name in ("ToolResult", "load_function_proxys"):
+        from external_api import function_utils
+
+        return getattr(function_utils, name)
+    if name == "__all__":
+        return ["ToolResult"] + list(_get_function_infos())
+    if name == "proxies":
+        return {function_name: _get_proxy(function_name) for function_name in _get_function_infos()}
+    if not name.startswith("__") and name in _get_function_infos():
+        return _get_proxy(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | {"ToolResult", "load_function_proxys", "proxies"} | set(_get_function_infos()))
 
-__all__ = ["ToolResult"] + list(proxies.keys())
 
 if __name__ == "__main__":
-    print(__all__)
+    print(__getattr__("__all__"))
     print(globals())
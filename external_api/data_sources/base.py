@@ -4,19 +4,25 @@
 类的继承关系:
 BaseApi (基类)
 """
-import inspect
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 import os
 
+from .cache import ResponseCache
+from .catalog import EXCLUDE_METHODS, get_class_capabilities
+from .resolution_index import ResolutionIndex, get_default_resolution_index
+from .transport import HttpTransport, get_default_transport
 
-EXCLUDE_METHODS = ['get_capabilities', 'get_api_info', 'source_name', 'get_source_info']
 
 class BaseAPI(ABC):
     """
     数据源基类
     所有数据源都需要继承此类并实现相关方法
     """
+    _transport: Optional[HttpTransport] = None
+    _cache: Optional[ResponseCache] = None
+    _resolution_index: Optional[ResolutionIndex] = None
+
     @abstractmethod
     def __init__(self, config: Dict[str, Any]):
         """
@@ -47,39 +53,73 @@ class BaseAPI(ABC):
         """
         pass
 
+    @property
+    def transport(self) -> HttpTransport:
+        """
+        共享的 HTTP 传输层，未绑定时使用全局默认实例
+
+        Returns:
+            HttpTransport: 传输层实例
+        """
+        if self._transport is None:
+            self._transport = get_default_transport()
+        return self._transport
+
+    def bind_transport(self, transport: HttpTransport) -> None:
+        """
+        绑定 HTTP 传输层，由 ApiClient 在加载数据源时调用
+
+        Args:
+            transport: 传输层实例
+        """
+        self._transport = transport
+
+    @property
+    def cache(self) -> Optional[ResponseCache]:
+        """
+        响应缓存，未绑定时为 None（不缓存）
+
+        Returns:
+            Optional[ResponseCache]: 缓存实例
+        """
+        return self._cache
+
+    def bind_cache(self, cache: Optional[ResponseCache]) -> None:
+        """
+        绑定响应缓存，由 ApiClient 在加载数据源时调用
+
+        Args:
+            cache: 缓存实例，None 表示关闭缓存
+        """
+        self._cache = cache
+
+    @property
+    def resolution_index(self) -> ResolutionIndex:
+        """
+        地名 -> ID 的持久化解析索引，未绑定时使用全局默认实例
+
+        Returns:
+            ResolutionIndex: 解析索引实例
+        """
+        if self._resolution_index is None:
+            self._resolution_index = get_default_resolution_index()
+        return self._resolution_index
+
+    def bind_resolution_index(self, index: ResolutionIndex) -> None:
+        """
+        绑定解析索引，由 ApiClient 在加载数据源时调用
+
+        Args:
+            index: 解析索引实例
+        """
+        self._resolution_index = index
+
     def get_capabilities(self) -> List[Dict[str, Any]]:
         """
         获取数据源所有能力的描述
-        通过扫描实例方法及其文档字符串自动获取能力描述
+        能力目录按类只构建一次（见 catalog.py），这里返回副本
 
         Returns:
             List[Dict[str, Any]]: 数据源提供的所有方法的描述列表
         """
-        # 获取所有公开方法（不包括内置方法和私有方法）
-        capabilities = []
-        for attr_name in dir(self):
-            if not attr_name.startswith('_'):  # 排除私有方法
-                attr = getattr(self, attr_name)
-                if callable(attr) and attr_name not in EXCLUDE_METHODS:
-                    # 获取方法的文档字符串
-                    doc = inspect.getdoc(attr)
-                    if not doc:  # 跳过没有文档的方法
-                        continue
-                    if 'raise NotImplementedError' in inspect.getsource(attr):  # 跳过未实现的方法
-                        continue
-                    # 获取方法的签名
-                    sig = inspect.signature(attr)
-                    # 构建能力描述
-                    capability = {
-                        "name": attr_name,
-                        "description": doc.split('\n\n')[0] if doc else "",  # 取第一段作为简短描述
-                        "parameters": {
-                            name: str(param.annotation).replace('typing.', '')
-                            for name, param in sig.parameters.items()
-                            if name != 'self'
-                        },
-                        "return_type": str(sig.return_annotation).replace('typing.', ''),
-                        "doc": doc  # 完整的文档字符串
-                    }
-                    capabilities.append(capability)
-        return capabilities
\ No newline at end of file
+        return get_class_capabilities(type(self))
\ No newline at end of file
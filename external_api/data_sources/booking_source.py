@@ -5,14 +5,124 @@ Booking.com flight search data source implementation
 import asyncio
 import logging
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import aiohttp
 
 from .base import BaseAPI
+from .cache import cached
+from .extractors import Field, compile_record, each_value
+from .records import Hotel, HotelLocation, HotelPrice
+from .singleflight import single_flight
 
 logger = logging.getLogger("booking_source")
 
+DEFAULT_BATCH_CONCURRENCY = 8
+# 解析索引中目的地名称 -> 目的地信息的命名空间
+RESOLUTION_NAMESPACE = "booking.destination"
+# search_hotels_batch 中每个查询可用的参数
+BATCH_QUERY_FIELDS = (
+    "dest_name",
+    "arrival_date",
+    "departure_date",
+    "adults",
+    "children_age",
+    "room_qty",
+    "page_number",
+    "pages",
+    "price_min",
+    "price_max",
+    "languagecode",
+    "currency_code",
+    "sort_by",
+    "categories_filter",
+)
+
+
+def _non_empty_texts(key: str):
+    """用于 convert: 取列表中每一项的 key 字段，丢弃空字符串"""
+
+    def convert(items: Optional[List[Dict[str, Any]]]) -> List[str]:
+        return [text for text in (item.get(key, "") for item in items or ()) if text]
+
+    return convert
+
+
+def _room_photos(photos: Optional[List[Dict[str, Any]]]) -> List[str]:
+    """房间照片地址，优先 1280 尺寸，没有时使用原图"""
+    return [url for url in (photo.get("url_max1280", "") or photo.get("url_original", "") for photo in photos or ()) if url]
+
+
+def _children_and_beds_text(values: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    children_and_beds_text: Dict[str, Any] = {}
+    for key, value in (values or {}).items():
+        if isinstance(value, list):
+            children_and_beds_text[key] = [item.get("text", "") for item in value if len(item.get("text", "")) > 0]
+        elif isinstance(value, int):
+            children_and_beds_text[key] = value
+    return children_and_beds_text
+
+
+_extract_bed_type = compile_record({"name_with_count": Field("name_with_count", ""), "description": Field("description", "")})
+
+
+def _bed_configurations(configurations: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    return [_extract_bed_type(bed_type) for config in configurations or () for bed_type in config.get("bed_types", [])]
+
+
+def _district(data: Dict[str, Any]) -> Any:
+    """地址所在区，与城市名相同时为空"""
+    district = data.get("district", "")
+    return district if district != data.get("city", "") else ""
+
+
+_extract_room = compile_record(
+    {
+        "photos": Field("photos", convert=_room_photos),
+        "children_and_beds_text": Field("children_and_beds_text", convert=_children_and_beds_text),
+        "description": Field("description", ""),
+        "bed_configurations": Field("bed_configurations", convert=_bed_configurations),
+    },
+    name="extract_room",
+)
+
+# 酒店详情
+_extract_hotel_detail = compile_record(
+    {
+        "hotel_id": Field("hotel_id", ""),  # 酒店 id
+        "hotel_name": Field("hotel_name", ""),  # 酒店名称
+        "url": Field("url", ""),  # 酒店url
+        "review_nr": Field("review_nr", ""),  # 评论数量
+        "rating": Field("raw_data.reviewScore", ""),  # 综合评分
+        "arrival_date": Field("arrival_date", ""),  # 入住日期
+        "departure_date": Field("departure_date", ""),  # 离开日期
+        "latitude": Field("latitude", ""),  # 经度
+        "longitude": Field("longitude", ""),  # 纬度
+        "address": Field("address", ""),  # 地址
+        "city": Field("city", ""),  # 城市名
+        "district": _district,  # 地址所在区
+        "countrycode": Field("countrycode", ""),  # 国家代码
+        "country_trans": Field("country_trans", ""),  # 国家名
+        "currency_code": Field("currency_code", ""),  # 货币代码
+        "zip": Field("zip", ""),  # 邮政编码
+        "timezone": Field("timezone", ""),  # 时区
+        "soldout": Field("soldout", ""),  # 是否售罄
+        "available_rooms": Field("available_rooms", ""),  # 可用房间数
+        "max_rooms_in_reservation": Field("max_rooms_in_reservation", ""),  # 最大预订房间数
+        "average_room_size_for_ufi_m2": Field("average_room_size_for_ufi_m2", ""),  # 平均房间大小
+        "is_family_friendly": Field("is_family_friendly", ""),  # 是否家庭友好
+        "is_closed": Field("is_closed", ""),  # 是否关门
+        "is_cash_accepted_check_enabled": Field("is_cash_accepted_check_enabled", ""),  # 是否接受现金
+        "hotel_include_breakfast": Field("hotel_include_breakfast", ""),  # 是否包含早餐
+        "family_facilities": Field("family_facilities", ""),  # 家庭设施
+        "facilities": Field("facilities_block.facilities", convert=_non_empty_texts("name")),
+        "spoken_languages": Field("spoken_languages", []),  # 可用语言
+        "hotel_important_information": Field("hotel_important_information_with_codes", convert=_non_empty_texts("phrase")),
+        "rooms": Field("rooms", convert=each_value(_extract_room)),
+    },
+    name="extract_hotel_detail",
+)
+
 
 class BookingSource(BaseAPI):
     """Booking.com data source"""
@@ -160,11 +270,7 @@ class BookingSource(BaseAPI):
 
             # Send request
             try:
-                async with aiohttp.ClientSession(trust_env=True) as session:
-                    async with session.get(request_url, headers=self.headers, params=params, timeout=self._timeout) as response:
-                        # Check response status
-                        response.raise_for_status()
-                        data = await response.json()
+                data = await self.transport.request_json("GET", request_url, headers=self.headers, params=params, timeout=self._timeout)
 
             except asyncio.TimeoutError:
                 error_msg = f"Request timeout (timeout={self._timeout}s)"
@@ -233,6 +339,10 @@ class BookingSource(BaseAPI):
             logger.exception(e)
             return {"success": False, "error": error_msg}
 
+    # 响应缓存默认关闭（或被 cache_ttls 设为 0）时由 single_flight 合并并发的相同调用；开启缓存后由缓存合并，
+    # single_flight 只会看到发起调用的那一次
+    @cached(ttl=24 * 3600)
+    @single_flight()
     async def _search_hotel_destinations(self, query: str) -> Dict[str, Any]:
         """
         Search for hotel destinations
@@ -280,11 +390,7 @@ class BookingSource(BaseAPI):
 
             # 发送请求
             try:
-                async with aiohttp.ClientSession(trust_env=True) as session:
-                    async with session.get(request_url, headers=self.headers, params=params, timeout=self._timeout) as response:
-                        # 检查响应状态
-                        response.raise_for_status()
-                        data = await response.json()
+                data = await self.transport.request_json("GET", request_url, headers=self.headers, params=params, timeout=self._timeout)
 
             except asyncio.TimeoutError:
                 error_msg = f"Request timeout (timeout={self._timeout}s)"
@@ -341,6 +447,7 @@ class BookingSource(BaseAPI):
         currency_code: str = "USD",
         sort_by: str = "bayesian_review_score",
         categories_filter: Optional[str] = None,
+        raw_records: bool = False,
     ) -> Dict[str, Any]:
         """
         Search for hotels
@@ -372,6 +479,7 @@ class BookingSource(BaseAPI):
                 - class::3: Three stars
                 - class::4: Four stars
                 - class::5: Five stars
+            raw_records(bool): Return hotels as compact Hotel records instead of dicts, default is False
 
         Returns:
             Dict[str, Any]: Dictionary containing hotel search results, e.g.
@@ -449,11 +557,7 @@ class BookingSource(BaseAPI):
 
             # 发送请求
             try:
-                async with aiohttp.ClientSession(trust_env=True) as session:
-                    async with session.get(request_url, headers=self.headers, params=params, timeout=self._timeout) as response:
-                        # 检查响应状态
-                        response.raise_for_status()
-                        data = await response.json()
+                data = await self.transport.request_json("GET", request_url, headers=self.headers, params=params, timeout=self._timeout)
 
             except asyncio.TimeoutError:
                 error_msg = f"Request timeout (timeout={self._timeout}s)"
@@ -473,14 +577,30 @@ class BookingSource(BaseAPI):
             # 简化响应数据结构
             # 计算平均价格
 
+            hotels = data["data"]["hotels"]
+            # 入住晚数对所有酒店相同，只解析一次日期
+            nights = (datetime.strptime(departure_date, "%Y-%m-%d") - datetime.strptime(arrival_date, "%Y-%m-%d")).days if hotels else 0
             simplified_hotels = []
-            for hotel in data["data"]["hotels"]:
+            for hotel in hotels:
                 property_info = hotel["property"]
-                avg_price = round(
-                    property_info["priceBreakdown"]["grossPrice"]["value"]
-                    / (datetime.strptime(departure_date, "%Y-%m-%d") - datetime.strptime(arrival_date, "%Y-%m-%d")).days,
-                    2,
-                )
+                avg_price = round(property_info["priceBreakdown"]["grossPrice"]["value"] / nights, 2)
+                if raw_records:
+                    simplified_hotels.append(
+                        Hotel(
+                            hotel["hotel_id"],
+                            property_info["name"],
+                            property_info.get("accuratePropertyClass") or property_info.get("propertyClass"),
+                            property_info.get("reviewScore"),
+                            property_info.get("reviewCount"),
+                            HotelLocation(property_info["latitude"], property_info["longitude"]),
+                            HotelPrice(
+                                property_info["priceBreakdown"]["grossPrice"]["currency"],
+                                property_info["priceBreakdown"]["grossPrice"]["value"],
+                                avg_price,
+                            ),
+                        )
+                    )
+                    continue
                 simplified_hotels.append(
                     {
                         "hotel_id": hotel["hotel_id"],
@@ -520,6 +640,7 @@ class BookingSource(BaseAPI):
         currency_code: str = "USD",
         sort_by: str = "bayesian_review_score",
         categories_filter: Optional[str] = None,
+        raw_records: bool = False,
     ) -> Dict[str, Any]:
         """
         Search for hotels by destination name
@@ -547,6 +668,8 @@ class BookingSource(BaseAPI):
             categories_filter(Optional[str]): Star rating filter, options:
                 - class::1: One star, ..., class::5: Five stars
                 - Multiple selection allowed, comma separated, e.g.: class::1,class::2
+            raw_records(bool): Return hotels as compact Hotel records (read-only mappings, to_dict() gives the dict below)
+                instead of dicts, to save memory when accumulating many hotels, default is False
 
         Returns:
             Dict[str, Any]: Dictionary containing hotel search results, e.g.
@@ -595,16 +718,12 @@ class BookingSource(BaseAPI):
         #     ...     print(f"Search successful")
         # """
         try:
-            # 先搜索目的地信息
-            dest_result = await self._search_hotel_destinations(dest_name)
+            # 先解析目的地信息
+            dest_result = await self._resolve_destination(dest_name)
             if not dest_result["success"]:
                 return dest_result
 
-            if not dest_result["data"]["destinations"]:
-                return {"success": False, "error": f"No matching destination found: {dest_name}"}
-
-            # 使用第一个匹配的目的地
-            destination = dest_result["data"]["destinations"][0]
+            destination = dest_result["data"]
             dest_id = destination["dest_id"]
             search_type = destination["search_type"].upper()
 
@@ -624,6 +743,7 @@ class BookingSource(BaseAPI):
                 currency_code=currency_code,
                 sort_by=sort_by,
                 categories_filter=categories_filter,
+                raw_records=raw_records,
             )
 
             if not hotels_result["success"]:
@@ -648,6 +768,147 @@ class BookingSource(BaseAPI):
             logger.exception(e)
             return {"success": False, "error": error_msg}
 
+    async def search_hotels_batch(
+        self, queries: List[Dict[str, Any]], max_concurrency: int = DEFAULT_BATCH_CONCURRENCY, raw_records: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Search hotels for many destinations and/or result pages at once
+
+        Destinations are resolved concurrently (resolutions are cached persistently, so repeated destinations
+        cost no request) and hotel pages are fetched with bounded concurrency. A 30-city price sweep takes a few
+        round trips instead of 60 sequential requests.
+
+        Args:
+            queries(List[Dict[str, Any]]): Queries, each accepting the parameters of search_hotels_by_dest_name
+                (dest_name, arrival_date and departure_date are required) plus:
+                - pages(int): Number of result pages to fetch starting at page_number, default is 1
+            max_concurrency(int): Maximum number of requests in flight at the same time, default is 8
+            raw_records(bool): Return hotels as compact Hotel records instead of dicts, see search_hotels_by_dest_name, default is False
+
+        Returns:
+            Dict[str, Any]: Dictionary containing one result per query, in input order, e.g.
+            {
+                "success": True,
+                "data": {
+                    "count": 2,                    # Number of successful queries
+                    "results": [
+                        {
+                            "success": True,
+                            "data": {
+                                "destination": {"name": "Shanghai", "dest_id": "-1924465", "search_type": "city"},
+                                "hotels": [...],   # Hotels of all requested pages, same format as search_hotels_by_dest_name
+                                "failed_pages": [] # Pages that failed, with error messages
+                            }
+                        },
+                        {"success": False, "error": "No matching destination found: atlantis"}
+                    ]
+                }
+            }
+        """
+
+        # Example:
+        #     >>> from external_api.data_sources.client import get_client
+        #     >>> client = get_client()
+        #     >>> result = await client.booking.search_hotels_batch([
+        #     ...     {"dest_name": "shanghai", "arrival_date": "2025-04-19", "departure_date": "2025-04-20"},
+        #     ...     {"dest_name": "tokyo", "arrival_date": "2025-04-19", "departure_date": "2025-04-20", "pages": 2},
+        #     ... ])
+        #     >>> for query_result in result["data"]["results"]:
+        #     ...     print(query_result["success"])
+        # """
+        try:
+            semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+            async def fetch_page(destination: Dict[str, Any], page_number: int, params: Dict[str, Any]) -> Dict[str, Any]:
+                async with semaphore:
+                    return await self._search_hotels_by_destid(
+                        dest_id=destination["dest_id"],
+                        search_type=destination["search_type"].upper(),
+                        page_number=page_number,
+                        raw_records=raw_records,
+                        **params,
+                    )
+
+            async def run(query: Dict[str, Any]) -> Dict[str, Any]:
+                unknown = set(query) - set(BATCH_QUERY_FIELDS)
+                if unknown:
+                    return {"success": False, "error": f"Unknown query fields: {', '.join(sorted(unknown))}"}
+                missing = [field for field in ("dest_name", "arrival_date", "departure_date") if not query.get(field)]
+                if missing:
+                    return {"success": False, "error": f"Missing query fields: {', '.join(missing)}"}
+
+                async with semaphore:
+                    dest_result = await self._resolve_destination(query["dest_name"])
+                if not dest_result["success"]:
+                    return dest_result
+                destination = dest_result["data"]
+
+                params = {key: value for key, value in query.items() if key not in ("dest_name", "page_number", "pages")}
+                first_page = query.get("page_number", 1)
+                page_numbers = list(range(first_page, first_page + max(1, query.get("pages", 1))))
+                page_results = await asyncio.gather(*(fetch_page(destination, page_number, params) for page_number in page_numbers))
+
+                # 按页码顺序合并，跨页重复的酒店只保留第一次出现
+                hotels = []
+                seen_hotels = set()
+                failed_pages = []
+                for page_number, page_result in zip(page_numbers, page_results):
+                    if not page_result["success"]:
+                        failed_pages.append({"page_number": page_number, "error": page_result["error"]})
+                        continue
+                    for hotel in page_result["data"]["hotels"]:
+                        if hotel["hotel_id"] not in seen_hotels:
+                            seen_hotels.add(hotel["hotel_id"])
+                            hotels.append(hotel)
+                if len(failed_pages) == len(page_numbers):
+                    return {"success": False, "error": failed_pages[0]["error"]}
+
+                return {"success": True, "data": {"destination": destination, "hotels": hotels, "failed_pages": failed_pages}}
+
+            async def run_safely(query: Dict[str, Any]) -> Dict[str, Any]:
+                try:
+                    return await run(query)
+                except Exception as e:
+                    logger.error(f"Error occurred while searching hotels for {query.get('dest_name')}: {str(e)}")
+                    logger.exception(e)
+                    return {"success": False, "error": str(e)}
+
+            results = await asyncio.gather(*(run_safely(query) for query in queries))
+            return {"success": True, "data": {"count": sum(1 for result in results if result["success"]), "results": results}}
+
+        except Exception as e:
+            error_msg = f"Error occurred while batch searching hotels: {str(e)}"
+            logger.error(error_msg)
+            logger.exception(e)
+            return {"success": False, "error": error_msg}
+
+    async def _resolve_destination(self, dest_name: str) -> Dict[str, Any]:
+        """
+        把目的地名称解析为第一个匹配的目的地（name、dest_id、search_type），结果保存在解析索引中，已知地点不再请求
+
+        Args:
+            dest_name: 目的地名称
+
+        Returns:
+            Dict[str, Any]: 成功时 data 为目的地信息
+        """
+        destination = self.resolution_index.get(RESOLUTION_NAMESPACE, dest_name)
+        if destination is not None:
+            return {"success": True, "data": destination}
+
+        dest_result = await self._search_hotel_destinations(dest_name)
+        if not dest_result["success"]:
+            return dest_result
+        if not dest_result["data"]["destinations"]:
+            return {"success": False, "error": f"No matching destination found: {dest_name}"}
+
+        # 使用第一个匹配的目的地
+        first = dest_result["data"]["destinations"][0]
+        destination = {"name": first["name"], "dest_id": first["dest_id"], "search_type": first["search_type"]}
+        self.resolution_index.set(RESOLUTION_NAMESPACE, dest_name, destination)
+        return {"success": True, "data": destination}
+
+    @cached(ttl=300)
     async def search_hotel_details(
         self,
         hotel_id: str,
@@ -767,11 +1028,7 @@ class BookingSource(BaseAPI):
             request_url = f"{self.proxy_url}/api/v1/hotels/getHotelDetails"
 
             try:
-                async with aiohttp.ClientSession(trust_env=True) as session:
-                    async with session.get(request_url, headers=self.headers, params=params, timeout=self._timeout) as response:
-                        # 检查响应状态
-                        response.raise_for_status()
-                        data = await response.json()
+                data = await self.transport.request_json("GET", request_url, headers=self.headers, params=params, timeout=self._timeout)
 
             except asyncio.TimeoutError:
                 error_msg = f"Request timeout (timeout={self._timeout}s)"
@@ -798,90 +1055,7 @@ class BookingSource(BaseAPI):
 
     def _parse_hotel_detail(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """解析酒店详情"""
-        facilities = []
-        for facility in data.get("facilities_block", {}).get("facilities", []):
-            facility_name = facility.get("name", "")
-            if len(facility_name) > 0:
-                facilities.append(facility_name)
-
-        hotel_important_information = []
-        for item in data.get("hotel_important_information_with_codes", []):
-            info = item.get("phrase", "")
-            if len(info) > 0:
-                hotel_important_information.append(info)
-
-        rooms = {}
-        for roomId, roomInfo in data.get("rooms", {}).items():
-            room = {}
-            photos_data = roomInfo.get("photos", [])
-            photos = []
-            for photo in photos_data:
-                url = photo.get("url_max1280", "")
-                if len(url) == 0:
-                    url = photo.get("url_original", "")
-                if len(url) > 0:
-                    photos.append(url)
-
-            children_and_beds_text = {}
-            for key, value in roomInfo.get("children_and_beds_text", {}).items():
-                if isinstance(value, list):
-                    children_and_beds_text[key] = []
-                    for item in value:
-                        if len(item.get("text", "")) > 0:
-                            children_and_beds_text[key].append(item.get("text", ""))
-                elif isinstance(value, int):
-                    children_and_beds_text[key] = value
-
-            description = roomInfo.get("description", "")
-
-            bed_configurations = []
-            for bed_config in roomInfo.get("bed_configurations", []):
-                for bed_type in bed_config.get("bed_types", []):
-                    bed_name_cnt = bed_type.get("name_with_count", "")
-                    bed_desc = bed_type.get("description", "")
-                    bed_configurations.append({"name_with_count": bed_name_cnt, "description": bed_desc})
-
-            room = {
-                "photos": photos,
-                "children_and_beds_text": children_and_beds_text,
-                "description": description,
-                "bed_configurations": bed_configurations,
-            }
-            rooms[roomId] = room
-
-        hotel_detail = {
-            "hotel_id": data.get("hotel_id", ""),  # 酒店 id
-            "hotel_name": data.get("hotel_name", ""),  # 酒店名称
-            "url": data.get("url", ""),  # 酒店url
-            "review_nr": data.get("review_nr", ""),  # 评论数量
-            "rating": data.get("raw_data", {}).get("reviewScore", ""),  # 综合评分
-            "arrival_date": data.get("arrival_date", ""),  # 入住日期
-            "departure_date": data.get("departure_date", ""),  # 离开日期
-            "latitude": data.get("latitude", ""),  # 经度
-            "longitude": data.get("longitude", ""),  # 纬度
-            "address": data.get("address", ""),  # 地址
-            "city": data.get("city", ""),  # 城市名
-            "district": data.get("district", "") if data.get("district", "") != data.get("city", "") else "",  # 地址所在区
-            "countrycode": data.get("countrycode", ""),  # 国家代码
-            "country_trans": data.get("country_trans", ""),  # 国家名
-            "currency_code": data.get("currency_code", ""),  # 货币代码
-            "zip": data.get("zip", ""),  # 邮政编码
-            "timezone": data.get("timezone", ""),  # 时区
-            "soldout": data.get("soldout", ""),  # 是否售罄
-            "available_rooms": data.get("available_rooms", ""),  # 可用房间数
-            "max_rooms_in_reservation": data.get("max_rooms_in_reservation", ""),  # 最大预订房间数
-            "average_room_size_for_ufi_m2": data.get("average_room_size_for_ufi_m2", ""),  # 平均房间大小
-            "is_family_friendly": data.get("is_family_friendly", ""),  # 是否家庭友好
-            "is_closed": data.get("is_closed", ""),  # 是否关门
-            "is_cash_accepted_check_enabled": data.get("is_cash_accepted_check_enabled", ""),  # 是否接受现金
-            "hotel_include_breakfast": data.get("hotel_include_breakfast", ""),  # 是否包含早餐
-            "family_facilities": data.get("family_facilities", ""),  # 家庭设施
-            "facilities": facilities,
-            "spoken_languages": data.get("spoken_languages", []),  # 可用语言
-            "hotel_important_information": hotel_important_information,
-            "rooms": rooms,
-        }
-        return {"success": True, "data": hotel_detail}
+        return {"success": True, "data": _extract_hotel_detail(data)}
 
     def _format_duration(self, seconds: int) -> str:
         """Convert seconds to hours and minutes format"""
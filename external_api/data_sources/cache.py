@@ -0,0 +1,318 @@
+"""
+数据源响应缓存
+
+- cached 装饰器为每个能力方法单独配置 TTL
+- 相同参数的并发调用合并为一次上游请求
+- 后端可插拔: 内存 LRU (MemoryCacheBackend) 与 SQLite (SqliteCacheBackend)，后者在进程重启后仍然有效
+- 命中/未命中计数通过 ResponseCache.stats() 暴露
+"""
+
+import copy
+import functools
+import inspect
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .singleflight import SingleFlight, make_call_key
+
+logger = logging.getLogger("data_sources_cache")
+
+# 缓存未命中标记
+MISSING = object()
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "external_api", "responses.sqlite3")
+
+
+class CacheBackend(ABC):
+    """缓存后端基类"""
+
+    @abstractmethod
+    def get(self, key: str) -> Any:
+        """
+        读取缓存
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            Any: 缓存值，不存在或已过期时返回 MISSING
+        """
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+            ttl: 过期时间（秒）
+        """
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """删除缓存"""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """清空缓存"""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    进程内 LRU 缓存
+
+    写入和读取时都会深拷贝，调用方修改返回结果不会影响缓存内容
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return MISSING
+            expires_at, value = item
+            if expires_at <= time.time():
+                del self._data[key]
+                return MISSING
+            self._data.move_to_end(key)
+        return copy.deepcopy(value)
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._data[key] = (time.time() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SqliteCacheBackend(CacheBackend):
+    """
+    基于 SQLite 的持久化缓存，值以 JSON 存储
+
+    按最近访问时间做 LRU 淘汰，无法 JSON 序列化的值不会被缓存
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)")
+
+    def get(self, key: str) -> Any:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return MISSING
+            if row[1] <= now:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return MISSING
+            self._conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        try:
+            payload = json.dumps(value, ensure_ascii=False)
+        except (TypeError, ValueError):
+            logger.debug(f"Skip caching non JSON serializable value: {key}")
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, payload, now + ttl, now),
+            )
+            self._conn.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+def _is_success(result: Any) -> bool:
+    """只缓存成功的结果"""
+    return isinstance(result, dict) and bool(result.get("success"))
+
+
+class ResponseCache:
+    """
+    数据源响应缓存
+
+    在后端之上提供 TTL、并发请求合并和命中统计
+    """
+
+    def __init__(self, backend: CacheBackend, ttl_overrides: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            backend: 缓存后端
+            ttl_overrides: 按 "source.method" 覆盖装饰器中的 TTL，0 表示不缓存
+        """
+        self.backend = backend
+        self.ttl_overrides = dict(ttl_overrides or {})
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._stats_lock = threading.Lock()
+        self._flight = SingleFlight()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["ResponseCache"]:
+        """
+        根据 client.config 创建缓存
+
+        Returns:
+            Optional[ResponseCache]: cache_backend 为 "none"（默认）时返回 None
+        """
+        backend_name = config.get("cache_backend", "none")
+        max_entries = config.get("cache_max_entries", DEFAULT_MAX_ENTRIES)
+        if backend_name == "none":
+            return None
+        if backend_name == "memory":
+            backend: CacheBackend = MemoryCacheBackend(max_entries=max_entries)
+        elif backend_name == "sqlite":
+            backend = SqliteCacheBackend(config.get("cache_path") or DEFAULT_CACHE_PATH, max_entries=max_entries)
+        else:
+            raise ValueError(f"Unknown cache backend: {backend_name}")
+        return cls(backend, ttl_overrides=config.get("cache_ttls"))
+
+    def _count(self, name: str, field: str) -> None:
+        with self._stats_lock:
+            method_stats = self._stats.setdefault(name, {"hits": 0, "misses": 0, "coalesced": 0})
+            method_stats[field] += 1
+
+    async def get_or_call(
+        self,
+        name: str,
+        key: str,
+        ttl: float,
+        call: Callable[[], Awaitable[Any]],
+        cache_if: Callable[[Any], bool] = _is_success,
+    ) -> Any:
+        """
+        读取缓存，未命中时调用 call 并写入缓存；相同 key 的并发调用共享一次 call
+
+        Args:
+            name: 统计名称，格式 "source.method"
+            key: 缓存键
+            ttl: 默认过期时间（秒）
+            call: 未命中时执行的协程工厂
+            cache_if: 判断结果是否可缓存
+
+        Returns:
+            Any: 缓存或新获取的结果
+        """
+        ttl = self.ttl_overrides.get(name, ttl)
+        if ttl <= 0:
+            return await call()
+
+        value = self.backend.get(key)
+        if value is not MISSING:
+            self._count(name, "hits")
+            return value
+
+        async def load() -> Any:
+            result = await call()
+            if cache_if(result):
+                try:
+                    self.backend.set(key, result, ttl)
+                except Exception as e:
+                    logger.warning(f"Failed to write cache entry {name}: {e}")
+            return result
+
+        # 与命中时一样，共享结果的调用方各自拿到深拷贝（由 SingleFlight 保证），修改结果不会互相影响
+        result, shared = await self._flight.do(key, load)
+        self._count(name, "coalesced" if shared else "misses")
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计
+
+        Returns:
+            Dict[str, Any]: 总命中/未命中/合并次数、当前条目数以及按方法的明细
+        """
+        with self._stats_lock:
+            methods = {name: dict(counts) for name, counts in self._stats.items()}
+        totals = {field: sum(counts[field] for counts in methods.values()) for field in ("hits", "misses", "coalesced")}
+        return {**totals, "size": len(self.backend), "methods": methods}
+
+    def clear(self) -> None:
+        """清空缓存和统计"""
+        self.backend.clear()
+        with self._stats_lock:
+            self._stats.clear()
+
+
+def cached(ttl: float, cache_if: Callable[[Any], bool] = _is_success):
+    """
+    为数据源的异步能力方法添加响应缓存
+
+    缓存实例来自 BaseAPI.cache，未绑定缓存时直接调用原方法
+
+    Args:
+        ttl: 默认过期时间（秒），可通过 config["cache_ttls"] 按方法覆盖
+        cache_if: 判断结果是否可缓存，默认只缓存 success 为 True 的结果
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            cache: Optional[ResponseCache] = self.cache
+            if cache is None:
+                return await func(self, *args, **kwargs)
+            name = f"{self.source_name}.{func.__name__}"
+            key = make_call_key(name, signature, args, kwargs)
+            return await cache.get_or_call(name, key, ttl, lambda: func(self, *args, **kwargs), cache_if=cache_if)
+
+        wrapper.cache_ttl = ttl  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorator
@@ -0,0 +1,255 @@
+"""
+数据源能力与描述目录
+
+每个数据源类只做一次反射（inspect + docstring_parser），结果按类缓存。
+目录可在构建时导出为 JSON，运行时直接加载，不再读取源码或解析文档字符串:
+
+    python -m external_api.data_sources.catalog [--output PATH]
+
+加载的条目按类的方法文档和签名做指纹校验，源码变更后自动回退为运行时反射。
+"""
+
+import argparse
+import copy
+import hashlib
+import inspect
+import json
+import logging
+import os
+import threading
+from types import CodeType
+from typing import Any, Dict, List
+
+logger = logging.getLogger("data_sources_catalog")
+
+EXCLUDE_METHODS = ['get_capabilities', 'get_api_info', 'source_name', 'get_source_info', 'bind_transport', 'bind_cache', 'bind_resolution_index']
+
+CATALOG_VERSION = 1
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(__file__), "catalog.json")
+
+_class_catalogs: Dict[str, Dict[str, Any]] = {}
+_loaded_catalogs: Dict[str, Dict[str, Any]] = {}
+_lock = threading.Lock()
+
+
+def _class_key(cls: type) -> str:
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+def _public_functions(cls: type) -> List[tuple]:
+    return [
+        (name, func)
+        for name, func in inspect.getmembers(cls, predicate=inspect.isfunction)
+        if not name.startswith("_") and name not in EXCLUDE_METHODS
+    ]
+
+
+def _fingerprint(cls: type) -> str:
+    """根据公开方法的名称、文档字符串和参数生成指纹，不读取源码"""
+    digest = hashlib.sha1()
+    for name, func in _public_functions(cls):
+        code = inspect.unwrap(func).__code__
+        digest.update(f"{name}\0{func.__doc__}\0{code.co_varnames[:code.co_argcount + code.co_kwonlyargcount]}\0".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _raises_not_implemented(code: CodeType) -> bool:
+    """通过字节码引用的名称判断方法是否包含 raise NotImplementedError（含嵌套函数）"""
+    if "NotImplementedError" in code.co_names:
+        return True
+    return any(isinstance(const, CodeType) and _raises_not_implemented(const) for const in code.co_consts)
+
+
+def _build_capabilities(cls: type) -> List[Dict[str, Any]]:
+    capabilities = []
+    for attr_name in dir(cls):
+        if attr_name.startswith('_') or attr_name in EXCLUDE_METHODS:
+            continue
+        attr = getattr(cls, attr_name)
+        if not callable(attr):
+            continue
+        doc = inspect.getdoc(attr)
+        if not doc:  # 跳过没有文档的方法
+            continue
+        code = getattr(inspect.unwrap(attr), "__code__", None)
+        if code is not None and _raises_not_implemented(code):  # 跳过未实现的方法
+            continue
+        sig = inspect.signature(attr)
+        capabilities.append(
+            {
+                "name": attr_name,
+                "description": doc.split('\n\n')[0],  # 取第一段作为简短描述
+                "parameters": {
+                    name: str(param.annotation).replace('typing.', '')
+                    for name, param in sig.parameters.items()
+                    if name != 'self'
+                },
+                "return_type": str(sig.return_annotation).replace('typing.', ''),
+                "doc": doc,  # 完整的文档字符串
+            }
+        )
+    return capabilities
+
+
+def _build_method_docs(cls: type) -> str:
+    """生成 ApiClient 描述中的方法说明部分（Markdown）"""
+    from docstring_parser import parse
+
+    apis = []
+    for method_name, method in _public_functions(cls):
+        doc = inspect.getdoc(method)
+        if not doc:
+            continue
+
+        docstring = parse(doc)
+
+        method_lines = [f"### {method_name}"]
+        if docstring.short_description:
+            method_lines.append(docstring.short_description + "\n")
+
+        if docstring.params:
+            method_lines.append("**Parameters:**")
+            for param in docstring.params:
+                param_desc = f"- `{param.arg_name}`"
+                if param.type_name:
+                    param_desc += f": {param.type_name}"
+                if param.description:
+                    param_desc += f" - {param.description}"
+                method_lines.append(param_desc)
+            method_lines.append("")
+
+        if docstring.returns:
+            method_lines.append("**Returns:**")
+            if docstring.returns.type_name:
+                method_lines.append(f"Type: `{docstring.returns.type_name}`")
+            if docstring.returns.description:
+                method_lines.append("```")
+                method_lines.append(docstring.returns.description)
+                method_lines.append("```")
+            method_lines.append("")
+
+        if docstring.examples:
+            method_lines.append("**Example:**")
+            method_lines.append("```python")
+            for example in docstring.examples:
+                if example.description:
+                    method_lines.append(example.description.strip())
+            method_lines.append("```")
+            method_lines.append("")
+
+        apis.extend(method_lines)
+    return "\n".join(apis)
+
+
+def get_class_catalog(cls: type) -> Dict[str, Any]:
+    """
+    获取数据源类的目录条目，每个类只构建一次
+
+    优先使用 load_catalog 加载且指纹一致的条目，否则运行时反射生成
+
+    Args:
+        cls: 数据源类
+
+    Returns:
+        Dict[str, Any]: fingerprint、capabilities（能力列表）和 method_docs（方法说明 Markdown），调用方不应修改
+    """
+    key = _class_key(cls)
+    entry = _class_catalogs.get(key)
+    if entry is not None:
+        return entry
+
+    with _lock:
+        entry = _class_catalogs.get(key)
+        if entry is not None:
+            return entry
+        fingerprint = _fingerprint(cls)
+        entry = _loaded_catalogs.pop(key, None)
+        if entry is None or entry.get("fingerprint") != fingerprint:
+            if entry is not None:
+                logger.info(f"Catalog entry for {key} is stale, rebuilding at runtime")
+            entry = {
+                "fingerprint": fingerprint,
+                "capabilities": _build_capabilities(cls),
+                "method_docs": _build_method_docs(cls),
+            }
+        _class_catalogs[key] = entry
+    return entry
+
+
+def get_class_capabilities(cls: type) -> List[Dict[str, Any]]:
+    """获取数据源类能力列表的副本"""
+    return copy.deepcopy(get_class_catalog(cls)["capabilities"])
+
+
+def load_catalog(path: str = DEFAULT_CATALOG_PATH) -> int:
+    """
+    加载导出的目录，文件不存在或格式不符时忽略
+
+    Args:
+        path: 目录文件路径
+
+    Returns:
+        int: 加载的条目数
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            catalog = json.load(f)
+    except FileNotFoundError:
+        return 0
+    except (OSError, ValueError) as e:
+        logger.warning(f"Failed to load catalog {path}: {e}")
+        return 0
+
+    if catalog.get("version") != CATALOG_VERSION:
+        logger.warning(f"Ignore catalog {path} with unsupported version {catalog.get('version')}")
+        return 0
+
+    classes = catalog.get("classes", {})
+    with _lock:
+        for key, entry in classes.items():
+            if key not in _class_catalogs:
+                _loaded_catalogs[key] = entry
+    return len(classes)
+
+
+def export_catalog(path: str = DEFAULT_CATALOG_PATH) -> int:
+    """
+    加载所有数据源并把目录导出为 JSON
+
+    Args:
+        path: 输出路径
+
+    Returns:
+        int: 导出的条目数
+    """
+    from .client import get_client
+
+    client = get_client()
+    client.preload()
+    classes = {}
+    for api in list(client._sources.values()) + list(client._functions.values()):
+        classes[_class_key(type(api))] = get_class_catalog(type(api))
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": CATALOG_VERSION, "classes": classes}, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+    return len(classes)
+
+
+def clear_catalog() -> None:
+    """清空已构建和已加载的目录"""
+    with _lock:
+        _class_catalogs.clear()
+        _loaded_catalogs.clear()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the data source capability catalog")
+    parser.add_argument("--output", default=DEFAULT_CATALOG_PATH, help="Output JSON path")
+    args = parser.parse_args()
+    count = export_catalog(args.output)
+    print(f"Exported {count} catalog entries to {args.output}")
@@ -3,18 +3,19 @@
 """
 
 import importlib
-import inspect
 import logging
 import os
 import pkgutil
 import threading
 from enum import Enum
 from pathlib import Path
-from typing import Dict
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
 
-from docstring_parser import parse
-
-from .base import EXCLUDE_METHODS, BaseAPI
+from .base import BaseAPI
+from .cache import ResponseCache
+from .catalog import DEFAULT_CATALOG_PATH, get_class_catalog, load_catalog
+from .resolution_index import ResolutionIndex
+from .transport import HttpTransport
 
 # 用于在shell中设置LLM_GATEWAY_BASE_URL环境变量
 LLM_GATEWAY_BASE_URL_ENV_NAME = "LLM_GATEWAY_BASE_URL"
@@ -39,6 +40,56 @@ config = {
     "serper_base_url": "google.serper.dev",
     "external_api_proxy_url": get_external_api_proxy_url(),
     "timeout": 60,
+    # 共享连接池配置
+    "pool_limit": 100,
+    "pool_limit_per_host": 32,
+    "dns_cache_ttl": 300,
+    "keepalive_timeout": 30,
+    # 重试与熔断配置: 幂等请求最多尝试 retry_max_attempts 次；同一上游主机连续失败 breaker_failure_threshold 次后熔断 breaker_reset_timeout 秒
+    "retry_max_attempts": 3,
+    "retry_base_delay": 0.2,
+    "retry_max_delay": 5.0,
+    "breaker_failure_threshold": 5,
+    "breaker_reset_timeout": 30,
+    # 按上游主机（X-Original-Host）的令牌桶限流，如 {"twitter154.p.rapidapi.com": {"rate": 5, "burst": 10}}，rate 为每秒请求数
+    # rate_limit_default 用于未单独配置的主机，None 表示不限流；rate_limit_backend 为 sqlite 时多进程共享配额
+    "rate_limits": {},
+    "rate_limit_default": None,
+    "rate_limit_backend": os.getenv("EXTERNAL_API_RATE_LIMIT_BACKEND", "memory"),
+    "rate_limit_path": os.getenv("EXTERNAL_API_RATE_LIMIT_PATH"),
+    # 响应缓存配置: cache_backend 可选 memory | sqlite | none；默认关闭，开启后各方法的结果在 TTL 内可能过时
+    "cache_backend": os.getenv("EXTERNAL_API_CACHE_BACKEND", "none"),
+    "cache_path": os.getenv("EXTERNAL_API_CACHE_PATH"),
+    "cache_max_entries": 1024,
+    # 按 "source.method" 覆盖默认 TTL（秒），0 表示不缓存
+    "cache_ttls": {},
+    # 地名 -> ID 解析索引（booking 的 dest_id、tripadvisor 的 location_id），None 时使用 ~/.cache/external_api/resolutions.sqlite3
+    # resolution_seed_path 为预热用的 JSON 种子文件；resolution_fuzzy 开启后精确匹配失败时按 resolution_fuzzy_cutoff（0-1）做模糊匹配，
+    # 相近的城市名（Hangzhou / Changzhou）会互相命中，默认关闭
+    "resolution_cache_path": os.getenv("EXTERNAL_API_RESOLUTION_CACHE_PATH"),
+    "resolution_ttl": 30 * 24 * 3600,
+    "resolution_seed_path": os.getenv("EXTERNAL_API_RESOLUTION_SEED_PATH"),
+    "resolution_fuzzy": False,
+    "resolution_fuzzy_cutoff": 0.9,
+    # 增量采集（如 twitter.search_new_tweets）的 since-id 状态文件，None 时使用 ~/.cache/external_api/incremental_state.sqlite3
+    "incremental_state_path": os.getenv("EXTERNAL_API_INCREMENTAL_STATE_PATH"),
+    # 构建时导出的能力目录（python -m external_api.data_sources.catalog），存在时替代运行时反射
+    "catalog_path": os.getenv("EXTERNAL_API_CATALOG_PATH", DEFAULT_CATALOG_PATH),
+}
+
+
+# 已知数据源清单: source_name -> (模块名, 类名)
+# 列出数据源时无需导入模块，首次访问时才导入并实例化；不在清单中的 *_source 模块仍会被扫描加载
+SOURCE_MANIFEST: Dict[str, Tuple[str, str]] = {
+    "booking": ("booking_source", "BookingSource"),
+    "commodities": ("commodities_source", "CommoditiesSource"),
+    "metal": ("metal_source", "MetalSource"),
+    "patent": ("patents_source", "PatentSource"),
+    "pinterest": ("pinterest_source", "PinterestSource"),
+    "scholar": ("scholar_source", "ScholarSource"),
+    "tripadvisor": ("tripadvisor_source", "TripAdvisorSource"),
+    "twitter": ("twitter_source", "TwitterSource"),
+    "yahoo_finance": ("yahoo_source", "YahooFinanceSource"),
 }
 
 
@@ -78,37 +129,134 @@ class ApiClient:
                 return
             self._sources: Dict[str, BaseAPI] = {}
             self._functions: Dict[str, BaseAPI] = {}
-            self._load_data_sources()
+            self._transport = HttpTransport.from_config(config)
+            self._cache = ResponseCache.from_config(config)
+            self._resolution_index = ResolutionIndex.from_config(config)
+            self._load_lock = threading.RLock()
+            if config.get("catalog_path"):
+                load_catalog(config["catalog_path"])
+            self._discover_data_sources()
             self._initialized = True
 
-    def _load_data_sources(self):
+    def _discover_data_sources(self):
         """
-        动态加载所有可用的数据源
-        通过扫描data_sources目录下的所有模块来加载数据源
+        发现所有可用的数据源，只记录名称和所在模块，不导入模块
+
+        清单中的数据源按 source_name 登记；其余 *_source / *_function 模块在按名称找不到时才导入扫描
         """
         current_dir = Path(__file__).parent
+        available_modules = set()
+        self._pending_modules: Dict[ApiType, List[str]] = {ApiType.DATA_SOURCE: [], ApiType.FUNCTION: []}
         for module_info in pkgutil.iter_modules([str(current_dir)]):
-            type_dict = self._sources
+            available_modules.add(module_info.name)
             if module_info.name.endswith("_function"):
-                type_dict = self._functions
-            elif not module_info.name.endswith("_source"):
-                continue
+                self._pending_modules[ApiType.FUNCTION].append(module_info.name)
+            elif module_info.name.endswith("_source"):
+                if module_info.name not in {module_name for module_name, _ in SOURCE_MANIFEST.values()}:
+                    self._pending_modules[ApiType.DATA_SOURCE].append(module_info.name)
+
+        self._registry: Dict[ApiType, Dict[str, Tuple[str, str]]] = {
+            ApiType.DATA_SOURCE: {
+                name: (module_name, class_name)
+                for name, (module_name, class_name) in SOURCE_MANIFEST.items()
+                if module_name in available_modules and class_name not in self._exclude_sources
+            },
+            ApiType.FUNCTION: {},
+        }
+
+    def _loaded_apis(self, api_type: ApiType) -> Dict[str, BaseAPI]:
+        return self._sources if api_type == ApiType.DATA_SOURCE else self._functions
+
+    def _register(self, api_type: ApiType, item: Type[BaseAPI]) -> None:
+        """实例化数据源并绑定共享的传输层和缓存"""
+        source = item(config)
+        source.bind_transport(self._transport)
+        source.bind_cache(self._cache)
+        source.bind_resolution_index(self._resolution_index)
+        self._loaded_apis(api_type)[source.source_name] = source
+
+    def _import_module(self, module_name: str):
+        return importlib.import_module(f".{module_name}", package="external_api.data_sources")
+
+    def _load_pending_modules(self, api_type: ApiType) -> None:
+        """导入并扫描不在清单中的模块"""
+        with self._load_lock:
+            module_names, self._pending_modules[api_type] = self._pending_modules[api_type], []
+            for module_name in module_names:
+                try:
+                    module = self._import_module(module_name)
+                    for item_name in dir(module):
+                        item = getattr(module, item_name)
+                        if (
+                            isinstance(item, type)
+                            and issubclass(item, BaseAPI)
+                            and item != BaseAPI
+                            and item.__name__ not in self._exclude_sources
+                        ):
+                            self._register(api_type, item)
+                except Exception as e:
+                    logger.error(f"加载数据源模块 {module_name} 失败: {str(e)}\n")
+                    logger.exception(e)
+
+    def _get_api(self, api_type: ApiType, name: str) -> Optional[BaseAPI]:
+        """
+        获取数据源实例，首次访问时导入模块并实例化
+
+        Args:
+            api_type: 数据源类型
+            name: source_name
+
+        Returns:
+            Optional[BaseAPI]: 数据源实例，不存在或加载失败时返回 None
+        """
+        loaded = self._loaded_apis(api_type)
+        api = loaded.get(name)
+        if api is not None:
+            return api
+
+        with self._load_lock:
+            if name in loaded:
+                return loaded[name]
+            entry = self._registry[api_type].pop(name, None)
+            if entry is not None:
+                module_name, class_name = entry
+                try:
+                    self._register(api_type, getattr(self._import_module(module_name), class_name))
+                except Exception as e:
+                    logger.error(f"加载数据源模块 {module_name} 失败: {str(e)}\n")
+                    logger.exception(e)
+            elif self._pending_modules[api_type]:
+                self._load_pending_modules(api_type)
+            return loaded.get(name)
+
+    def _load_all(self, api_type: ApiType) -> None:
+        for name in list(self._registry[api_type]):
+            self._get_api(api_type, name)
+        self._load_pending_modules(api_type)
+
+    def preload(self, names: Optional[Iterable[str]] = None) -> None:
+        """
+        Import and instantiate data sources ahead of the first call, for services that want eager warmup
+
+        Args:
+            names: Iterable[str] - source names to load, all data sources and functions when omitted
+        """
+        if names is not None:
+            for name in names:
+                self._get_api(ApiType.DATA_SOURCE, name)
+            return
 
-            try:
-                module = importlib.import_module(f".{module_info.name}", package="external_api.data_sources")
-                for item_name in dir(module):
-                    item = getattr(module, item_name)
-                    if (
-                        isinstance(item, type)
-                        and issubclass(item, BaseAPI)
-                        and item != BaseAPI
-                        and item.__name__ not in self._exclude_sources
-                    ):
-                        source = item(config)
-                        type_dict[source.source_name] = source
-            except Exception as e:
-                logger.error(f"加载数据源模块 {module_info.name} 失败: {str(e)}\n")
-                logger.exception(e)
+        for api_type in ApiType:
+            self._load_all(api_type)
+
+    def get_data_source_names(self) -> List[str]:
+        """
+        Get the names of all known data sources without importing them
+
+        Returns:
+            List[str]: Sorted source names; sources outside SOURCE_MANIFEST appear once they have been loaded
+        """
+        return sorted(set(self._sources) | set(self._registry[ApiType.DATA_SOURCE]))
 
     def get_function_desc(self, function_name: str) -> str:
         """
@@ -147,11 +295,7 @@ class ApiClient:
         """
         output_lines = ["# Available data sources (refer to the python code examples, write python code to call them)\n"]
 
-        # Directly use the mapping value to get the data source instance
-        if api_type == ApiType.DATA_SOURCE:
-            api = self._sources.get(api_name)
-        else:
-            api = self._functions.get(api_name)
+        api = self._get_api(api_type, api_name)
 
         if not api:
             return f"# {api_type.value} {api_name} does not exist"
@@ -163,65 +307,12 @@ class ApiClient:
         source_desc = api_info.get("description", "No description available")
         output_lines.extend([f"## {display_name}", f"{source_desc}\n"])
 
-        # Get data source methods
-        apis = []
-        for method_name, method in inspect.getmembers(api.__class__, predicate=inspect.isfunction):
-            # Skip internal methods
-            if method_name.startswith("_") or method_name in EXCLUDE_METHODS:
-                continue
-
-            # Get method docstring
-            doc = inspect.getdoc(method)
-            if not doc:
-                continue
-
-            # Parse docstring
-            docstring = parse(doc)
-
-            # Prepare method description
-            method_lines = [f"### {method_name}"]
-            if docstring.short_description:
-                method_lines.append(docstring.short_description + "\n")
-
-            # Add parameter description
-            if docstring.params:
-                method_lines.append("**Parameters:**")
-                for param in docstring.params:
-                    param_desc = f"- `{param.arg_name}`"
-                    if param.type_name:
-                        param_desc += f": {param.type_name}"
-                    if param.description:
-                        param_desc += f" - {param.description}"
-                    method_lines.append(param_desc)
-                method_lines.append("")
-
-            # Add return value description
-            if docstring.returns:
-                method_lines.append("**Returns:**")
-                if docstring.returns.type_name:
-                    method_lines.append(f"Type: `{docstring.returns.type_name}`")
-                if docstring.returns.description:
-                    method_lines.append("```")
-                    method_lines.append(docstring.returns.description)
-                    method_lines.append("```")
-                method_lines.append("")
-
-            # Add example
-            if docstring.examples:
-                method_lines.append("**Example:**")
-                method_lines.append("```python")
-                for example in docstring.examples:
-                    if example.description:
-                        # Directly add example code, no processing
-                        method_lines.append(example.description.strip())
-                method_lines.append("```")
-                method_lines.append("")
-
-            apis.extend(method_lines)
+        # Method descriptions are built once per class, or loaded from the exported catalog
+        method_docs = get_class_catalog(type(api))["method_docs"]
 
         # Merge all method descriptions
-        if apis:
-            output_lines.extend(apis)
+        if method_docs:
+            output_lines.append(method_docs)
         output_lines.append("---\n")
 
         return "\n".join(output_lines)
@@ -235,6 +326,7 @@ class ApiClient:
         """
         result = {}
 
+        self._load_all(ApiType.DATA_SOURCE)
         for name, source in self._sources.items():
             # yahoo_finance和twitter 已通过 tool 实现，这里不展示
             if name in ["yahoo_finance", "twitter", "booking", "pinterest", "tripadvisor"]:
@@ -256,10 +348,40 @@ class ApiClient:
         获取所有数据源的所有方法的描述
         """
         result = []
+        self._load_all(ApiType.FUNCTION)
         for function_name, function in self._functions.items():
             result.append(self.get_function_desc(function_name))
         return "\n".join(result)
 
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        Get response cache hit/miss counters
+
+        Returns:
+            Dict[str, Any]: Total hits, misses, coalesced calls, current size and per-method counters; empty if caching is disabled
+        """
+        if self._cache is None:
+            return {}
+        return self._cache.stats()
+
+    def get_transport_stats(self) -> Dict[str, Any]:
+        """
+        Get shared transport counters
+
+        Returns:
+            Dict[str, Any]: Circuit breaker state and rate limiter queue depth / wait time per upstream host
+        """
+        return {
+            "circuit_breaker": self._transport.circuit_breaker.stats(),
+            "rate_limiter": self._transport.rate_limiter.stats(),
+        }
+
+    async def aclose(self) -> None:
+        """
+        Close the pooled HTTP session of the current event loop, call before the loop shuts down
+        """
+        await self._transport.close()
+
     def __getattr__(self, name: str) -> BaseAPI:
         """
         Get data source instance by attribute access
@@ -273,9 +395,12 @@ class ApiClient:
         Raises:
             AttributeError: data source does not exist
         """
-        if name not in self._sources:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        source = self._get_api(ApiType.DATA_SOURCE, name)
+        if source is None:
             raise AttributeError(f"Data source {name} does not exist")
-        return self._sources[name]
+        return source
 
 
 # 全局默认实例
@@ -0,0 +1,110 @@
+"""
+JSON 编解码
+
+数据源的 HttpTransport 和 FunctionProxy 都通过这里编解码 JSON:
+- 安装了 orjson 时使用 orjson，否则回退到标准库 json，两者结果一致
+- 直接解码响应的原始字节，不先解码成 str 再解析
+- 代理有时把 JSON 再编码成字符串返回（双重编码），decode_json 会自动再解析一次
+- 编码结果为 UTF-8 字节，可以直接作为请求体；records.Record 等带 to_dict() 的对象按 dict 编码
+"""
+
+import json
+import re
+from typing import Any, Optional, Union
+
+import aiohttp
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson 是可选依赖
+    orjson = None
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+JSON_CONTENT_TYPE = "application/json"
+
+# 双重编码时外层字符串的内容以 { 或 [ 开头
+_JSON_CONTAINER_RE = re.compile(r"\s*[\[{]")
+
+JsonInput = Union[bytes, bytearray, memoryview, str]
+
+
+def loads(data: JsonInput) -> Any:
+    """
+    解析 JSON
+
+    Raises:
+        ValueError: 不是合法的 JSON（orjson.JSONDecodeError 和 json.JSONDecodeError 都是 ValueError 的子类）
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def _default(value: Any) -> Any:
+    """编码 JSON 不支持的类型: 带 to_dict() 的对象（如 records.Record）按其 dict 形式编码"""
+    to_dict = getattr(value, "to_dict", None)
+    if to_dict is None:
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+    return to_dict()
+
+
+def dumps(value: Any) -> bytes:
+    """把对象编码为紧凑的 UTF-8 JSON 字节，非 ASCII 字符不转义"""
+    if orjson is not None:
+        return orjson.dumps(value, default=_default)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+def decode_json(data: JsonInput) -> Any:
+    """
+    解析响应体，双重编码的 JSON 自动再解析一次
+
+    Returns:
+        Any: 解析结果；空响应体返回 None（与 aiohttp 的 response.json() 一致），
+            外层字符串不是 JSON 对象或数组时原样返回该字符串
+    """
+    try:
+        value = loads(data)
+    except ValueError:
+        # 解析失败时才检查是否为空白响应体，正常响应不必先 strip 复制一遍
+        if not (bytes(data) if isinstance(data, memoryview) else data).strip():
+            return None
+        raise
+    if isinstance(value, str) and _JSON_CONTAINER_RE.match(value):
+        try:
+            return loads(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _is_expected_content_type(actual: str, expected: str) -> bool:
+    if expected == JSON_CONTENT_TYPE:
+        return actual == JSON_CONTENT_TYPE or (actual.startswith("application/") and actual.endswith("+json"))
+    return expected in actual
+
+
+async def read_json(response: aiohttp.ClientResponse, content_type: Optional[str] = JSON_CONTENT_TYPE) -> Any:
+    """
+    读取并解析 aiohttp 响应，替代 response.json()
+
+    Args:
+        response: aiohttp 响应
+        content_type: 期望的响应 Content-Type，None 表示不校验
+
+    Raises:
+        aiohttp.ContentTypeError: Content-Type 不符合预期（与 response.json() 一致）
+        ValueError: 响应体不是合法的 JSON
+    """
+    body = await response.read()
+    if content_type and not _is_expected_content_type(response.content_type, content_type):
+        raise aiohttp.ContentTypeError(
+            response.request_info,
+            response.history,
+            status=response.status,
+            message=f"Attempt to decode JSON with unexpected mimetype: {response.content_type}",
+            headers=response.headers,
+        )
+    return decode_json(body)
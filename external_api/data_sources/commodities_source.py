@@ -3,13 +3,13 @@ Commodities data source implementation
 """
 
 import asyncio
-import json
 import logging
 from typing import Any, Dict, Optional
 
 import aiohttp
 
 from .base import BaseAPI
+from .cache import cached
 
 logger = logging.getLogger("commodities_source")
 
@@ -45,6 +45,7 @@ class CommoditiesSource(BaseAPI):
             "description": "Commodity price data source, provides price information for commodities such as COCOA, COFFEE, CORN, OIL, SOYBEAN, SUGAR, WHEAT, etc.",
         }
 
+    @cached(ttl=24 * 3600)
     async def get_supported_commodities(self) -> Dict[str, Any]:
         """Get the list of supported commodities.
         This method is used to get the list of commodities that can be queried.
@@ -83,16 +84,8 @@ class CommoditiesSource(BaseAPI):
         try:
             request_url = f"{self.proxy_url}/v1/supported"
 
-            # Send request using aiohttp
-            async with aiohttp.ClientSession(trust_env=True) as session:
-                async with session.get(request_url, headers=self._headers, timeout=self._timeout) as response:
-                    response.raise_for_status()
-
-                    # Parse the response
-                    data = await response.json(content_type=None)
-
-            if isinstance(data, str):
-                data = json.loads(data)
+            # Send request
+            data = await self.transport.request_json("GET", request_url, headers=self._headers, timeout=self._timeout, content_type=None)
 
             if not isinstance(data, dict):
                 raise ValueError(f"Invalid API response format: {data}")
@@ -119,6 +112,7 @@ class CommoditiesSource(BaseAPI):
             logger.exception(e)
             return {"success": False, "error": error_msg}
 
+    @cached(ttl=60)
     async def get_commodities_price(
         self,
         commodity_code: str,
@@ -170,16 +164,8 @@ class CommoditiesSource(BaseAPI):
 
             request_url = f"{self.proxy_url}/v1/market-data"
 
-            # Send request using aiohttp
-            async with aiohttp.ClientSession(trust_env=True) as session:
-                async with session.get(request_url, headers=self._headers, params=params, timeout=self._timeout) as response:
-                    response.raise_for_status()
-
-                    # Parse the response
-                    data = await response.json(content_type=None)
-
-            if isinstance(data, str):
-                data = json.loads(data)
+            # Send request
+            data = await self.transport.request_json("GET", request_url, headers=self._headers, params=params, timeout=self._timeout, content_type=None)
 
             if not isinstance(data, dict):
                 raise ValueError(f"Invalid API response format: {data}")
@@ -0,0 +1,121 @@
+"""
+日期时间规范化
+
+各数据源把接口返回的日期统一格式化为 "YYYY-MM-DD HH:MM:SS"（行情为 "YYYY-MM-DD"），原来每个数据源各写一份
+datetime.strptime 并对每条结果调用一次。这里提供共用的实现:
+
+- DateNormalizer: 按候选格式解析日期字符串，记住最近一次成功的格式并优先尝试（格式探测缓存）；
+  结果按输入字符串做 LRU 缓存，同一批推文、新闻经常共享相同的时间戳，重复值不再解析
+- format_epoch_dates: 批量把 epoch 秒按本地时区格式化为日期，结果与逐个 datetime.fromtimestamp(ts).strftime("%Y-%m-%d")
+  相同，但每 15 分钟的时间段只格式化一次；传入 NumPy 数组时用 np.unique 去重
+
+只重新格式化，不做时区换算：带 %z 的时间保留原时区的墙上时间，与原来的 strptime + strftime 一致。
+"""
+
+import functools
+from datetime import date, datetime
+from typing import Any, Iterable, List, Sequence
+
+OUTPUT_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# 1972 年以后所有时区的 UTC 偏移和夏令时切换时刻都是 15 分钟的整数倍，同一个 15 分钟时间段内的本地日期相同
+_EPOCH_BUCKET_SECONDS = 900
+
+
+class DateNormalizer:
+    """
+    把日期字符串规范化为统一格式的可调用对象
+
+    无法解析的值原样返回；非字符串的值（如 None）也原样返回，empty_as_none=True 时空值返回 None。
+    实例是线程安全的，通常在模块级创建后作为 extractors.Field 的 convert 使用。
+
+    Example:
+        >>> format_date = DateNormalizer(("%a %b %d %H:%M:%S %z %Y", "%a, %d %b %Y %H:%M:%S %z"), empty_as_none=True)
+        >>> format_date("Thu Mar 13 18:08:35 +0000 2025")
+        '2025-03-13 18:08:35'
+        >>> format_date("Tue, 04 Mar 2025 12:26:23 +0000")
+        '2025-03-04 12:26:23'
+        >>> format_date("") is None
+        True
+    """
+
+    __slots__ = ("formats", "output_format", "empty_as_none", "_order", "_cached")
+
+    def __init__(self, formats: Sequence[str], output_format: str = OUTPUT_FORMAT, empty_as_none: bool = False, cache_size: int = 4096):
+        """
+        Args:
+            formats: 候选输入格式（strptime 格式），按顺序尝试
+            output_format: 输出格式
+            empty_as_none: 空值（None、""）是否返回 None，否则原样返回
+            cache_size: 按输入字符串缓存的结果数量
+        """
+        if not formats:
+            raise ValueError("DateNormalizer requires at least one input format")
+        self.formats = tuple(formats)
+        self.output_format = output_format
+        self.empty_as_none = empty_as_none
+        # 最近一次成功的格式排在最前；整体替换元组，不需要加锁
+        self._order = self.formats
+        self._cached = functools.lru_cache(maxsize=cache_size)(self._parse)
+
+    def __call__(self, value: Any) -> Any:
+        if not value and self.empty_as_none:
+            return None
+        if type(value) is not str:
+            return value
+        return self._cached(value)
+
+    def _parse(self, value: str) -> str:
+        order = self._order
+        for fmt in order:
+            try:
+                parsed = datetime.strptime(value, fmt)
+            except ValueError:
+                continue
+            if fmt is not order[0]:
+                self._order = (fmt,) + tuple(other for other in self.formats if other is not fmt)
+            return parsed.strftime(self.output_format)
+        return value
+
+    def cache_info(self) -> Any:
+        """返回结果缓存的命中统计（functools.lru_cache 的 CacheInfo）"""
+        return self._cached.cache_info()
+
+    def cache_clear(self) -> None:
+        """清空结果缓存"""
+        self._cached.cache_clear()
+
+    def __repr__(self) -> str:
+        return f"DateNormalizer({self.formats!r}, output_format={self.output_format!r})"
+
+
+@functools.lru_cache(maxsize=65536)
+def _bucket_date(bucket: float) -> str:
+    # 1970 年以后 date.isoformat() 与 strftime("%Y-%m-%d") 相同，但快得多
+    return date.fromtimestamp(bucket * _EPOCH_BUCKET_SECONDS).isoformat()
+
+
+def format_epoch_dates(timestamps: Iterable[float]) -> List[str]:
+    """
+    批量把 epoch 秒按本地时区格式化为 "YYYY-MM-DD"
+
+    Args:
+        timestamps: epoch 秒的列表或 NumPy 数组
+
+    Returns:
+        List[str]: 与输入一一对应的日期，和逐个调用 datetime.fromtimestamp(ts).strftime("%Y-%m-%d") 的结果相同
+
+    Example:
+        >>> format_epoch_dates([1713484800, 1713484860, 1713571200])  # doctest: +SKIP
+        ['2024-04-19', '2024-04-19', '2024-04-20']
+    """
+    if hasattr(timestamps, "dtype"):
+        import numpy as np
+
+        buckets, inverse = np.unique(np.floor_divide(timestamps, _EPOCH_BUCKET_SECONDS), return_inverse=True)
+        labels = np.array([_bucket_date(int(bucket)) for bucket in buckets.tolist()], dtype=object)
+        return labels[inverse].tolist()
+    if not isinstance(timestamps, (list, tuple)):
+        timestamps = list(timestamps)
+    dates = {bucket: _bucket_date(bucket) for bucket in {ts // _EPOCH_BUCKET_SECONDS for ts in timestamps}}
+    return [dates[ts // _EPOCH_BUCKET_SECONDS] for ts in timestamps]
@@ -0,0 +1,226 @@
+"""
+声明式字段提取
+
+数据源把 "响应 -> 记录" 的映射写成字段规格，模块加载时转换一次为提取函数，代替逐字段的 .get(...).get(...) 链:
+
+    _extract_user = compile_record({
+        "id": Field("user_id", convert=str),
+        "name": "name",                              # 等价于 Field("name")
+        "followers_count": Field("follower_count", 0),
+        "avatar": {"url": Field("avatar.original", "")},  # 嵌套记录
+    })
+    user = _extract_user(data)
+
+- 路径为点分隔的键（"user.avatar.original"）或键元组（含 "." 的键）；中间节点缺失、为 None 或不是 dict 时取 default，
+  末级键存在时原样返回（包括 None），与 d.get(key, default) 一致
+- convert 对取到的值（包括 default）做转换，如 str、日期格式化、each(子提取函数)
+- 规格中的可调用对象以整个输入为参数计算字段值，Const 为固定值
+- 每个字段规格转换为一个普通的取值闭包，不生成代码；default 为 []、{} 时每次返回新对象
+- 传入 record（records.Record 子类）时生成紧凑的记录对象而不是 dict，as_records 按已有提取函数的规格生成该版本
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Type, Union
+
+from .records import Record
+
+Extractor = Callable[[Any], Any]
+RecordType = Type[Record]
+
+# 中间节点缺失或不是 dict 时使用的空字典，取值函数只会对它调用 .get
+_EMPTY: Dict[str, Any] = {}
+
+
+class Field:
+    """字段规格"""
+
+    __slots__ = ("path", "default", "convert")
+
+    def __init__(self, path: Union[str, Tuple[str, ...]], default: Any = None, convert: Optional[Callable[[Any], Any]] = None):
+        self.path = tuple(path.split(".")) if isinstance(path, str) else tuple(path)
+        if not self.path:
+            raise ValueError("Field path must not be empty")
+        self.default = default
+        self.convert = convert
+
+
+class Const:
+    """固定值字段"""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+
+def _fresh_default(value: Any) -> Optional[type]:
+    """可变的空默认值（[]、{}）每次生成新对象，避免调用方修改后影响其他记录"""
+    return type(value) if type(value) in (list, dict) and not value else None
+
+
+def _field(field: Field, record: Optional[RecordType] = None) -> Extractor:
+    """Field 的取值函数；中间节点缺失、为 None 或不是 dict 时取 default"""
+    parents, key, default = field.path[:-1], field.path[-1], field.default
+    fresh = _fresh_default(default)
+    convert = field.convert
+    if convert is not None and record is not None:
+        # 生成记录时，compile_record 编译的子提取函数（包括 each / each_value 的元素）按 record 重新编译
+        each_of = getattr(convert, "__each__", None)
+        if each_of is not None and hasattr(each_of[1], "__fields__"):
+            kind, extract = each_of
+            wrap = each if kind == "list" else each_value
+            convert = wrap(compile_record(extract.__fields__, extract.__name__, record=record))
+        elif hasattr(convert, "__fields__"):
+            convert = compile_record(convert.__fields__, convert.__name__, record=record)
+
+    def get(item: Dict[str, Any]) -> Any:
+        node = item
+        for parent in parents:
+            node = node.get(parent)
+            if not isinstance(node, dict):
+                node = _EMPTY
+                break
+        value = node.get(key, default if fresh is None else fresh())
+        return value if convert is None else convert(value)
+
+    return get
+
+
+def _none(item: Any) -> None:
+    return None
+
+
+def _plan(spec: Any, record: Optional[RecordType] = None) -> Tuple[Any, Any, Optional[Extractor]]:
+    """
+    单个字段的取值方式 (key, default, get)
+
+    最常见的平铺字段（单级路径、没有 convert、default 不是可变的空值）返回 (key, default, None)，
+    由调用方直接 item.get(key, default)，省去一次函数调用；其余字段返回 (None, None, get)
+    """
+    if isinstance(spec, (str, tuple)):
+        spec = Field(spec)
+    if isinstance(spec, Field) and len(spec.path) == 1 and spec.convert is None and _fresh_default(spec.default) is None:
+        return spec.path[0], spec.default, None
+    return None, None, _getter(spec, record)
+
+
+def _mapping(spec: Mapping[str, Any], record: Optional[RecordType] = None, name: Optional[str] = None) -> Extractor:
+    """
+    嵌套 dict 规格的取值函数；record 不为 None 时按记录类型的字段顺序构造记录，只有可选字段可以缺省（取 None）
+
+    name 不为 None 时生成顶层提取函数: 接受任意输入，item 不是 dict 时按空 dict 处理
+    """
+    if record is None:
+        fields = tuple((key, *_plan(value)) for key, value in spec.items())
+
+        def build(item: Dict[str, Any]) -> Dict[str, Any]:
+            return {key: item.get(path, default) if get is None else get(item) for key, path, default, get in fields}
+
+    else:
+        mismatched = (set(spec) - record._field_set) | (record._field_set - set(spec) - record._optional)
+        if mismatched:
+            raise ValueError(f"Spec keys do not match {record.__name__} fields: {sorted(mismatched)}")
+        plans = tuple(_plan(spec[field], record._nested.get(field)) if field in spec else (None, None, _none) for field in record._fields)
+
+        def build(item: Dict[str, Any]) -> Record:
+            return record(*[item.get(path, default) if get is None else get(item) for path, default, get in plans])
+
+    return build if name is None else _named(build, name)
+
+
+def _getter(spec: Any, record: Optional[RecordType] = None) -> Extractor:
+    """
+    把字段规格转换为取值函数 get(item)，item 为 dict
+
+    record 不为 None 时，嵌套 dict 规格生成该记录类型的对象
+    """
+    if isinstance(spec, (str, tuple)):
+        spec = Field(spec)
+    if isinstance(spec, Field):
+        return _field(spec, record)
+    if isinstance(spec, Const):
+        value = spec.value
+        fresh = _fresh_default(value)
+        return (lambda item: fresh()) if fresh is not None else (lambda item: value)
+    if isinstance(spec, Mapping):
+        return _mapping(spec, record)
+    if callable(spec):
+        return spec
+    raise TypeError(f"Unsupported field spec: {spec!r}")
+
+
+def _named(get: Extractor, name: str) -> Extractor:
+    """包装为接受任意输入的提取函数: item 不是 dict 时按空 dict 处理"""
+
+    def extract(item: Any) -> Any:
+        return get(item if isinstance(item, dict) else _EMPTY)
+
+    extract.__name__ = extract.__qualname__ = name
+    return extract
+
+
+def compile_record(spec: Mapping[str, Any], name: str = "extract", record: Optional[RecordType] = None) -> Extractor:
+    """
+    把记录规格编译为提取函数
+
+    Args:
+        spec: 输出字段名 -> 字段规格（Field、路径字符串或元组、Const、嵌套 dict、以输入为参数的可调用对象）
+        name: 提取函数的名称
+        record: 生成的记录类型（records.Record 子类），None 表示生成 dict；嵌套 dict 规格使用 record 声明的嵌套类型
+
+    Returns:
+        Extractor: extract(item) -> dict 或 record 对象；item 不是 dict 时按空 dict 处理，所有字段取 default
+    """
+    spec = dict(spec)
+    extract = _mapping(spec, record, name)
+    extract.__fields__ = spec
+    return extract
+
+
+def compile_fields(extract: Extractor) -> Dict[str, Extractor]:
+    """
+    把 compile_record 编译的提取函数按顶层字段拆开，用于按需取值
+
+    Returns:
+        Dict[str, Extractor]: 输出字段名 -> get(item) -> 该字段的值，与 extract(item)[字段名] 相同
+    """
+    return {key: _named(_getter(spec), f"{extract.__name__}_{key}") for key, spec in extract.__fields__.items()}
+
+
+def as_records(extract: Extractor, record: RecordType) -> Extractor:
+    """
+    把 compile_record 编译的 dict 提取函数按同一份规格重新编译为生成记录对象的版本
+
+    Returns:
+        Extractor: extract(item) -> record 对象，to_dict() 的结果与原提取函数相同
+    """
+    return compile_record(extract.__fields__, f"{extract.__name__}_record", record=record)
+
+
+def compile_path(path: Union[str, Tuple[str, ...]], default: Any = None, convert: Optional[Callable[[Any], Any]] = None) -> Extractor:
+    """
+    把单个路径编译为取值函数，语义与 Field 相同
+
+    Returns:
+        Extractor: get(item) -> value
+    """
+    return _named(_field(Field(path, default, convert)), "extract_path")
+
+
+def each(extract: Extractor) -> Callable[[Optional[Iterable[Any]]], List[Any]]:
+    """用于 convert: 对列表中的每一项提取记录，None 视为空列表"""
+
+    def convert(items: Optional[Iterable[Any]]) -> List[Any]:
+        return [extract(item) for item in items or ()]
+
+    convert.__each__ = ("list", extract)
+    return convert
+
+
+def each_value(extract: Extractor) -> Callable[[Optional[Mapping[str, Any]]], Dict[str, Any]]:
+    """用于 convert: 对 dict 的每个值提取记录，保留键，None 视为空 dict"""
+
+    def convert(items: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+        return {key: extract(value) for key, value in (items or {}).items()}
+
+    convert.__each__ = ("dict", extract)
+    return convert
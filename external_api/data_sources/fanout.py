@@ -0,0 +1,143 @@
+"""
+有界并发扇出
+
+- FanOut: 固定数量 worker 的工作池。worker 从 jobs 中依次取任务执行，结果按完成顺序逐个返回，
+  先完成的不必等待最慢的任务；jobs 可以是异步可迭代对象（如先搜索、再按搜索结果生成任务），首次迭代时才开始读取。
+  结果队列最多缓存 max_workers 个结果，调用方消费得慢时 worker 会等待，不会无限占用内存。
+  取够 max_items 个结果或调用 aclose() 时取消尚未完成的任务，并关闭作为 jobs 的异步生成器。
+"""
+
+import asyncio
+import logging
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, List, Optional, Union
+
+logger = logging.getLogger("data_sources_fanout")
+
+DEFAULT_MAX_WORKERS = 4
+
+# 任务为无参的协程函数
+Job = Callable[[], Awaitable[Any]]
+
+# worker 退出时放入结果队列的标记
+_WORKER_DONE = object()
+
+
+async def _iterate(jobs: Iterable[Job]) -> AsyncIterator[Job]:
+    for job in jobs:
+        yield job
+
+
+class FanOut:
+    """
+    有界并发的工作池，按完成顺序返回任务结果
+
+    读取 jobs 或执行任务时抛出的异常记录到 errors 后跳过，不影响其余任务；
+    数据源方法自身返回 {"success": False, ...} 的结果照常返回，由调用方处理。
+    迭代结束、出错或 break 后任务都会被取消；break 时由事件循环稍后关闭，需要立即释放时使用 async with 或 aclose()。
+    """
+
+    def __init__(
+        self,
+        jobs: Union[Iterable[Job], AsyncIterable[Job]],
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_items: Optional[int] = None,
+    ):
+        self._jobs = jobs
+        self.max_workers = max(1, max_workers)
+        self.max_items = max_items
+        self.started = 0
+        self.items = 0
+        self.errors: List[str] = []
+        self._job_iter: Optional[AsyncIterator[Job]] = None
+        self._job_lock = asyncio.Lock()
+        self._results: asyncio.Queue = asyncio.Queue(maxsize=self.max_workers)
+        self._workers: List[asyncio.Task] = []
+        self._running = 0
+        self._closed = False
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        # 异步生成器: 调用方 break 后由事件循环关闭生成器，finally 中取消 worker，不会留下阻塞在结果队列上的任务
+        try:
+            if not self._closed and not self._workers:
+                self._start()
+            while not self._closed and (self.max_items is None or self.items < self.max_items):
+                result = await self._results.get()
+                if result is _WORKER_DONE:
+                    self._running -= 1
+                    if not self._running:
+                        return
+                    continue
+
+                self.items += 1
+                if self.max_items is not None and self.items >= self.max_items:
+                    # 已取够结果，立即取消尚未完成的任务，不必等调用方再次迭代
+                    await self._cancel_workers()
+                yield result
+        finally:
+            await self.aclose()
+
+    def _start(self) -> None:
+        self._job_iter = self._jobs.__aiter__() if isinstance(self._jobs, AsyncIterable) else _iterate(self._jobs)
+        self._running = self.max_workers
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.max_workers)]
+
+    async def _next_job(self) -> Optional[Job]:
+        """取下一个任务，jobs 取完或读取失败时返回 None"""
+        async with self._job_lock:
+            if self._job_iter is None:
+                return None
+            try:
+                return await self._job_iter.__anext__()
+            except StopAsyncIteration:
+                self._job_iter = None
+            except Exception as e:
+                logger.error(f"Failed to produce fan-out jobs: {e}")
+                self.errors.append(str(e))
+                self._job_iter = None
+            return None
+
+    async def _work(self) -> None:
+        while True:
+            job = await self._next_job()
+            if job is None:
+                break
+            self.started += 1
+            try:
+                result = await job()
+            except Exception as e:
+                logger.error(f"Fan-out job failed: {e}")
+                logger.exception(e)
+                self.errors.append(str(e))
+                continue
+            await self._results.put(result)
+        # 被取消时不放入结束标记：只有 _cancel_workers 会取消 worker，此时已不再读取结果
+        await self._results.put(_WORKER_DONE)
+
+    async def _cancel_workers(self) -> None:
+        job_iter, self._job_iter = self._job_iter, None
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        # worker 都已退出后再关闭 jobs，让异步生成器的 finally 立即执行，而不是等到垃圾回收
+        aclose = getattr(job_iter, "aclose", None)
+        if aclose is not None:
+            try:
+                await aclose()
+            except Exception as e:
+                logger.error(f"Failed to close fan-out jobs: {e}")
+
+    async def aclose(self) -> None:
+        """停止扇出并取消尚未完成的任务"""
+        self._closed = True
+        await self._cancel_workers()
+
+    async def collect(self) -> List[Any]:
+        """取出所有结果"""
+        return [result async for result in self]
+
+    async def __aenter__(self) -> "FanOut":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
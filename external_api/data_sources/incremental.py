@@ -0,0 +1,190 @@
+"""
+按 since-id 的增量采集
+
+定时任务反复查询同一个关键词或用户时，只拉取上次之后的新数据:
+- IncrementalStateStore 在本地 SQLite 中按 key 保存已见过的最大 ID（since_id）和未补完的翻页 cursor
+- collect_incremental 从最新一页开始翻页，遇到不大于 since_id 的 ID 即停止，并按 ID 去重
+- 单次运行因 max_items / max_pages 提前结束时记录 cursor，下次运行先补完这段缺口，再拉取新数据
+
+数据须按 ID 从新到旧排列（如推文时间线、按 latest 排序的搜索），ID 为可比较大小的整数（如 snowflake ID）。
+"""
+
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("data_sources_incremental")
+
+DEFAULT_STATE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "external_api", "incremental_state.sqlite3")
+DEFAULT_MAX_PAGES = 10
+
+# fetch_page(cursor) -> (本页数据, 下一页 cursor, 本页响应字节数)
+IncrementalPageFetcher = Callable[[Optional[str]], Awaitable[Tuple[List[Dict[str, Any]], Optional[str], int]]]
+
+
+class IncrementalStateStore:
+    """
+    增量采集状态，以 JSON 保存在 SQLite 中，多个进程可共享同一文件
+
+    每个 key 的状态:
+    - since_id: 已完整拉取到的最大 ID
+    - cursor / gap_since_id: 上次未补完的缺口，从 cursor 继续翻页直到遇到不大于 gap_since_id 的 ID
+    - runs / requests_saved / bytes_saved: 累计统计
+    """
+
+    def __init__(self, path: str = DEFAULT_STATE_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS incremental_state (key TEXT PRIMARY KEY, value TEXT NOT NULL, updated_at REAL NOT NULL)")
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "IncrementalStateStore":
+        """根据 client.config 创建状态存储"""
+        return cls(config.get("incremental_state_path") or DEFAULT_STATE_PATH)
+
+    def get(self, key: str) -> Dict[str, Any]:
+        """读取状态，不存在时返回空字典"""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM incremental_state WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row is not None else {}
+
+    def set(self, key: str, state: Dict[str, Any]) -> None:
+        """写入状态"""
+        payload = json.dumps(state, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO incremental_state (key, value, updated_at) VALUES (?, ?, ?)", (key, payload, time.time())
+            )
+
+    def delete(self, key: str) -> None:
+        """删除状态，下次运行重新全量拉取"""
+        with self._lock:
+            self._conn.execute("DELETE FROM incremental_state WHERE key = ?", (key,))
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT key FROM incremental_state ORDER BY key")]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _as_int(item_id: Any) -> Optional[int]:
+    try:
+        return int(item_id)
+    except (TypeError, ValueError):
+        return None
+
+
+async def collect_incremental(
+    store: IncrementalStateStore,
+    key: str,
+    fetch_page: IncrementalPageFetcher,
+    page_size: int,
+    max_items: int,
+    max_pages: int = DEFAULT_MAX_PAGES,
+    id_field: str = "id",
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    增量拉取 key 对应的新数据并更新状态
+
+    Args:
+        store: 状态存储
+        key: 查询或用户的唯一标识
+        fetch_page: 翻页函数，cursor 为 None 时返回最新一页
+        page_size: 每页条数，用于估算全量拉取 max_items 条需要的请求数
+        max_items: 新数据达到该条数后停止翻页（按页停止，返回的条数可能略多）
+        max_pages: 本次最多请求的页数
+        id_field: 数据中 ID 字段名
+
+    Returns:
+        Tuple[List[Dict[str, Any]], Dict[str, Any]]: 按从新到旧排列的新数据，以及本次统计:
+        requests / bytes（实际请求数和字节数）、new（新数据条数）、duplicates（丢弃的已见数据条数）、
+        requests_saved / bytes_saved（相比全量拉取 max_items 条节省的请求数和估算字节数）、since_id、complete（是否已追平）
+    """
+    state = store.get(key)
+    since_id = _as_int(state.get("since_id"))
+    seen_ids = set()
+    report = {"requests": 0, "bytes": 0, "new": 0, "duplicates": 0}
+    newest_id = since_id
+
+    async def run(cursor: Optional[str], floor: Optional[int], items: List[Dict[str, Any]], budget: int) -> Optional[str]:
+        """从 cursor 翻页直到遇到不大于 floor 的 ID，新数据追加到 items，返回未补完时的下一页 cursor"""
+        nonlocal newest_id
+        while True:
+            page, next_cursor, size = await fetch_page(cursor)
+            report["requests"] += 1
+            report["bytes"] += size
+            reached = False
+            for item in page:
+                item_id = item.get(id_field)
+                number = _as_int(item_id)
+                if floor is not None and number is not None and number <= floor:
+                    reached = True
+                    report["duplicates"] += 1
+                    continue
+                if item_id in seen_ids:
+                    report["duplicates"] += 1
+                    continue
+                seen_ids.add(item_id)
+                items.append(item)
+                if number is not None and (newest_id is None or number > newest_id):
+                    newest_id = number
+            if reached or not next_cursor or next_cursor == cursor:
+                return None
+            if len(items) >= budget or report["requests"] >= max_pages:
+                return next_cursor
+            cursor = next_cursor
+
+    gap_items: List[Dict[str, Any]] = []
+    latest_items: List[Dict[str, Any]] = []
+    gap_cursor = state.get("cursor")
+    gap_since_id = _as_int(state.get("gap_since_id"))
+    if gap_cursor:
+        # 先补完上次的缺口；仍未补完时本次不再拉取最新数据，保证只存在一段缺口
+        gap_cursor = await run(gap_cursor, gap_since_id, gap_items, max_items)
+        if gap_cursor is None:
+            gap_since_id = None
+    if not gap_cursor and len(gap_items) < max_items and report["requests"] < max_pages:
+        next_cursor = await run(None, since_id, latest_items, max_items - len(gap_items))
+        # 首次运行（没有 since_id）不回溯历史，只有在已有 since_id 时才记录缺口
+        if next_cursor and since_id is not None:
+            gap_cursor, gap_since_id = next_cursor, since_id
+        since_id = newest_id
+
+    baseline_requests = math.ceil(max_items / max(1, page_size))
+    report["requests_saved"] = max(0, baseline_requests - report["requests"])
+    report["bytes_saved"] = report["requests_saved"] * (report["bytes"] // report["requests"] if report["requests"] else 0)
+    # 缺口中的数据比最新一轮拉取的数据旧，排在后面
+    items = latest_items + gap_items
+    report["new"] = len(items)
+    report["since_id"] = None if since_id is None else str(since_id)
+    report["complete"] = not gap_cursor
+
+    store.set(
+        key,
+        {
+            "since_id": report["since_id"],
+            "cursor": gap_cursor,
+            "gap_since_id": None if gap_since_id is None else str(gap_since_id),
+            "runs": state.get("runs", 0) + 1,
+            "requests_saved": state.get("requests_saved", 0) + report["requests_saved"],
+            "bytes_saved": state.get("bytes_saved", 0) + report["bytes_saved"],
+        },
+    )
+    logger.info(
+        f"Incremental {key}: {report['new']} new, {report['duplicates']} duplicates, {report['requests']} requests, "
+        f"saved {report['requests_saved']} requests / {report['bytes_saved']} bytes"
+    )
+    return items, report
@@ -3,17 +3,20 @@ Metal data source implementation
 """
 
 import asyncio
-import json
 import logging
-from datetime import datetime
 from typing import Any, Dict, Optional
 
 import aiohttp
 
 from .base import BaseAPI
+from .cache import cached
+from .dates import DateNormalizer
 
 logger = logging.getLogger("metal_source")
 
+# "2025-04-25T17:00:00Z" -> "2025-04-25 17:00:00"
+_parse_time = DateNormalizer(("%Y-%m-%dT%H:%M:%SZ",))
+
 
 class MetalSource(BaseAPI):
     """Metal price data source based on Metal API"""
@@ -46,6 +49,7 @@ class MetalSource(BaseAPI):
             "description": "Metal price data source, provides price information for metals such as Gold, Silver, Platinum, Palladium, Rhodium.",
         }
 
+    @cached(ttl=60)
     async def get_metal_price(
         self,
         currency_code: str,
@@ -95,15 +99,8 @@ class MetalSource(BaseAPI):
 
             request_url = f"{self.proxy_url}/web-crawling/api/gold-index"
 
-            # Send request using aiohttp
-            async with aiohttp.ClientSession(trust_env=True) as session:
-                async with session.post(request_url, headers=self._headers, params=params, json=payload, timeout=self._timeout) as response:
-                    response.raise_for_status()
-                    # Parse the response
-                    data = await response.json(content_type=None)
-
-            if isinstance(data, str):
-                data = json.loads(data)
+            # Send request
+            data = await self.transport.request_json("POST", request_url, headers=self._headers, params=params, json=payload, timeout=self._timeout, content_type=None, idempotent=True)
 
             if not isinstance(data, dict):
                 raise ValueError(f"Invalid API response format: {data}")
@@ -123,7 +120,7 @@ class MetalSource(BaseAPI):
                     metal_info["mid"] = item.get("mid", "")
                     metal_info["high"] = item.get("high", "")
                     metal_info["low"] = item.get("low", "")
-                    metal_info["originalTime"] = self._parse_time(item.get("originalTime", ""))
+                    metal_info["originalTime"] = _parse_time(item.get("originalTime", ""))
                     metal_info["unit"] = item.get("unit", "")
 
                 result[metal] = metal_info
@@ -144,12 +141,6 @@ class MetalSource(BaseAPI):
             logger.exception(e)
             return {"success": False, "error": error_msg}
 
-    def _parse_time(self, time_str: str) -> str:
-        """Parse time string"""
-        # "2025-04-25T17:00:00Z"
-        # Convert to "2025-04-25 17:00:00"
-        return datetime.strptime(time_str, "%Y-%m-%dT%H:%M:%SZ").strftime("%Y-%m-%d %H:%M:%S")
-
 
 if __name__ == "__main__":
     import os
@@ -0,0 +1,348 @@
+"""
+数据源的自动翻页
+
+- CursorPaginator: 按 cursor（continuation token）顺序翻页的异步迭代器。消费当前页时后台预取下一页，
+  内存中最多同时保留两页；cursor / offset 记录下一条数据的位置，保存后可以从中断处继续。
+- PageWindow: 按页码翻页的异步迭代器。最多 max_in_flight 页同时请求，按页码顺序逐条返回，
+  先到的页不必等待最慢的页；取够 max_items 条、遇到空页或调用 aclose() 时取消尚未完成的请求。
+- MergeIndex: 跨页去重索引，PageWindow 按排名顺序丢弃重复数据，去重后不足时再补充请求额外页。
+"""
+
+import asyncio
+import collections
+import hashlib
+import logging
+import math
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger("data_sources_paging")
+
+DEFAULT_PAGE_RETRIES = 2
+DEFAULT_PAGE_RETRY_DELAY = 1.0
+DEFAULT_MAX_IN_FLIGHT = 3
+# 去重后数量不足时最多补充请求的页数
+DEFAULT_MAX_EXTRA_PAGES = 2
+
+# PageWindow 没有更多数据的标记
+_NO_MORE_ITEMS = object()
+
+PageFetcher = Callable[[Optional[str]], Awaitable[Tuple[List[Any], Optional[str]]]]
+# fetch_page(page, page_size) -> {"success": True, "data": [...]} 或 {"success": False, "error": "..."}
+NumberedPageFetcher = Callable[[int, int], Awaitable[Dict[str, Any]]]
+
+
+def plan_pages(num_results: int, max_page_size: int) -> List[Tuple[int, int]]:
+    """
+    把 num_results 条结果拆分为页
+
+    Returns:
+        List[Tuple[int, int]]: (页码, 本页数量) 列表，页码从 1 开始，最后一页数量可能较少
+    """
+    if num_results <= 0:
+        return []
+    page_size = min(num_results, max_page_size)
+    total_pages = math.ceil(num_results / page_size)
+    pages = []
+    for page in range(1, total_pages + 1):
+        # 最后一页可能需要调整数量
+        if page == total_pages and num_results % page_size != 0:
+            pages.append((page, num_results % page_size))
+        else:
+            pages.append((page, page_size))
+    return pages
+
+
+def plan_extra_pages(num_results: int, max_page_size: int, count: int) -> List[Tuple[int, int]]:
+    """
+    去重后数量不足时可补充请求的页，紧接在 plan_pages 的整页之后，每页取满 max_page_size
+
+    Returns:
+        List[Tuple[int, int]]: (页码, 本页数量) 列表
+    """
+    if num_results <= 0:
+        return []
+    page_size = min(num_results, max_page_size)
+    first = num_results // page_size + 1
+    return [(page, page_size) for page in range(first, first + count)]
+
+
+class MergeIndex:
+    """
+    跨页去重索引
+
+    每条数据以 fields 中所有非空字段作为键，都为空时以规范化标题的哈希作为键；任一键出现过即视为重复，
+    保留最先出现（排名最高）的一条
+    """
+
+    def __init__(self, fields: Sequence[str], title_field: str = "title"):
+        self.fields = tuple(fields)
+        self.title_field = title_field
+        self._seen: Set[str] = set()
+
+    def keys(self, item: Dict[str, Any]) -> List[str]:
+        keys = [f"{field}:{item[field]}" for field in self.fields if item.get(field)]
+        if not keys and item.get(self.title_field):
+            title = " ".join(str(item[self.title_field]).lower().split())
+            keys.append("title:" + hashlib.sha1(title.encode("utf-8")).hexdigest())
+        return keys
+
+    def add(self, item: Dict[str, Any]) -> bool:
+        """
+        记录一条数据
+
+        Returns:
+            bool: 是否为新数据；没有任何键的数据无法判断，视为新数据
+        """
+        keys = self.keys(item)
+        if any(key in self._seen for key in keys):
+            return False
+        self._seen.update(keys)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+
+class CursorPaginator:
+    """
+    按 cursor 自动翻页的异步迭代器
+
+    fetch_page(cursor) 返回 (本页数据, 下一页 cursor)，下一页 cursor 为空表示没有更多数据。
+    单页请求失败时按指数退避重试 max_retries 次，仍然失败则把异常抛给调用方，此时 cursor / offset
+    仍然指向下一条未返回的数据，可用于恢复。
+    迭代结束、出错或 break 后预取都会被取消；break 时由事件循环稍后关闭，需要立即释放时使用 async with 或 aclose()。
+    """
+
+    def __init__(
+        self,
+        fetch_page: PageFetcher,
+        cursor: Optional[str] = None,
+        offset: int = 0,
+        max_items: Optional[int] = None,
+        max_retries: int = DEFAULT_PAGE_RETRIES,
+        retry_delay: float = DEFAULT_PAGE_RETRY_DELAY,
+    ):
+        self._fetch_page = fetch_page
+        self.max_items = max_items
+        self.max_retries = max(0, max_retries)
+        self.retry_delay = retry_delay
+        self.pages = 0
+        self.items = 0
+        self._skip = max(0, offset)
+        self._page: Optional[List[Any]] = None
+        self._index = 0
+        self._page_cursor = cursor
+        self._next_cursor = cursor
+        self._prefetch: Optional[asyncio.Task] = None
+        self._closed = False
+
+    @property
+    def cursor(self) -> Optional[str]:
+        """下一条数据所在页的 cursor，与 offset 一起传回即可从当前位置继续"""
+        if self._page is not None and self._index >= len(self._page):
+            return self._next_cursor
+        return self._page_cursor
+
+    @property
+    def offset(self) -> int:
+        """下一条数据在其所在页中的位置"""
+        if self._page is None:
+            return self._skip
+        if self._index >= len(self._page):
+            return 0
+        return self._index
+
+    @property
+    def exhausted(self) -> bool:
+        """上游是否已经没有更多数据"""
+        return self._page is not None and self._index >= len(self._page) and not self._next_cursor
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        # 异步生成器: 调用方 break 后由事件循环关闭生成器，finally 中取消预取，不会留下未完成的任务
+        try:
+            while not self._closed and (self.max_items is None or self.items < self.max_items):
+                while self._page is None or self._index >= len(self._page):
+                    if self._page is not None and not self._next_cursor:
+                        return
+                    await self._advance()
+
+                item = self._page[self._index]
+                self._index += 1
+                self.items += 1
+                yield item
+        finally:
+            await self.aclose()
+
+    async def _advance(self) -> None:
+        """切换到下一页，并在还需要更多数据时预取再下一页"""
+        cursor = self._next_cursor
+        if self._prefetch is not None:
+            task, self._prefetch = self._prefetch, None
+            page, next_cursor = await task
+        else:
+            page, next_cursor = await self._fetch_with_retry(cursor)
+
+        # 释放上一页后再持有新页，保证最多两页（当前页 + 预取页）
+        self._page = None
+        self._page_cursor, self._next_cursor = cursor, next_cursor
+        self._index, self._skip = min(self._skip, len(page)), 0
+        self._page = page
+        self.pages += 1
+
+        if next_cursor == cursor:
+            # 上游没有推进 cursor，继续请求只会重复同一页
+            logger.warning(f"Pagination cursor did not advance: {cursor}")
+            self._next_cursor = None
+        elif next_cursor and self._wants_more():
+            self._prefetch = asyncio.create_task(self._fetch_with_retry(next_cursor))
+
+    def _wants_more(self) -> bool:
+        if self.max_items is None:
+            return True
+        return self.items + len(self._page) - self._index < self.max_items
+
+    async def _fetch_with_retry(self, cursor: Optional[str]) -> Tuple[List[Any], Optional[str]]:
+        attempt = 0
+        while True:
+            try:
+                page, next_cursor = await self._fetch_page(cursor)
+                return list(page), next_cursor
+            except Exception as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self.retry_delay * (2**attempt)
+                attempt += 1
+                logger.warning(f"Fetching page {cursor!r} failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        """停止翻页并取消尚未完成的预取"""
+        self._closed = True
+        task, self._prefetch = self._prefetch, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        elif task is not None and not task.cancelled():
+            task.exception()
+
+    async def __aenter__(self) -> "CursorPaginator":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+
+class PageWindow:
+    """
+    按页码翻页的异步迭代器，按页码顺序逐条返回数据
+
+    fetch_page 使用数据源的返回格式: 成功页的 data 为数据列表，失败页记录到 errors 后跳过（与并发请求所有页再合并的行为一致）。
+    成功但为空的页表示没有更多结果，之后的页不再请求。
+    传入 merge 时丢弃重复数据；计划的页取完后若因去重不足 max_items 条，依次请求 extra_pages 直到取够。
+    迭代结束或 break 后尚未完成的页都会被取消；break 时由事件循环稍后关闭，需要立即释放时使用 async with 或 aclose()。
+    """
+
+    def __init__(
+        self,
+        fetch_page: NumberedPageFetcher,
+        pages: List[Tuple[int, int]],
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        max_items: Optional[int] = None,
+        merge: Optional[MergeIndex] = None,
+        extra_pages: Iterable[Tuple[int, int]] = (),
+    ):
+        self._fetch_page = fetch_page
+        self._plan: Deque[Tuple[int, int]] = collections.deque(pages)
+        self._extra: Deque[Tuple[int, int]] = collections.deque(extra_pages)
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_items = max_items
+        self.merge = merge
+        self.pages = 0
+        self.extra_pages = 0
+        self.items = 0
+        self.duplicates = 0
+        self.errors: List[str] = []
+        self._in_flight: Deque[Tuple[int, asyncio.Task]] = collections.deque()
+        self._page: List[Any] = []
+        self._index = 0
+        self._closed = False
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        # 异步生成器: 调用方 break 后由事件循环关闭生成器，finally 中取消尚未完成的页
+        try:
+            while self.max_items is None or self.items < self.max_items:
+                item = await self._next_item()
+                if item is _NO_MORE_ITEMS:
+                    return
+                if self.merge is not None and not self.merge.add(item):
+                    self.duplicates += 1
+                    continue
+
+                self.items += 1
+                if self.max_items is not None and self.items >= self.max_items:
+                    # 已取够数据，立即取消尚未完成的页，不必等调用方再次迭代
+                    await self._cancel_in_flight()
+                yield item
+        finally:
+            await self.aclose()
+
+    async def _next_item(self) -> Any:
+        """取下一条数据，没有更多数据时返回 _NO_MORE_ITEMS"""
+        while self._index >= len(self._page):
+            if self._closed:
+                return _NO_MORE_ITEMS
+            self._fill()
+            if not self._in_flight:
+                return _NO_MORE_ITEMS
+            page, task = self._in_flight.popleft()
+            result = await task
+            self._page, self._index = [], 0
+            self.pages += 1
+            if not result.get("success"):
+                self.errors.append(f"Page {page}: {result.get('error')}")
+                continue
+            if not result["data"]:
+                # 空页说明结果已经取完，取消后续页
+                return _NO_MORE_ITEMS
+            self._page = result["data"]
+
+        item = self._page[self._index]
+        self._index += 1
+        return item
+
+    def _fill(self) -> None:
+        while self._plan and len(self._in_flight) < self.max_in_flight:
+            page, page_size = self._plan.popleft()
+            self._in_flight.append((page, asyncio.create_task(self._fetch_page(page, page_size))))
+        if not self._plan and not self._in_flight and self._extra and self.duplicates and self.max_items is not None:
+            # 计划的页已取完但去重后不足，逐页补充，取够即停
+            page, page_size = self._extra.popleft()
+            self.extra_pages += 1
+            self._in_flight.append((page, asyncio.create_task(self._fetch_page(page, page_size))))
+
+    async def _cancel_in_flight(self) -> None:
+        self._plan.clear()
+        self._extra.clear()
+        tasks = [task for _, task in self._in_flight]
+        self._in_flight.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def aclose(self) -> None:
+        """停止翻页并取消尚未完成的页"""
+        self._closed = True
+        await self._cancel_in_flight()
+
+    async def collect(self) -> List[Any]:
+        """取出所有数据"""
+        return [item async for item in self]
+
+    async def __aenter__(self) -> "PageWindow":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
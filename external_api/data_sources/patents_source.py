@@ -2,17 +2,36 @@
 专利数据源实现
 """
 
-import asyncio
 import logging
-import math
-from typing import Any, Dict, Optional
-
-import aiohttp
+from typing import Any, Dict, List, Optional, Tuple
 
 from .base import BaseAPI
+from .cache import cached
+from .extractors import as_records, compile_record
+from .paging import DEFAULT_MAX_EXTRA_PAGES, DEFAULT_MAX_IN_FLIGHT, MergeIndex, PageWindow, plan_extra_pages, plan_pages
+from .records import Patent
 
 logger = logging.getLogger("patents_source")
 
+MAX_PAGE_SIZE = 50
+
+_extract_patent = compile_record(
+    {
+        "title": "title",
+        "snippet": "snippet",
+        "link": "link",
+        "priorityDate": "priorityDate",
+        "filingDate": "filingDate",
+        "grantDate": "grantDate",
+        "inventor": "inventor",
+        "assignee": "assignee",
+        "publicationNumber": "publicationNumber",
+        "pdfUrl": "pdfUrl",
+    },
+    name="extract_patent",
+)
+_extract_patent_record = as_records(_extract_patent, Patent)
+
 
 class PatentSource(BaseAPI):
     """Patent data source"""
@@ -54,6 +73,7 @@ class PatentSource(BaseAPI):
         page: int,
         start_time: Optional[str],
         end_time: Optional[str],
+        raw_records: bool = False,
     ) -> Dict[str, Any]:
         """
         获取单页专利数据
@@ -65,6 +85,7 @@ class PatentSource(BaseAPI):
             page(int): 页码
             start_time(str): 开始时间
             end_time(str): 结束时间
+            raw_records(bool): 是否解析为 Patent 记录
 
         Returns:
             Dict[str, Any]: 单页搜索结果
@@ -80,33 +101,17 @@ class PatentSource(BaseAPI):
         request_url = f"{self.proxy_url}/patents"
 
         try:
-            async with aiohttp.ClientSession(trust_env=True) as session:
-                async with session.post(request_url, headers=self.headers, json=payload, timeout=self.timeout) as response:
-                    response.raise_for_status()
-                    data = await response.json()
+            data = await self.transport.request_json("POST", request_url, headers=self.headers, json=payload, timeout=self.timeout, idempotent=True)
 
             organic = data.get("organic", [])
-            results = []
-            for item in organic:
-                results.append(
-                    {
-                        "title": item.get("title"),
-                        "snippet": item.get("snippet"),
-                        "link": item.get("link"),
-                        "priorityDate": item.get("priorityDate"),
-                        "filingDate": item.get("filingDate"),
-                        "grantDate": item.get("grantDate"),
-                        "inventor": item.get("inventor"),
-                        "assignee": item.get("assignee"),
-                        "publicationNumber": item.get("publicationNumber"),
-                        "pdfUrl": item.get("pdfUrl"),
-                    }
-                )
+            extract = _extract_patent_record if raw_records else _extract_patent
+            results = [extract(item) for item in organic]
             return {"success": True, "data": results}
         except Exception as e:
             logger.error(f"_fetch_patents_page error: page={page}, error={e}")
             return {"success": False, "error": str(e)}
 
+    @cached(ttl=3600)
     async def search_patents(
         self,
         query: str,
@@ -114,6 +119,7 @@ class PatentSource(BaseAPI):
         num_results: int = 10,
         start_time: Optional[str] = None,
         end_time: Optional[str] = None,
+        raw_records: bool = False,
     ) -> Dict[str, Any]:
         """
         Search for patents.
@@ -124,6 +130,8 @@ class PatentSource(BaseAPI):
             num_results(int): Number of results to return, default is 10, max is 500
             start_time(str): Start date YYYYMMDD, optional.
             end_time(str): End date YYYYMMDD, optional.
+            raw_records(bool): Return patents as compact Patent records (read-only mappings, to_dict() gives the dict below)
+                instead of dicts, to save memory when accumulating many patents, default is False.
 
         Returns:
             Dict[str, Any]: Search results, format:
@@ -165,63 +173,107 @@ class PatentSource(BaseAPI):
         #     ...     print(f"Search succeeded, {len(result['data']['patents'])} results returned")
         # """
         try:
-            # 关键词裁剪
-            keywords = query.split(" ")
-            if len(keywords) > 5:
-                query = " ".join(keywords[:5])
-
-            # 限制最大结果数
-            if num_results > 500:
-                num_results = 500
-
-            # 计算分页
-            MAX_PAGE_SIZE = 50
-            page_size = min(num_results, MAX_PAGE_SIZE)
-            total_pages = math.ceil(num_results / page_size)
-
-            # 并发请求所有页面
-            tasks = []
-            for page in range(1, total_pages + 1):
-                # 最后一页可能需要调整数量
-                if page == total_pages and num_results % page_size != 0:
-                    current_page_size = num_results % page_size
-                else:
-                    current_page_size = page_size
-
-                tasks.append(
-                    self._fetch_patents_page(
-                        query=query,
-                        assignee=assignee,
-                        page_size=current_page_size,
-                        page=page,
-                        start_time=start_time,
-                        end_time=end_time,
-                    )
-                )
-
-            # 等待所有请求完成
-            results = await asyncio.gather(*tasks)
-
-            # 合并结果
-            all_patents = []
-            has_error = False
-            error_msgs = []
-
-            for result in results:
-                if result["success"]:
-                    all_patents.extend(result["data"])
-                else:
-                    has_error = True
-                    error_msgs.append(result["error"])
+            query, num_results = self._normalize_query(query, num_results)
 
-            # 如果有部分失败，记录错误但仍返回成功获取的数据
-            if has_error:
-                logger.warning(f"Some patent pages failed: {', '.join(error_msgs)}")
+            # 并发请求所有页面，按页码顺序合并
+            pages = plan_pages(num_results, MAX_PAGE_SIZE)
+            window = self._patent_pages(
+                query, assignee, start_time, end_time, pages, max_in_flight=len(pages), max_items=num_results, raw_records=raw_records
+            )
+            all_patents = await window.collect()
 
-            # 限制返回数量
-            all_patents = all_patents[:num_results]
+            # 如果有部分失败，记录错误但仍返回成功获取的数据
+            if window.errors:
+                logger.warning(f"Some patent pages failed: {', '.join(window.errors)}")
+            if window.duplicates:
+                logger.info(f"Dropped {window.duplicates} duplicate patent results, fetched {window.extra_pages} extra pages")
 
             return {"success": True, "data": {"patents": all_patents}}
         except Exception as e:
             logger.error(f"search_patents error: {e}")
             return {"success": False, "error": str(e)}
+
+    def iter_patents(
+        self,
+        query: str,
+        assignee: Optional[str] = None,
+        num_results: int = 10,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        raw_records: bool = False,
+    ) -> PageWindow:
+        """
+        Iterate over patent search results page by page.
+
+        Yields the same patent dicts as search_patents, in page order, as soon as each page arrives instead of
+        waiting for all pages. At most max_in_flight pages are requested at once; outstanding page requests are
+        cancelled once num_results unique patents were yielded, the results run out, or the iterator is closed early.
+        Patents repeated across pages (same publicationNumber or link) are dropped, keeping rank order.
+
+        Args:
+            query(str): Search keywords. up to 5.
+            assignee(str): The assignee of the patents, e.g. "Apple Inc.".
+            num_results(int): Maximum number of results to yield, default is 10, max is 500
+            start_time(str): Start date YYYYMMDD, optional.
+            end_time(str): End date YYYYMMDD, optional.
+            max_in_flight(int): Maximum number of pages requested concurrently, default is 3
+            raw_records(bool): Yield compact Patent records instead of dicts, see search_patents, default is False
+
+        Returns:
+            PageWindow: async iterator of patent dicts; failed pages are skipped and listed in its errors attribute
+
+        Example:
+            >>> async with client.patent.iter_patents("machine learning", num_results=200) as patents:
+            ...     async for patent in patents:
+            ...         print(patent["title"])
+        """
+        query, num_results = self._normalize_query(query, num_results)
+        pages = plan_pages(num_results, MAX_PAGE_SIZE)
+        return self._patent_pages(
+            query, assignee, start_time, end_time, pages, max_in_flight=max_in_flight, max_items=num_results, raw_records=raw_records
+        )
+
+    def _patent_pages(
+        self,
+        query: str,
+        assignee: Optional[str],
+        start_time: Optional[str],
+        end_time: Optional[str],
+        pages: List[Tuple[int, int]],
+        max_in_flight: int,
+        max_items: int,
+        raw_records: bool = False,
+    ) -> PageWindow:
+        async def fetch_page(page: int, page_size: int) -> Dict[str, Any]:
+            return await self._fetch_patents_page(
+                query=query,
+                assignee=assignee,
+                page_size=page_size,
+                page=page,
+                start_time=start_time,
+                end_time=end_time,
+                raw_records=raw_records,
+            )
+
+        # 上游分页可能重叠，按 publicationNumber / link 或标题哈希去重，不足时补充请求额外页
+        return PageWindow(
+            fetch_page,
+            pages,
+            max_in_flight=max_in_flight,
+            max_items=max_items,
+            merge=MergeIndex(("publicationNumber", "link")),
+            extra_pages=plan_extra_pages(max_items, MAX_PAGE_SIZE, DEFAULT_MAX_EXTRA_PAGES),
+        )
+
+    def _normalize_query(self, query: str, num_results: int) -> Tuple[str, int]:
+        """裁剪关键词并限制最大结果数"""
+        # 关键词裁剪
+        keywords = query.split(" ")
+        if len(keywords) > 5:
+            query = " ".join(keywords[:5])
+
+        # 限制最大结果数
+        if num_results > 500:
+            num_results = 500
+        return query, num_results
@@ -3,17 +3,67 @@ Pinterest data source implementation
 """
 
 import asyncio
-import json
 import logging
-from datetime import datetime
 from typing import Any, Dict, Optional
 
 import aiohttp
 
 from .base import BaseAPI
+from .cache import cached
+from .dates import DateNormalizer
+from .extractors import Const, Field, as_records, compile_path, compile_record
+from .records import Pin
 
 logger = logging.getLogger("pinterest_source")
 
+# New API date format example: "Tue, 04 Mar 2025 12:26:23 +0000", some responses use "Thu Mar 13 18:08:35 +0000 2025"
+_format_date = DateNormalizer(("%a, %d %b %Y %H:%M:%S %z", "%a %b %d %H:%M:%S %z %Y"), empty_as_none=True)
+
+_extract_video_streams = compile_record({"V_HLSV4": "videos.video_list.V_HLSV4", "V_720P": "videos.video_list.V_720P"})
+_extract_video_stream = compile_record({"url": Field("url", ""), "duration": Field("duration", 0)})
+_original_image_url = compile_path("images.original.url", "")
+_orig_image_url = compile_path("images.orig.url", "")
+
+
+def _pin_video(pin_data: Dict[str, Any]) -> Dict[str, Any]:
+    """视频信息，只包含存在的清晰度"""
+    if not pin_data.get("videos", None):
+        return {"has_video": False}
+    video: Dict[str, Any] = {"has_video": True}
+    for quality, stream in _extract_video_streams(pin_data).items():
+        if stream:
+            video[quality] = _extract_video_stream(stream)
+    return video
+
+
+def _pin_image(pin_data: Dict[str, Any]) -> Dict[str, Any]:
+    """原图地址，original 没有时使用 orig"""
+    return {"url": _original_image_url(pin_data) or _orig_image_url(pin_data)}
+
+
+_extract_pin = compile_record(
+    {
+        "id": Field("id", ""),
+        "title": Field("title", ""),
+        "description": Field("description", ""),
+        "alt_text": Field("alt_text", ""),
+        "auto_alt_text": Field("auto_alt_text", ""),
+        "images": _pin_image,
+        "videos": _pin_video,
+        "created_at": Const("2024-03-21 08:29:49"),  # 创建时间
+        "likes": Field("reaction_counts.1", 0),
+        "pinner": {
+            "id": Field("pinner.id", ""),
+            "image_url": Field("pinner.image_large_url", ""),
+            "follower_count": Field("pinner.follower_count", 0),
+            "username": Field("pinner.username", ""),
+            "full_name": Field("pinner.full_name", ""),
+        },
+    },
+    name="extract_pin",
+)
+_extract_pin_record = as_records(_extract_pin, Pin)
+
 
 class PinterestSource(BaseAPI):
     """Pinterest data source"""
@@ -39,7 +89,7 @@ class PinterestSource(BaseAPI):
         return {"name": self.source_name, "description": "Pinterest data source, provides user and pin search features for Pinterest."}
 
     async def search_pins(
-        self, keyword: str, num: int = 10, nextPageCursor: Optional[str] = None, sort: str = "relevance"
+        self, keyword: str, num: int = 10, nextPageCursor: Optional[str] = None, sort: str = "relevance", raw_records: bool = False
     ) -> Dict[str, Any]:
         """
         Search related pins.
@@ -51,6 +101,8 @@ class PinterestSource(BaseAPI):
             num(int): Number of results per page, e.g. 10
             nextPageCursor(str): Pagination cursor for next page, default None for first page
             sort(str): Sort order, default "relevance", options: "relevance" or "recent"
+            raw_records(bool): Return pins as compact Pin records (read-only mappings, to_dict() gives the dict below)
+                instead of dicts, to save memory when accumulating many pins, default False
 
         Returns:
             Dict[str, Any]: Dictionary containing pin search results, e.g.
@@ -117,16 +169,8 @@ class PinterestSource(BaseAPI):
 
             request_url = f"{self.proxy_url}/pinterest/pins/advance"
 
-            # Send request using aiohttp
-            async with aiohttp.ClientSession(trust_env=True) as session:
-                async with session.post(request_url, headers=self._headers, json=params, timeout=self._timeout) as response:
-                    response.raise_for_status()
-                    # Parse the response
-                    data = await response.json(content_type=None)
-
-            # The API returns a JSON string, need to parse it first
-            if isinstance(data, str):
-                data = json.loads(data)
+            # Send request
+            data = await self.transport.request_json("POST", request_url, headers=self._headers, json=params, timeout=self._timeout, content_type=None, idempotent=True)
 
             if not isinstance(data, dict):
                 raise ValueError(f"Invalid API response format: {data}")
@@ -134,7 +178,7 @@ class PinterestSource(BaseAPI):
             if "data" not in data:
                 raise ValueError(f"API response missing data field: {data}")
 
-            pins = self._parse_pins(data)
+            pins = self._parse_pins(data, raw_records)
 
             return {"success": True, "data": {"keyword": keyword, "count": len(pins), "pins": pins, "cursor": data.get("nextPageCursor")}}
 
@@ -152,6 +196,7 @@ class PinterestSource(BaseAPI):
             logger.exception(e)
             return {"success": False, "error": error_msg}
 
+    @cached(ttl=600)
     async def get_user_info(self, username: str, user_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Get detailed information of a Pinterest user.
@@ -194,16 +239,8 @@ class PinterestSource(BaseAPI):
             # Set request parameters
             params = {"keyword": username}
 
-            # Send request using aiohttp
-            async with aiohttp.ClientSession(trust_env=True) as session:
-                async with session.get(request_url, headers=self._headers, params=params, timeout=self._timeout) as response:
-                    response.raise_for_status()
-                    # Parse the response
-                    data = await response.json(content_type=None)
-
-            # Parse response data
-            if isinstance(data, str):
-                data = json.loads(data)
+            # Send request
+            data = await self.transport.request_json("GET", request_url, headers=self._headers, params=params, timeout=self._timeout, content_type=None)
 
             if not isinstance(data, dict):
                 raise ValueError(f"Invalid API response format: {data}")
@@ -225,73 +262,17 @@ class PinterestSource(BaseAPI):
             logger.exception(e)
             return {"success": False, "error": error_msg}
 
-    def _format_date(self, date_str: Optional[str]) -> Optional[str]:
-        """Format date string"""
-        if not date_str:
-            return None
-        try:
-            # New API date format example: "Thu Mar 13 18:08:35 +0000 2025"
-            # New API date format example: "Tue, 04 Mar 2025 12:26:23 +0000",
-            dt = datetime.strptime(date_str, "%a, %d %b %Y %H:%M:%S %z")
-            return dt.strftime("%Y-%m-%d %H:%M:%S")
-        except Exception:
-            return date_str
-
-    def _parse_pins(self, data: dict[str, Any]) -> list[dict[str, Any]]:
+    def _parse_pins(self, data: dict[str, Any], raw_records: bool = False) -> list[dict[str, Any]]:
         print(f"xwy-pins, {data}")
         print("-" * 100)
         print("\n")
+        extract = _extract_pin_record if raw_records else _extract_pin
         pins = []
         for pin_data in data.get("data", []):
             if not isinstance(pin_data, dict):
                 logger.warning(f"Skip invalid pin data: {pin_data}")
                 continue
-
-            video = {"has_video": False}
-            if pin_data.get("videos", None):
-                V_HLSV4 = None
-                if pin_data.get("videos", {}).get("video_list", {}).get("V_HLSV4", None):
-                    V_HLSV4 = {
-                        "url": pin_data.get("videos", {}).get("video_list", {}).get("V_HLSV4", {}).get("url", ""),
-                        "duration": pin_data.get("videos", {}).get("video_list", {}).get("V_HLSV4", {}).get("duration", 0),
-                    }
-
-                V_720P = None
-                if pin_data.get("videos", {}).get("video_list", {}).get("V_720P", None):
-                    V_720P = {
-                        "url": pin_data.get("videos", {}).get("video_list", {}).get("V_720P", {}).get("url", ""),
-                        "duration": pin_data.get("videos", {}).get("video_list", {}).get("V_720P", {}).get("duration", 0),
-                    }
-
-                video: Dict[str, Any] = {"has_video": True}
-                if V_HLSV4:
-                    video["V_HLSV4"] = V_HLSV4
-                if V_720P:
-                    video["V_720P"] = V_720P
-
-            image_url = pin_data.get("images", {}).get("original", {}).get("url", "")
-            if len(image_url) <= 0:
-                image_url = pin_data.get("images", {}).get("orig", {}).get("url", "")
-
-            pin = {
-                "id": pin_data.get("id", ""),
-                "title": pin_data.get("title", ""),
-                "description": pin_data.get("description", ""),
-                "alt_text": pin_data.get("alt_text", ""),
-                "auto_alt_text": pin_data.get("auto_alt_text", ""),
-                "images": {"url": image_url},
-                "videos": video,
-                "created_at": "2024-03-21 08:29:49",  # 创建时间
-                "likes": pin_data.get("reaction_counts", {}).get("1", 0),
-                "pinner": {
-                    "id": pin_data.get("pinner", {}).get("id", ""),
-                    "image_url": pin_data.get("pinner", {}).get("image_large_url", ""),
-                    "follower_count": pin_data.get("pinner", {}).get("follower_count", 0),
-                    "username": pin_data.get("pinner", {}).get("username", ""),
-                    "full_name": pin_data.get("pinner", {}).get("full_name", ""),
-                },
-            }
-            pins.append(pin)
+            pins.append(extract(pin_data))
         return pins
 
     def _parse_user_info(self, resp: dict[str, Any]) -> dict[str, Any]:
@@ -317,7 +298,7 @@ class PinterestSource(BaseAPI):
             "image_url": data.get("image_large_url", ""),  # User avatar url
             "pin_count": data.get("pin_count", 0),  # Number of pins published by user
             "follower_count": data.get("follower_count", 0),  # Number of followers
-            "last_pin_save_time": self._format_date(data.get("last_pin_save_time", "")),  # Last pin publish time
+            "last_pin_save_time": _format_date(data.get("last_pin_save_time", "")),  # Last pin publish time
             "recent_pin_images": recent_pin_images,  # Recent pin image urls
         }
 
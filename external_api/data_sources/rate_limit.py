@@ -0,0 +1,234 @@
+"""
+按上游主机（X-Original-Host）的客户端限流
+
+令牌桶按预约方式实现: 每次请求先预约一个令牌并得到需要等待的时间，然后在协程中等待，
+同一进程内所有协程、所有事件循环共享同一个桶。
+backend="sqlite" 时桶状态保存在本地 SQLite 文件中，通过写事务加锁，多个进程共享配额。
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+DEFAULT_RATE_LIMIT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "external_api", "rate_limits.sqlite3")
+
+
+class RateLimitExceeded(asyncio.TimeoutError):
+    """等待令牌的时间超过了请求剩余的超时时间"""
+
+    def __init__(self, host: str, wait: float):
+        self.host = host
+        self.wait = wait
+        super().__init__(f"Rate limit for {host} requires waiting {wait:.2f}s")
+
+
+class TokenBucket(ABC):
+    """令牌桶基类，rate 为每秒补充的令牌数，burst 为桶容量"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError(f"rate must be positive: {rate}")
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1.0, rate))
+
+    @abstractmethod
+    def reserve(self, max_wait: Optional[float] = None) -> Optional[float]:
+        """
+        预约一个令牌
+
+        Args:
+            max_wait: 最长可等待时间（秒），None 表示不限
+
+        Returns:
+            Optional[float]: 需要等待的秒数；超过 max_wait 时不预约并返回 None
+        """
+
+    def _take(self, tokens: float, elapsed: float, max_wait: Optional[float]) -> tuple:
+        """根据上次剩余令牌和经过的时间计算预约结果，返回 (新的令牌数, 等待时间)"""
+        tokens = min(self.burst, tokens + elapsed * self.rate) - 1
+        wait = -tokens / self.rate if tokens < 0 else 0.0
+        if max_wait is not None and wait > max_wait:
+            return tokens + 1, None
+        return tokens, wait
+
+
+class MemoryTokenBucket(TokenBucket):
+    """进程内令牌桶"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        super().__init__(rate, burst)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait: Optional[float] = None) -> Optional[float]:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens, wait = self._take(self._tokens, now - self._updated, max_wait)
+            self._updated = now
+        return wait
+
+
+class SqliteTokenBucket(TokenBucket):
+    """
+    多进程共享的令牌桶，状态保存在 SQLite 中
+
+    使用 BEGIN IMMEDIATE 写事务保证多个进程的预约互斥，时间使用 time.time()
+    """
+
+    def __init__(self, host: str, rate: float, burst: Optional[float] = None, path: str = DEFAULT_RATE_LIMIT_PATH):
+        super().__init__(rate, burst)
+        self.host = host
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS buckets (host TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)")
+
+    def reserve(self, max_wait: Optional[float] = None) -> Optional[float]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = self._conn.execute("SELECT tokens, updated_at FROM buckets WHERE host = ?", (self.host,)).fetchone()
+                tokens, updated_at = row if row is not None else (self.burst, now)
+                tokens, wait = self._take(tokens, max(0.0, now - updated_at), max_wait)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO buckets (host, tokens, updated_at) VALUES (?, ?, ?)", (self.host, tokens, now)
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return wait
+
+
+class RateLimiter:
+    """
+    按主机的限流器
+
+    limits 形如 {"twitter154.p.rapidapi.com": {"rate": 5, "burst": 10}}，
+    default 为未单独配置的主机使用的限制，None 表示不限流
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, Dict[str, float]]] = None,
+        default: Optional[Dict[str, float]] = None,
+        backend: str = "memory",
+        path: Optional[str] = None,
+    ):
+        if backend not in ("memory", "sqlite"):
+            raise ValueError(f"Unknown rate limit backend: {backend}")
+        self.limits = dict(limits or {})
+        self.default = default
+        self.backend = backend
+        self.path = path or DEFAULT_RATE_LIMIT_PATH
+        self._buckets: Dict[str, Optional[TokenBucket]] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "RateLimiter":
+        """根据 client.config 创建限流器"""
+        return cls(
+            limits=config.get("rate_limits"),
+            default=config.get("rate_limit_default"),
+            backend=config.get("rate_limit_backend") or "memory",
+            path=config.get("rate_limit_path"),
+        )
+
+    def _bucket(self, host: str) -> Optional[TokenBucket]:
+        with self._lock:
+            if host in self._buckets:
+                return self._buckets[host]
+            limit = self.limits.get(host, self.default)
+            bucket: Optional[TokenBucket] = None
+            if limit:
+                if self.backend == "sqlite":
+                    bucket = SqliteTokenBucket(host, limit["rate"], limit.get("burst"), path=self.path)
+                else:
+                    bucket = MemoryTokenBucket(limit["rate"], limit.get("burst"))
+            self._buckets[host] = bucket
+            return bucket
+
+    def _host_stats(self, host: str) -> Dict[str, float]:
+        stats = self._stats.get(host)
+        if stats is None:
+            stats = self._stats[host] = {
+                "acquired": 0,
+                "delayed": 0,
+                "rejected": 0,
+                "queue_depth": 0,
+                "max_queue_depth": 0,
+                "wait_time_total": 0.0,
+                "wait_time_max": 0.0,
+            }
+        return stats
+
+    async def acquire(self, host: str, max_wait: Optional[float] = None) -> float:
+        """
+        获取一个令牌，必要时等待
+
+        Args:
+            host: 上游主机
+            max_wait: 最长等待时间（秒），None 表示不限
+
+        Returns:
+            float: 实际等待的秒数
+
+        Raises:
+            RateLimitExceeded: 需要等待的时间超过 max_wait
+        """
+        bucket = self._bucket(host)
+        if bucket is None:
+            return 0.0
+
+        if self.backend == "sqlite":
+            wait = await asyncio.to_thread(bucket.reserve, max_wait)
+        else:
+            wait = bucket.reserve(max_wait)
+
+        with self._lock:
+            stats = self._host_stats(host)
+            if wait is None:
+                stats["rejected"] += 1
+                raise RateLimitExceeded(host, max_wait or 0.0)
+            stats["acquired"] += 1
+            if wait > 0:
+                stats["delayed"] += 1
+                stats["queue_depth"] += 1
+                stats["max_queue_depth"] = max(stats["max_queue_depth"], stats["queue_depth"])
+                stats["wait_time_total"] += wait
+                stats["wait_time_max"] = max(stats["wait_time_max"], wait)
+
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            finally:
+                with self._lock:
+                    self._host_stats(host)["queue_depth"] -= 1
+        return wait
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        获取各主机的限流统计
+
+        Returns:
+            Dict[str, Dict[str, float]]: 主机 -> acquired（放行数）、delayed（需要等待的次数）、rejected（超时拒绝数）、
+            queue_depth / max_queue_depth（当前/最大等待中的请求数）、wait_time_total / wait_time_max / wait_time_avg（秒）
+        """
+        with self._lock:
+            result = {}
+            for host, stats in self._stats.items():
+                host_stats = dict(stats)
+                host_stats["wait_time_avg"] = stats["wait_time_total"] / stats["delayed"] if stats["delayed"] else 0.0
+                result[host] = host_stats
+            return result
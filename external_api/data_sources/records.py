@@ -0,0 +1,191 @@
+"""
+紧凑的结果记录
+
+解析后的推文、Pin、行情、专利、论文和酒店默认是嵌套的 dict，代理累积上万条结果时内存主要花在 dict 上。
+能力方法传入 raw_records=True 时改为返回这里的记录对象:
+
+- 基于 __slots__，没有实例 __dict__，单条记录的内存约为同样字段 dict 的三分之一
+- 实现只读的 Mapping 接口，record["text"]、record.get("author")、与 dict 比较相等等用法不变，也可以用属性访问
+- to_dict() 递归转换回与默认返回值完全相同的 dict；codec.dumps 会自动调用，可直接作为 JSON 返回
+- 可选字段（如推文的 referenced_tweets）为 None 时视为不存在，与原来不写入该键一致
+"""
+
+from collections.abc import Mapping
+from typing import Any, Dict, FrozenSet, Iterator, Optional, Tuple, Type
+
+
+class Record(Mapping):
+    """
+    记录基类
+
+    子类用 __slots__ 声明字段（顺序即 to_dict 的键顺序），通过类参数声明嵌套记录类型和可选字段:
+
+        class SearchTweet(Record, nested={"author": TweetAuthor}):
+            __slots__ = ("id", "text", "author")
+    """
+
+    __slots__ = ()
+
+    _fields: Tuple[str, ...] = ()
+    _field_set: FrozenSet[str] = frozenset()
+    _nested: Dict[str, Type["Record"]] = {}
+    _optional: FrozenSet[str] = frozenset()
+
+    def __init_subclass__(cls, nested: Optional[Dict[str, Type["Record"]]] = None, optional: Tuple[str, ...] = (), **kwargs: Any):
+        super().__init_subclass__(**kwargs)
+        slots = cls.__dict__.get("__slots__", ())
+        if isinstance(slots, str) or not isinstance(slots, tuple):
+            raise TypeError(f"{cls.__name__}.__slots__ must be a tuple of field names")
+        cls._fields = slots
+        cls._field_set = frozenset(slots)
+        cls._nested = dict(nested or {})
+        cls._optional = frozenset(optional)
+        cls.__match_args__ = slots
+        # 生成按字段赋值的 __init__，比逐个 setattr 循环快
+        arguments = "".join(f", {name}=None" for name in slots)
+        body = "".join(f"\n    self.{name} = {name}" for name in slots) or "\n    pass"
+        namespace: Dict[str, Any] = {}
+        exec(f"def __init__(self{arguments}):{body}", namespace)
+        namespace["__init__"].__qualname__ = f"{cls.__qualname__}.__init__"
+        cls.__init__ = namespace["__init__"]
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._field_set:
+            value = getattr(self, key)
+            if value is not None or key not in self._optional:
+                return value
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        if not self._optional:
+            return iter(self._fields)
+        return (name for name in self._fields if name not in self._optional or getattr(self, name) is not None)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self)
+        return f"{type(self).__name__}({fields})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为与默认返回格式相同的 dict，嵌套的记录、列表和 dict 都会复制"""
+        return {name: to_plain(getattr(self, name)) for name in self}
+
+
+def to_plain(value: Any) -> Any:
+    """把结果中的记录递归转换为 dict，其余值原样保留（列表和 dict 会复制）"""
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [to_plain(item) for item in value]
+    if isinstance(value, dict):
+        return {key: to_plain(item) for key, item in value.items()}
+    return value
+
+
+# Twitter
+
+
+class TweetAuthor(Record):
+    __slots__ = ("id", "name", "username", "followers_count", "is_verified", "is_blue_verified")
+
+
+class TweetMetrics(Record):
+    __slots__ = ("retweet_count", "reply_count", "like_count", "quote_count", "view_count", "bookmark_count")
+
+
+class SearchTweet(Record, nested={"author": TweetAuthor, "public_metrics": TweetMetrics}):
+    """search_tweets / iter_tweets 返回的推文"""
+
+    __slots__ = ("id", "created_at", "text", "media_urls", "video_urls", "author", "public_metrics")
+
+
+class TwitterUserMetrics(Record):
+    __slots__ = ("followers_count", "following_count", "tweet_count", "listed_count", "like_count")
+
+
+class TwitterUser(Record, nested={"public_metrics": TwitterUserMetrics}):
+    __slots__ = (
+        "id",
+        "username",
+        "name",
+        "created_at",
+        "description",
+        "location",
+        "url",
+        "profile_image_url",
+        "profile_banner_url",
+        "public_metrics",
+        "verified",
+        "blue_verified",
+        "private",
+        "bot",
+    )
+
+
+class Tweet(Record, nested={"public_metrics": TweetMetrics, "user": TwitterUser}, optional=("referenced_tweets",)):
+    """get_user_tweets 返回的推文，referenced_tweets 保持为 dict"""
+
+    __slots__ = ("id", "created_at", "text", "language", "media_urls", "video_urls", "public_metrics", "user", "referenced_tweets")
+
+
+# Pinterest
+
+
+class Pinner(Record):
+    __slots__ = ("id", "image_url", "follower_count", "username", "full_name")
+
+
+class Pin(Record, nested={"pinner": Pinner}):
+    """search_pins 返回的 Pin，images / videos 保持为 dict"""
+
+    __slots__ = ("id", "title", "description", "alt_text", "auto_alt_text", "images", "videos", "created_at", "likes", "pinner")
+
+
+# Yahoo Finance
+
+
+class PriceBar(Record):
+    """get_stock_price 按 records 格式返回的单根 K 线"""
+
+    __slots__ = ("date", "open", "high", "low", "close", "volume")
+
+
+# 专利和学术
+
+
+class Patent(Record):
+    __slots__ = (
+        "title",
+        "snippet",
+        "link",
+        "priorityDate",
+        "filingDate",
+        "grantDate",
+        "inventor",
+        "assignee",
+        "publicationNumber",
+        "pdfUrl",
+    )
+
+
+class Paper(Record):
+    __slots__ = ("title", "snippet", "link", "publicationInfo", "year", "citedBy", "pdfUrl")
+
+
+# Booking
+
+
+class HotelLocation(Record):
+    __slots__ = ("latitude", "longitude")
+
+
+class HotelPrice(Record):
+    __slots__ = ("currency", "amount", "price_per_night")
+
+
+class Hotel(Record, nested={"location": HotelLocation, "price": HotelPrice}):
+    """酒店搜索结果中的单个酒店"""
+
+    __slots__ = ("hotel_id", "name", "rating", "review_score", "review_count", "location", "price")
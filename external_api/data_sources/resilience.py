@@ -0,0 +1,173 @@
+"""
+数据源请求的重试与熔断
+
+- RetryPolicy: 幂等请求遇到超时、连接错误、5xx 或 429 时按带抖动的指数退避重试，429 优先遵循 Retry-After
+- CircuitBreaker: 按上游主机（X-Original-Host）统计连续失败，超过阈值后熔断，熔断期间的请求立即失败
+"""
+
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Mapping, Optional
+
+import aiohttp
+
+logger = logging.getLogger("data_sources_resilience")
+
+DEFAULT_RETRY_MAX_ATTEMPTS = 3
+DEFAULT_RETRY_BASE_DELAY = 0.2
+DEFAULT_RETRY_MAX_DELAY = 5.0
+DEFAULT_RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Retry-After 超过该值（秒）时不再等待，直接返回错误
+DEFAULT_MAX_RETRY_AFTER = 30.0
+
+DEFAULT_BREAKER_FAILURE_THRESHOLD = 5
+DEFAULT_BREAKER_RESET_TIMEOUT = 30.0
+
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class CircuitOpenError(aiohttp.ClientError):
+    """上游主机处于熔断状态，请求未发出"""
+
+    def __init__(self, host: str, retry_in: float):
+        self.host = host
+        self.retry_in = retry_in
+        super().__init__(f"Circuit open for {host}, retry in {retry_in:.1f}s")
+
+
+class RetryPolicy:
+    """重试策略"""
+
+    def __init__(
+        self,
+        max_attempts: int = DEFAULT_RETRY_MAX_ATTEMPTS,
+        base_delay: float = DEFAULT_RETRY_BASE_DELAY,
+        max_delay: float = DEFAULT_RETRY_MAX_DELAY,
+        retry_statuses: tuple = DEFAULT_RETRY_STATUSES,
+        max_retry_after: float = DEFAULT_MAX_RETRY_AFTER,
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = retry_statuses
+        self.max_retry_after = max_retry_after
+
+    def backoff(self, attempt: int) -> float:
+        """
+        第 attempt 次失败（从 0 开始）后的等待时间，full jitter
+
+        Returns:
+            float: 等待秒数
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2**attempt)))
+
+    def retry_after(self, headers: Optional[Mapping[str, str]]) -> Optional[float]:
+        """
+        解析 Retry-After（秒数或 HTTP 日期）
+
+        Returns:
+            Optional[float]: 等待秒数，缺失或无法解析时返回 None
+        """
+        value = (headers or {}).get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+class CircuitBreaker:
+    """
+    按主机的熔断器
+
+    closed: 正常放行；连续失败达到 failure_threshold 后进入 open
+    open: 直接抛出 CircuitOpenError；reset_timeout 后进入 half_open
+    half_open: 只放行一个探测请求，成功则恢复 closed，失败则重新 open
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = DEFAULT_BREAKER_RESET_TIMEOUT,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._hosts: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _host_state(self, host: str) -> Dict[str, Any]:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = {"state": "closed", "failures": 0, "opened_at": 0.0, "probe_started": None, "rejected": 0}
+        return state
+
+    def before_request(self, host: str) -> None:
+        """
+        请求前检查熔断状态
+
+        Raises:
+            CircuitOpenError: 主机处于熔断状态
+        """
+        if self.failure_threshold <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            state = self._host_state(host)
+            if state["state"] == "closed":
+                return
+            retry_in = state["opened_at"] + self.reset_timeout - now
+            if state["state"] == "open" and retry_in <= 0:
+                state["state"] = "half_open"
+            # 探测请求被取消时不会回报结果，超过 reset_timeout 后允许新的探测
+            probe_started = state["probe_started"]
+            if state["state"] == "half_open" and (probe_started is None or now - probe_started > self.reset_timeout):
+                state["probe_started"] = now
+                return
+            state["rejected"] += 1
+        raise CircuitOpenError(host, max(0.0, retry_in))
+
+    def record_success(self, host: str) -> None:
+        with self._lock:
+            state = self._host_state(host)
+            if state["state"] != "closed":
+                logger.info(f"Circuit closed for {host}")
+            state.update(state="closed", failures=0, probe_started=None)
+
+    def release_probe(self, host: str) -> None:
+        """请求没有得到主机是否可用的结论（被取消、等待限流超时）时释放探测名额，下一个请求可以立即探测"""
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is not None and state["state"] == "half_open":
+                state["probe_started"] = None
+
+    def record_failure(self, host: str) -> None:
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            state = self._host_state(host)
+            state["failures"] += 1
+            if state["state"] == "half_open" or state["failures"] >= self.failure_threshold:
+                if state["state"] != "open":
+                    logger.warning(f"Circuit opened for {host} after {state['failures']} consecutive failures")
+                state.update(state="open", opened_at=time.monotonic(), probe_started=None)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        获取各主机的熔断状态
+
+        Returns:
+            Dict[str, Dict[str, Any]]: 主机 -> state、连续失败次数 failures、熔断期间拒绝的请求数 rejected
+        """
+        with self._lock:
+            return {
+                host: {"state": state["state"], "failures": state["failures"], "rejected": state["rejected"]}
+                for host, state in self._hosts.items()
+            }
@@ -0,0 +1,257 @@
+"""
+地名 -> ID 解析索引
+
+booking 的 dest_id、tripadvisor 的 location_id 等解析结果几乎不变，持久化后已知地点无需再请求解析接口:
+- 以规范化名称为键（去掉重音和标点、转小写、合并空白），按 namespace 区分数据源和查询条件
+- SQLite 持久化，默认 TTL 30 天，多个进程可共享同一文件
+- 可从种子文件预热；模糊匹配默认关闭，开启后查不到精确匹配时用 difflib 匹配（只在数字相同的名称间进行）。
+  不同城市的名称常常非常相近（Hangzhou / Changzhou 相似度 0.94），模糊命中可能返回另一个地点
+- 连接在首次使用时才打开，种子文件同时加载
+"""
+
+import difflib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("data_sources_resolution_index")
+
+DEFAULT_RESOLUTION_PATH = os.path.join(os.path.expanduser("~"), ".cache", "external_api", "resolutions.sqlite3")
+DEFAULT_RESOLUTION_TTL = 30 * 24 * 3600
+DEFAULT_FUZZY_CUTOFF = 0.9
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]+")
+_DIGITS_RE = re.compile(r"\d+")
+
+
+def normalize_name(name: str) -> str:
+    """
+    规范化地名: 去掉重音、标点，转小写，合并空白
+
+    Returns:
+        str: 规范化后的名称，如 "São Paulo, Brazil " -> "sao paulo brazil"
+    """
+    text = unicodedata.normalize("NFKD", name)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = _PUNCTUATION_RE.sub(" ", text.lower())
+    return " ".join(text.split())
+
+
+class ResolutionIndex:
+    """
+    持久化的名称解析索引
+
+    值为可 JSON 序列化的对象；get 先查规范化名称的精确匹配，fuzzy 开启时再在同一 namespace 内做模糊匹配
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_RESOLUTION_PATH,
+        ttl: float = DEFAULT_RESOLUTION_TTL,
+        seed_path: Optional[str] = None,
+        fuzzy_cutoff: float = DEFAULT_FUZZY_CUTOFF,
+        fuzzy: bool = False,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.seed_path = seed_path
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.fuzzy = fuzzy
+        self._conn: Optional[sqlite3.Connection] = None
+        # namespace -> 未过期的规范化名称列表，供模糊匹配
+        self._names: Dict[str, List[str]] = {}
+        self._stats = {"hits": 0, "fuzzy_hits": 0, "misses": 0}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "ResolutionIndex":
+        """根据 client.config 创建解析索引"""
+        return cls(
+            path=config.get("resolution_cache_path") or DEFAULT_RESOLUTION_PATH,
+            ttl=config.get("resolution_ttl", DEFAULT_RESOLUTION_TTL),
+            seed_path=config.get("resolution_seed_path"),
+            fuzzy_cutoff=config.get("resolution_fuzzy_cutoff", DEFAULT_FUZZY_CUTOFF),
+            fuzzy=config.get("resolution_fuzzy", False),
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._conn is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS resolutions "
+                    "(namespace TEXT NOT NULL, name TEXT NOT NULL, value TEXT NOT NULL, expires_at REAL NOT NULL, PRIMARY KEY (namespace, name))"
+                )
+                self._conn = conn
+                if self.seed_path:
+                    self.warmup(self.seed_path)
+            return self._conn
+
+    def get(self, namespace: str, name: str, fuzzy: Optional[bool] = None) -> Optional[Any]:
+        """
+        查找名称对应的解析结果
+
+        Args:
+            namespace: 命名空间，如 "booking.destination"
+            name: 原始名称
+            fuzzy: 精确匹配失败时是否模糊匹配，None 时使用索引的 fuzzy 设置（默认关闭）
+
+        Returns:
+            Optional[Any]: 解析结果，未找到或已过期时返回 None
+        """
+        key = normalize_name(name)
+        if fuzzy is None:
+            fuzzy = self.fuzzy
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT value, expires_at FROM resolutions WHERE namespace = ? AND name = ?", (namespace, key)).fetchone()
+            if row is not None and row[1] > now:
+                self._stats["hits"] += 1
+                return json.loads(row[0])
+            if fuzzy and key:
+                # 数字不同的名称（"city1" / "city12"、"terminal 2" / "terminal 3"）是不同地点，不参与模糊匹配
+                digits = _DIGITS_RE.findall(key)
+                candidates = [n for n in self._namespace_names(namespace) if _DIGITS_RE.findall(n) == digits]
+                matches = difflib.get_close_matches(key, candidates, n=1, cutoff=self.fuzzy_cutoff)
+                if matches:
+                    row = conn.execute(
+                        "SELECT value FROM resolutions WHERE namespace = ? AND name = ? AND expires_at > ?", (namespace, matches[0], now)
+                    ).fetchone()
+                    if row is not None:
+                        self._stats["fuzzy_hits"] += 1
+                        logger.debug(f"Fuzzy resolution {namespace}: {name!r} -> {matches[0]!r}")
+                        return json.loads(row[0])
+            self._stats["misses"] += 1
+        return None
+
+    def set(self, namespace: str, name: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        保存解析结果
+
+        Args:
+            namespace: 命名空间
+            name: 原始名称
+            value: 可 JSON 序列化的解析结果
+            ttl: 过期时间（秒），默认使用索引的 ttl
+        """
+        key = normalize_name(name)
+        if not key:
+            return
+        payload = json.dumps(value, ensure_ascii=False)
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO resolutions (namespace, name, value, expires_at) VALUES (?, ?, ?, ?)", (namespace, key, payload, expires_at)
+            )
+            names = self._names.get(namespace)
+            if names is not None and key not in names:
+                names.append(key)
+
+    def delete(self, namespace: str, name: str) -> None:
+        key = normalize_name(name)
+        with self._lock:
+            self._connection().execute("DELETE FROM resolutions WHERE namespace = ? AND name = ?", (namespace, key))
+            self._names.pop(namespace, None)
+
+    def _namespace_names(self, namespace: str) -> List[str]:
+        names = self._names.get(namespace)
+        if names is None:
+            rows = self._connection().execute(
+                "SELECT name FROM resolutions WHERE namespace = ? AND expires_at > ?", (namespace, time.time())
+            )
+            names = self._names[namespace] = [row[0] for row in rows]
+        return names
+
+    def warmup(self, seed_path: str, overwrite: bool = False) -> int:
+        """
+        从种子文件预热
+
+        种子文件为 JSON: {"namespace": {"名称": 解析结果, ...}, ...}
+
+        Args:
+            seed_path: 种子文件路径
+            overwrite: 是否覆盖已有的未过期结果
+
+        Returns:
+            int: 写入的条目数
+        """
+        try:
+            with open(seed_path, "r", encoding="utf-8") as f:
+                seed = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to load resolution seed file {seed_path}: {e}")
+            return 0
+
+        count = 0
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN")
+            try:
+                for namespace, entries in seed.items():
+                    for name, value in entries.items():
+                        key = normalize_name(name)
+                        if not key:
+                            continue
+                        if not overwrite:
+                            row = conn.execute(
+                                "SELECT 1 FROM resolutions WHERE namespace = ? AND name = ? AND expires_at > ?", (namespace, key, now)
+                            ).fetchone()
+                            if row is not None:
+                                continue
+                        conn.execute(
+                            "INSERT OR REPLACE INTO resolutions (namespace, name, value, expires_at) VALUES (?, ?, ?, ?)",
+                            (namespace, key, json.dumps(value, ensure_ascii=False), now + self.ttl),
+                        )
+                        count += 1
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            self._names.clear()
+        logger.info(f"Loaded {count} resolutions from {seed_path}")
+        return count
+
+    def stats(self) -> Dict[str, int]:
+        """
+        获取命中统计
+
+        Returns:
+            Dict[str, int]: hits（精确命中）、fuzzy_hits（模糊命中）、misses（未命中）
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM resolutions WHERE expires_at > ?", (time.time(),)).fetchone()[0]
+
+
+_default_index: Optional[ResolutionIndex] = None
+_default_index_lock = threading.Lock()
+
+
+def get_default_resolution_index() -> ResolutionIndex:
+    """
+    获取全局默认解析索引，供未通过 ApiClient 创建的数据源使用
+
+    Returns:
+        ResolutionIndex: 默认解析索引实例
+    """
+    global _default_index
+    if _default_index is None:
+        with _default_index_lock:
+            if _default_index is None:
+                _default_index = ResolutionIndex()
+    return _default_index
@@ -4,15 +4,34 @@
 
 import asyncio
 import logging
-import math
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import aiohttp
 
 from .base import BaseAPI
+from .cache import cached
+from .extractors import as_records, compile_record
+from .paging import DEFAULT_MAX_EXTRA_PAGES, DEFAULT_MAX_IN_FLIGHT, MergeIndex, PageWindow, plan_extra_pages, plan_pages
+from .records import Paper
 
 logger = logging.getLogger("scholar_source")
 
+MAX_PAGE_SIZE = 20  # 最大每页数量,api有限制
+
+_extract_paper = compile_record(
+    {
+        "title": "title",
+        "snippet": "snippet",
+        "link": "link",
+        "publicationInfo": "publicationInfo",
+        "year": "year",
+        "citedBy": "citedBy",
+        "pdfUrl": "pdfUrl",
+    },
+    name="extract_paper",
+)
+_extract_paper_record = as_records(_extract_paper, Paper)
+
 
 class ScholarSource(BaseAPI):
     """Academic data source
@@ -56,6 +75,7 @@ class ScholarSource(BaseAPI):
         page: int,
         start_year: Optional[str],
         end_year: Optional[str],
+        raw_records: bool = False,
     ) -> Dict[str, Any]:
         """
         获取单页学术论文数据
@@ -66,6 +86,7 @@ class ScholarSource(BaseAPI):
             page(int): 页码
             start_year(str): 开始年份
             end_year(str): 结束年份
+            raw_records(bool): 是否解析为 Paper 记录
 
         Returns:
             Dict[str, Any]: 单页搜索结果
@@ -79,26 +100,12 @@ class ScholarSource(BaseAPI):
         request_url = f"{self.proxy_url}/scholar"
 
         try:
-            async with aiohttp.ClientSession(trust_env=True) as session:
-                async with session.post(request_url, headers=self.headers, json=payload, timeout=self.timeout) as response:
-                    response.raise_for_status()
-                    data = await response.json()
+            data = await self.transport.request_json("POST", request_url, headers=self.headers, json=payload, timeout=self.timeout, idempotent=True)
 
             organic = data.get("organic", [])
 
-            results = []
-            for item in organic:
-                results.append(
-                    {
-                        "title": item.get("title"),
-                        "snippet": item.get("snippet"),
-                        "link": item.get("link"),
-                        "publicationInfo": item.get("publicationInfo"),
-                        "year": item.get("year"),
-                        "citedBy": item.get("citedBy"),
-                        "pdfUrl": item.get("pdfUrl"),
-                    }
-                )
+            extract = _extract_paper_record if raw_records else _extract_paper
+            results = [extract(item) for item in organic]
             return {"success": True, "data": results}
         except asyncio.TimeoutError:
             error_msg = f"Request timeout (timeout={self.timeout}s)"
@@ -111,12 +118,14 @@ class ScholarSource(BaseAPI):
             logger.error(f"_fetch_scholar_page error: page={page}, error={e}")
             return {"success": False, "error": str(e)}
 
+    @cached(ttl=3600)
     async def search_scholar(
         self,
         query: str,
         num_results: int = 10,
         start_year: Optional[str] = None,
         end_year: Optional[str] = None,
+        raw_records: bool = False,
     ) -> Dict[str, Any]:
         """
         Search for academic papers.
@@ -126,6 +135,8 @@ class ScholarSource(BaseAPI):
             num_results(int): Number of results to return, default is 10, max is 500.
             start_year(str): Start year, YYYY, default is None.
             end_year(str): End year, YYYY, default is None.
+            raw_records(bool): Return papers as compact Paper records (read-only mappings, to_dict() gives the dict below)
+                instead of dicts, to save memory when accumulating many papers, default is False.
 
         Returns:
             Dict[str, Any]: Search results, format:
@@ -167,57 +178,84 @@ class ScholarSource(BaseAPI):
             if num_results > 500:
                 num_results = 500
 
-            # 计算分页
-            MAX_PAGE_SIZE = 20  # 最大每页数量,api有限制
-            page_size = min(num_results, MAX_PAGE_SIZE)
-            total_pages = math.ceil(num_results / page_size)
-
-            # 并发请求所有页面
-            tasks = []
-            for page in range(1, total_pages + 1):
-                # 最后一页可能需要调整数量
-                if page == total_pages and num_results % page_size != 0:
-                    current_page_size = num_results % page_size
-                else:
-                    current_page_size = page_size
-
-                tasks.append(
-                    self._fetch_scholar_page(
-                        query=query,
-                        page_size=current_page_size,
-                        page=page,
-                        start_year=start_year,
-                        end_year=end_year,
-                    )
-                )
-
-            # 等待所有请求完成
-            results = await asyncio.gather(*tasks)
-
-            # 合并结果
-            all_papers = []
-            has_error = False
-            error_msgs = []
-            successful_pages = 0
-
-            for i, result in enumerate(results):
-                page_num = i + 1
-                if result["success"]:
-                    page_results = result["data"]
-                    all_papers.extend(page_results)
-                    successful_pages += 1
-                else:
-                    has_error = True
-                    error_msgs.append(f"Page {page_num}: {result['error']}")
+            # 并发请求所有页面，按页码顺序合并
+            pages = plan_pages(num_results, MAX_PAGE_SIZE)
+            window = self._scholar_pages(
+                query, start_year, end_year, pages, max_in_flight=len(pages), max_items=num_results, raw_records=raw_records
+            )
+            all_papers = await window.collect()
 
             # 如果有部分失败，记录错误但仍返回成功获取的数据
-            if has_error:
-                logger.warning(f"Some scholar pages failed: {', '.join(error_msgs)}")
-
-            # 限制返回数量
-            all_papers = all_papers[:num_results]
+            if window.errors:
+                logger.warning(f"Some scholar pages failed: {', '.join(window.errors)}")
+            if window.duplicates:
+                logger.info(f"Dropped {window.duplicates} duplicate scholar results, fetched {window.extra_pages} extra pages")
 
             return {"success": True, "data": {"papers": all_papers}}
         except Exception as e:
             logger.error(f"search_scholar error: {e}")
             return {"success": False, "error": str(e)}
+
+    def iter_scholar(
+        self,
+        query: str,
+        num_results: int = 10,
+        start_year: Optional[str] = None,
+        end_year: Optional[str] = None,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        raw_records: bool = False,
+    ) -> PageWindow:
+        """
+        Iterate over academic paper search results page by page.
+
+        Yields the same paper dicts as search_scholar, in page order, as soon as each page arrives instead of
+        waiting for all pages. At most max_in_flight pages are requested at once; outstanding page requests are
+        cancelled once num_results unique papers were yielded, the results run out, or the iterator is closed early.
+        Papers repeated across pages (same link, or same title when there is no link) are dropped, keeping rank order.
+
+        Args:
+            query(str): Search keywords.
+            num_results(int): Maximum number of results to yield, default is 10, max is 500.
+            start_year(str): Start year, YYYY, default is None.
+            end_year(str): End year, YYYY, default is None.
+            max_in_flight(int): Maximum number of pages requested concurrently, default is 3
+            raw_records(bool): Yield compact Paper records instead of dicts, see search_scholar, default is False
+
+        Returns:
+            PageWindow: async iterator of paper dicts; failed pages are skipped and listed in its errors attribute
+
+        Example:
+            >>> async with client.scholar.iter_scholar("machine learning", num_results=100) as papers:
+            ...     async for paper in papers:
+            ...         print(paper["title"])
+        """
+        num_results = min(num_results, 500)
+        pages = plan_pages(num_results, MAX_PAGE_SIZE)
+        return self._scholar_pages(
+            query, start_year, end_year, pages, max_in_flight=max_in_flight, max_items=num_results, raw_records=raw_records
+        )
+
+    def _scholar_pages(
+        self,
+        query: str,
+        start_year: Optional[str],
+        end_year: Optional[str],
+        pages: List[Tuple[int, int]],
+        max_in_flight: int,
+        max_items: int,
+        raw_records: bool = False,
+    ) -> PageWindow:
+        async def fetch_page(page: int, page_size: int) -> Dict[str, Any]:
+            return await self._fetch_scholar_page(
+                query=query, page_size=page_size, page=page, start_year=start_year, end_year=end_year, raw_records=raw_records
+            )
+
+        # 上游分页可能重叠，按 link 或标题哈希去重，不足时补充请求额外页
+        return PageWindow(
+            fetch_page,
+            pages,
+            max_in_flight=max_in_flight,
+            max_items=max_items,
+            merge=MergeIndex(("link",)),
+            extra_pages=plan_extra_pages(max_items, MAX_PAGE_SIZE, DEFAULT_MAX_EXTRA_PAGES),
+        )
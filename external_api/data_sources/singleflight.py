@@ -0,0 +1,149 @@
+"""
+并发请求合并（single-flight）
+
+同一事件循环内，键相同的并发调用只执行一次，其余调用等待并共享同一个结果。
+与 TTL 缓存相互独立：调用结束后不保留结果，下一次调用会重新请求上游。
+"""
+
+import asyncio
+import copy
+import functools
+import hashlib
+import inspect
+import json
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+class SingleFlight:
+    """
+    按键合并进行中的异步调用
+
+    发起调用的协程被取消时，等待中的调用会重新竞争执行，而不是一起被取消。
+    """
+
+    def __init__(self):
+        # 每个进行中的调用记录为 [future, 等待者数量]
+        self._calls: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, List[Any]]]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._stats = {"executed": 0, "shared": 0}
+
+    def _inflight_calls(self) -> Dict[str, List[Any]]:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            calls = self._calls.get(loop)
+            if calls is None:
+                calls = self._calls[loop] = {}
+        return calls
+
+    def _count(self, field: str) -> None:
+        with self._lock:
+            self._stats[field] += 1
+
+    async def do(self, key: str, call: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        执行 call，若相同 key 的调用正在进行则等待其结果
+
+        Args:
+            key: 调用键
+            call: 协程工厂
+
+        Returns:
+            Tuple[Any, bool]: 结果，以及结果是否来自其他调用（共享时返回深拷贝）
+        """
+        inflight = self._inflight_calls()
+        while True:
+            entry = inflight.get(key)
+            if entry is None:
+                break
+            future = entry[0]
+            entry[1] += 1
+            try:
+                result = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # 只有发起请求的调用被取消时才重新竞争，自身被取消则继续抛出
+                if not future.cancelled():
+                    raise
+                continue
+            self._count("shared")
+            return copy.deepcopy(result), True
+
+        self._count("executed")
+        future = asyncio.get_running_loop().create_future()
+        # 没有等待者时避免 "exception was never retrieved" 警告
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        entry = inflight[key] = [future, 0]
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            inflight.pop(key, None)
+
+        # 有等待者时共享一份快照：发起调用的一方拿到结果后立即修改，也不会影响尚未恢复执行的等待者
+        future.set_result(copy.deepcopy(result) if entry[1] else result)
+        return result, False
+
+    def stats(self) -> Dict[str, int]:
+        """
+        获取统计
+
+        Returns:
+            Dict[str, int]: executed 为实际执行次数，shared 为共享结果的调用次数
+        """
+        with self._lock:
+            return dict(self._stats)
+
+
+def make_call_key(name: str, signature: inspect.Signature, args: tuple, kwargs: Dict[str, Any]) -> str:
+    """
+    根据方法名和规范化后的参数生成调用键，位置参数与关键字参数写法等价
+
+    Args:
+        name: "source.method"
+        signature: 方法签名（包含 self）
+        args: 位置参数（不含 self）
+        kwargs: 关键字参数
+
+    Returns:
+        str: 调用键
+    """
+    bound = signature.bind(None, *args, **kwargs)
+    bound.apply_defaults()
+    arguments = dict(bound.arguments)
+    arguments.pop(next(iter(signature.parameters)), None)
+    payload = json.dumps(arguments, sort_keys=True, default=repr, separators=(",", ":"))
+    return f"{name}:{hashlib.sha1(payload.encode('utf-8')).hexdigest()}"
+
+
+default_group = SingleFlight()
+
+
+def single_flight(group: Optional[SingleFlight] = None):
+    """
+    合并数据源异步方法的并发相同调用
+
+    键由 source_name、方法名和规范化后的参数组成，不依赖响应缓存
+
+    Args:
+        group: 使用的 SingleFlight 实例，默认为模块级 default_group
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            flight = group or default_group
+            key = make_call_key(f"{self.source_name}.{func.__name__}", signature, args, kwargs)
+            result, _ = await flight.do(key, lambda: func(self, *args, **kwargs))
+            return result
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,308 @@
+"""
+数据源共享 HTTP 传输层
+
+所有数据源通过同一个 HttpTransport 发送请求:
+- 每个事件循环复用一个 aiohttp.ClientSession（keep-alive 连接池）
+- 对 external-api 代理做单主机连接数限制
+- 开启 DNS 缓存
+- 幂等请求自动重试，按上游主机熔断（见 resilience.py）
+- 按上游主机的令牌桶限流（见 rate_limit.py）
+- 请求体和响应体通过 codec.py 编解码（可选 orjson），双重编码的响应自动再解析一次
+"""
+
+import asyncio
+import atexit
+import logging
+import threading
+import weakref
+from typing import Any, Dict, Mapping, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from .codec import JSON_CONTENT_TYPE, dumps, read_json
+from .rate_limit import RateLimiter
+from .resilience import (
+    DEFAULT_BREAKER_FAILURE_THRESHOLD,
+    DEFAULT_BREAKER_RESET_TIMEOUT,
+    DEFAULT_RETRY_BASE_DELAY,
+    DEFAULT_RETRY_MAX_ATTEMPTS,
+    DEFAULT_RETRY_MAX_DELAY,
+    IDEMPOTENT_METHODS,
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+)
+
+logger = logging.getLogger("data_sources_transport")
+
+DEFAULT_POOL_LIMIT = 100
+DEFAULT_POOL_LIMIT_PER_HOST = 32
+DEFAULT_DNS_CACHE_TTL = 300
+DEFAULT_KEEPALIVE_TIMEOUT = 30
+
+
+# 退出时清理各实例中事件循环已关闭的会话
+_live_transports: "weakref.WeakSet[HttpTransport]" = weakref.WeakSet()
+
+
+@atexit.register
+def _discard_closed_sessions() -> None:
+    for owner in list(_live_transports):
+        owner._discard_closed_loops()
+
+
+class HttpTransport:
+    """
+    数据源共享的 HTTP 传输层
+
+    会话按事件循环懒加载，在同一事件循环内的所有数据源之间共享。
+    进程或事件循环退出前应调用 close()。
+    事件循环关闭前未调用 close() 的会话在下次获取会话或进程退出时丢弃。
+    """
+
+    def __init__(
+        self,
+        limit: int = DEFAULT_POOL_LIMIT,
+        limit_per_host: int = DEFAULT_POOL_LIMIT_PER_HOST,
+        dns_cache_ttl: int = DEFAULT_DNS_CACHE_TTL,
+        keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.rate_limiter = rate_limiter or RateLimiter()
+        # 会话和连接器引用了自己的事件循环，弱引用字典的键永远不会被回收；改为在循环关闭后显式清理
+        self._sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+        self._lock = threading.Lock()
+        _live_transports.add(self)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "HttpTransport":
+        """根据 client.config 创建传输层"""
+        return cls(
+            limit=config.get("pool_limit", DEFAULT_POOL_LIMIT),
+            limit_per_host=config.get("pool_limit_per_host", DEFAULT_POOL_LIMIT_PER_HOST),
+            dns_cache_ttl=config.get("dns_cache_ttl", DEFAULT_DNS_CACHE_TTL),
+            keepalive_timeout=config.get("keepalive_timeout", DEFAULT_KEEPALIVE_TIMEOUT),
+            retry_policy=RetryPolicy(
+                max_attempts=config.get("retry_max_attempts", DEFAULT_RETRY_MAX_ATTEMPTS),
+                base_delay=config.get("retry_base_delay", DEFAULT_RETRY_BASE_DELAY),
+                max_delay=config.get("retry_max_delay", DEFAULT_RETRY_MAX_DELAY),
+            ),
+            circuit_breaker=CircuitBreaker(
+                failure_threshold=config.get("breaker_failure_threshold", DEFAULT_BREAKER_FAILURE_THRESHOLD),
+                reset_timeout=config.get("breaker_reset_timeout", DEFAULT_BREAKER_RESET_TIMEOUT),
+            ),
+            rate_limiter=RateLimiter.from_config(config),
+        )
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """获取当前事件循环的会话，不存在或已关闭时创建"""
+        loop = asyncio.get_running_loop()
+        self._discard_closed_loops()
+        with self._lock:
+            session = self._sessions.get(loop)
+            if session is None or session.closed:
+                connector = aiohttp.TCPConnector(
+                    limit=self.limit,
+                    limit_per_host=self.limit_per_host,
+                    use_dns_cache=True,
+                    ttl_dns_cache=self.dns_cache_ttl,
+                    keepalive_timeout=self.keepalive_timeout,
+                )
+                session = aiohttp.ClientSession(connector=connector, trust_env=True)
+                self._sessions[loop] = session
+        return session
+
+    async def request_json(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: Optional[Mapping[str, str]] = None,
+        params: Optional[Mapping[str, Any]] = None,
+        json: Any = None,
+        data: Any = None,
+        timeout: Optional[float] = None,
+        content_type: Optional[str] = "application/json",
+        idempotent: Optional[bool] = None,
+        with_size: bool = False,
+    ) -> Any:
+        """
+        发送请求并解析 JSON 响应
+
+        幂等请求在超时、连接错误、5xx 和 429 时重试，所有重试共享 timeout 的时间预算；
+        上游主机（X-Original-Host）处于熔断状态时不发请求，直接抛出 CircuitOpenError；
+        每次发送前按上游主机限流，等待令牌的时间同样计入 timeout
+
+        Args:
+            method: HTTP 方法
+            url: 请求地址
+            headers: 请求头
+            params: 查询参数
+            json: JSON 请求体
+            data: 原始请求体
+            timeout: 总超时时间（秒），包含重试
+            content_type: 期望的响应 Content-Type，None 表示不校验
+            idempotent: 是否允许重试，默认只重试 GET/HEAD/OPTIONS；只读的 POST 查询可显式传 True
+            with_size: 是否同时返回响应字节数（Content-Length，没有时为响应体长度）
+
+        Returns:
+            Any: 解析后的 JSON 数据，代理返回双重编码的 JSON 字符串时为再解析后的结果；
+                with_size 为 True 时返回 (数据, 字节数)
+
+        Raises:
+            asyncio.TimeoutError: 请求超时（包括等待限流令牌超时的 RateLimitExceeded）
+            aiohttp.ClientError: HTTP 错误（包括非 2xx 状态码和 CircuitOpenError）
+        """
+        host = (headers or {}).get("X-Original-Host") or urlsplit(url).netloc
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        max_attempts = self.retry_policy.max_attempts if idempotent else 1
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+
+        attempt = 0
+        error: Optional[BaseException] = None
+        while True:
+            try:
+                self.circuit_breaker.before_request(host)
+            except CircuitOpenError:
+                # 重试过程中熔断时返回上一次的真实错误
+                if error is not None:
+                    raise error
+                raise
+            try:
+                await self.rate_limiter.acquire(host, max_wait=None if deadline is None else deadline - loop.time())
+            except BaseException:
+                self.circuit_breaker.release_probe(host)
+                raise
+            remaining = None if deadline is None else deadline - loop.time()
+            if remaining is not None and remaining <= 0:
+                # 等待令牌用完了时间预算；ClientTimeout(total=0) 表示不超时，不能再发请求
+                self.circuit_breaker.release_probe(host)
+                raise asyncio.TimeoutError(f"{method} {url}: timeout of {timeout}s exhausted before sending the request")
+            retry_after = None
+            try:
+                result = await self._request_once(
+                    method,
+                    url,
+                    headers=headers,
+                    params=params,
+                    json=json,
+                    data=data,
+                    timeout=remaining,
+                    content_type=content_type,
+                    with_size=with_size,
+                )
+            except aiohttp.ClientResponseError as e:
+                # 4xx 说明主机可用，只有 5xx 计入熔断
+                if e.status >= 500:
+                    self.circuit_breaker.record_failure(host)
+                else:
+                    self.circuit_breaker.record_success(host)
+                if e.status not in self.retry_policy.retry_statuses:
+                    raise
+                if e.status == 429:
+                    retry_after = self.retry_policy.retry_after(e.headers)
+                    if retry_after is not None and retry_after > self.retry_policy.max_retry_after:
+                        raise
+                error = e
+            except (asyncio.TimeoutError, aiohttp.ClientConnectionError) as e:
+                self.circuit_breaker.record_failure(host)
+                error = e
+            except asyncio.CancelledError:
+                self.circuit_breaker.release_probe(host)
+                raise
+            except Exception:
+                # 响应体无法解析、传输中断（ClientPayloadError）等，不重试，但同样计入熔断
+                self.circuit_breaker.record_failure(host)
+                raise
+            else:
+                self.circuit_breaker.record_success(host)
+                return result
+
+            attempt += 1
+            if attempt >= max_attempts:
+                raise error
+            delay = retry_after if retry_after is not None else self.retry_policy.backoff(attempt - 1)
+            if deadline is not None and loop.time() + delay >= deadline:
+                raise error
+            logger.info(f"Retrying {method} {url} in {delay:.2f}s (attempt {attempt + 1}/{max_attempts}): {error!r}")
+            await asyncio.sleep(delay)
+
+    async def _request_once(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: Optional[Mapping[str, str]],
+        params: Optional[Mapping[str, Any]],
+        json: Any,
+        data: Any,
+        timeout: Optional[float],
+        content_type: Optional[str],
+        with_size: bool = False,
+    ) -> Any:
+        session = self.get_session()
+        if json is not None:
+            # 自行编码 JSON 请求体，不经过 aiohttp 默认的标准库编码
+            data = dumps(json)
+            headers = {"Content-Type": JSON_CONTENT_TYPE, **(headers or {})}
+        kwargs: Dict[str, Any] = {"headers": headers, "params": params, "data": data}
+        if timeout is not None:
+            kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout)
+        async with session.request(method, url, **kwargs) as response:
+            response.raise_for_status()
+            result = await read_json(response, content_type=content_type)
+            if not with_size:
+                return result
+            # read() 返回 read_json 已读取并缓存的响应体，不会再次读取
+            size = response.content_length if response.content_length is not None else len(await response.read())
+            return result, size
+
+    def _discard_closed_loops(self) -> None:
+        """丢弃事件循环已关闭（如 asyncio.run 结束后）而未调用 close() 的会话"""
+        with self._lock:
+            closed = [loop for loop in self._sessions if loop.is_closed()]
+            sessions = [self._sessions.pop(loop) for loop in closed]
+        for session in sessions:
+            # 循环已关闭，无法 await session.close()；连接随循环一起失效，同步标记连接器关闭，避免退出时报告未关闭的会话
+            connector = session.connector
+            session.detach()
+            if connector is not None:
+                connector._close()
+
+    async def close(self) -> None:
+        """关闭当前事件循环的会话"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            session = self._sessions.pop(loop, None)
+        if session is not None and not session.closed:
+            await session.close()
+
+
+_default_transport: Optional[HttpTransport] = None
+_default_transport_lock = threading.Lock()
+
+
+def get_default_transport() -> HttpTransport:
+    """
+    获取全局默认传输层，供未通过 ApiClient 创建的数据源使用
+
+    Returns:
+        HttpTransport: 默认传输层实例
+    """
+    global _default_transport
+    if _default_transport is None:
+        with _default_transport_lock:
+            if _default_transport is None:
+                _default_transport = HttpTransport()
+    return _default_transport
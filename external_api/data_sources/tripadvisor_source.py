@@ -2,16 +2,172 @@
 TripAdvisor Officical API data source implementation
 """
 
+import asyncio
+import functools
 import logging
-from datetime import datetime
-from typing import Any, Dict, List, Optional
-
-import httpx
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
 
 from .base import BaseAPI
+from .cache import cached
+from .dates import DateNormalizer
+from .extractors import Field, compile_record, each, each_value
+from .fanout import DEFAULT_MAX_WORKERS, FanOut, Job
+from .singleflight import single_flight
 
 logger = logging.getLogger("tripadvisor_official_source")
 
+# iter_location_profiles 可获取的地点信息
+PROFILE_PARTS = ("details", "reviews", "photos")
+
+
+# 新 API 日期格式：评论 2025-04-24T22:29:34Z，照片 2021-02-26T00:50:50.206Z
+_parse_date = DateNormalizer(("%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%dT%H:%M:%S.%fZ"))
+
+
+_extract_review = compile_record(
+    {
+        "lang": Field("lang", "en"),  # 语言 code
+        "location_id": Field("location_id", ""),  # 地点 id
+        "published_date": Field("published_date", "", convert=_parse_date),  # 评论发布时间
+        "rating": Field("rating", 0),  # 评分
+        "helpful_votes": Field("helpful_votes", 0),  # 有用投票数
+        "url": Field("url", ""),  # 评论链接
+        "text": Field("text", ""),  # 评论内容
+        "title": Field("title", ""),  # 评论标题
+        "trip_type": Field("trip_type", ""),  # 旅行类型
+        "travel_date": Field("travel_date", ""),  # 旅行日期
+        "user": {  # 评论用户信息
+            "username": Field("user.username", ""),  # 用户名
+            "avatar": {"original": Field("user.avatar.original", "")},  # 用户头像
+        },
+        "subratings": Field(
+            "subratings",
+            convert=each_value(
+                compile_record(
+                    {
+                        "name": Field("name", ""),  # 评分类型
+                        "value": Field("value", ""),  # 评分值
+                        "localized_name": Field("localized_name", ""),  # 评分名称
+                    }
+                )
+            ),
+        ),
+        "owner_response": {  # 酒店回复
+            "id": Field("owner_response.id", ""),  # 回复 id
+            "title": Field("owner_response.title", ""),  # 回复标题
+            "text": Field("owner_response.text", ""),  # 回复内容
+            "lang": Field("owner_response.lang", ""),  # 回复语言
+            "author": Field("owner_response.author", ""),  # 回复作者名
+            "published_date": Field("owner_response.published_date", "", convert=_parse_date),  # 回复发布时间
+        },
+    },
+    name="extract_review",
+)
+
+_extract_location_details = compile_record(
+    {
+        "location_id": Field("location_id", ""),  # 地点ID
+        "name": Field("name", ""),  # 地点名称
+        "description": Field("description", ""),  # 地点描述
+        "web_url": Field("web_url", ""),  # 地点官网链接
+        "address_obj": {
+            "street1": Field("address_obj.street1", ""),  # 街道位置
+            "city": Field("address_obj.city", ""),  # 城市
+            "state": Field("address_obj.state", ""),  # 州/省
+            "country": Field("address_obj.country", ""),  # 国家
+            "postalcode": Field("address_obj.postalcode", ""),  # 邮政编码
+            "address_string": Field("address_obj.address_string", ""),  # 完整地址
+        },
+        "ancestors": Field(
+            "ancestors",
+            convert=each(
+                compile_record(
+                    {
+                        "level": Field("level", ""),  # 级别
+                        "name": Field("name", ""),  # 名称
+                        "location_id": Field("location_id", ""),  # 地点ID
+                    }
+                )
+            ),
+        ),
+        "latitude": Field("latitude", ""),  # 纬度
+        "longitude": Field("longitude", ""),  # 经度
+        "timezone": Field("timezone", ""),  # 时区
+        "phone": Field("phone", ""),  # 电话
+        "ranking_data": {
+            "geo_location_id": Field("ranking_data.geo_location_id", ""),  # 排名地区 id
+            "ranking_string": Field("ranking_data.ranking_string", ""),  # 排名信息
+            "geo_location_name": Field("ranking_data.geo_location_name", ""),  # 排名地区名称
+            "ranking_out_of": Field("ranking_data.ranking_out_of", ""),  # 排名总数
+            "ranking": Field("ranking_data.ranking", ""),  # 排名位置
+        },
+        "rating": Field("rating", ""),  # 评分
+        "num_reviews": Field("num_reviews", ""),  # 评论数
+        "review_rating_count": Field("review_rating_count", {}),
+        "subratings": Field(
+            "subratings",
+            convert=each_value(
+                compile_record(
+                    {
+                        "name": Field("name", ""),  # 评分类型
+                        "localized_name": Field("localized_name", ""),  # 评分类别名称
+                        "value": Field("value", ""),  # 评分值
+                    }
+                )
+            ),
+        ),
+        "photo_count": Field("photo_count", ""),  # 照片数
+        "see_all_photos": Field("see_all_photos", ""),  # 查看所有照片链接
+        "price_level": Field("price_level", ""),  # 价格等级
+        "amenities": Field("amenities", []),  # 设施列表
+        "category": {
+            "name": Field("category.name", ""),  # 类别名称
+            "localized_name": Field("category.localized_name", ""),  # 类别本地化名称
+        },
+        "subcategory": Field(
+            "subcategory",
+            convert=each(
+                compile_record(
+                    {
+                        "name": Field("name", ""),  # 子类别名称
+                        "localized_name": Field("localized_name", ""),  # 子类别本地化名称
+                    }
+                )
+            ),
+        ),
+        "styles": Field("styles", []),  # 风格
+        "neighborhood_info": Field("neighborhood_info", []),  # 邻里信息
+        "trip_types": Field(
+            "trip_types",
+            convert=each(
+                compile_record(
+                    {
+                        "name": Field("name", ""),  # 旅行类型
+                        "localized_name": Field("localized_name", ""),  # 旅行类型本地化名称
+                        "value": Field("value", ""),  # 旅行类型总数
+                    }
+                )
+            ),
+        ),
+        "awards": Field("awards", []),  # 奖项数据
+    },
+    name="extract_location_details",
+)
+
+_extract_photo = compile_record(
+    {
+        "id": Field("id", ""),  # 照片 id
+        "is_blessed": Field("is_blessed", False),  # 是否被认证
+        "caption": Field("caption", ""),  # 照片描述
+        "published_date": Field("published_date", "", convert=_parse_date),  # 照片发布时间
+        "images": Field("images.original.url", ""),  # 图片 url
+        "album": Field("album", ""),  # 照片所属相册
+        "source": Field("source", {}),  # 照片来源
+        "user": Field("user", {}),  # 照片上传者
+    },
+    name="extract_photo",
+)
+
 
 class TripAdvisorSource(BaseAPI):
     """TripAdvisor official API data source"""
@@ -36,10 +192,7 @@ class TripAdvisorSource(BaseAPI):
         if params is None:
             params = {}
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers, params=params)
-            response.raise_for_status()
-            return response.json()
+        return await self.transport.request_json("GET", url, headers=self.headers, params=params, timeout=self.timeout, content_type=None)
 
     @property
     def source_name(self) -> str:
@@ -52,6 +205,10 @@ class TripAdvisorSource(BaseAPI):
             "description": "TripAdvisor official API data source, provides location info, reviews, and image search from TripAdvisor.",
         }
 
+    # 响应缓存默认关闭（或被 cache_ttls 设为 0）时由 single_flight 合并并发的相同调用；开启缓存后由缓存合并，
+    # single_flight 只会看到发起调用的那一次
+    @cached(ttl=24 * 3600)
+    @single_flight()
     async def search_locations(
         self,
         searchQuery: str,
@@ -113,11 +270,144 @@ class TripAdvisorSource(BaseAPI):
                 return {"success": False, "error": "No data returned from Tripadvisor API"}
             if not data.get("data", None):
                 return {"success": False, "error": "No data returned from Tripadvisor API"}
+            # 纯名称搜索的第一个结果记入解析索引，之后 resolve_location 不再请求
+            if not (phone or address or latLong):
+                self.resolution_index.set(self._resolution_namespace(language, category), searchQuery, data["data"][0])
             return {"success": True, "data": data.get("data", [])}
         except Exception as e:
             logger.error(f"Error searching locations: {e}")
             return {"success": False, "error": str(e)}
 
+    async def resolve_location(self, name: str, category: Optional[str] = None, language: str = "en") -> Dict[str, Any]:
+        """
+        Resolve a place name to its Tripadvisor location (location_id, name, address_obj)
+
+        Known places, including close spellings, are answered from a persistent local index without calling the API;
+        unknown places are looked up with search_locations and remembered. Use the returned location_id with
+        get_location_details, get_location_reviews or get_location_photos.
+
+        Args:
+            name(str): Place name, e.g. "Hotel Xcaret Mexico"
+            category(str): Optional category filter ('hotels', 'attractions', 'restaurants', 'geos')
+            language(str): Language code (default: 'en')
+
+        Returns:
+            Dict[str, Any]: Dictionary containing the best matching location, e.g.
+            {
+                "success": True,
+                "data": {
+                    "location_id": "13189438",
+                    "name": "Hotel Xcaret Mexico",
+                    "address_obj": {...}
+                }
+            }
+        """
+        location = self.resolution_index.get(self._resolution_namespace(language, category), name)
+        if location is not None:
+            return {"success": True, "data": location}
+
+        result = await self.search_locations(searchQuery=name, language=language, category=category)
+        if not result["success"]:
+            return result
+        return {"success": True, "data": result["data"][0]}
+
+    def iter_location_profiles(
+        self,
+        searchQuery: Optional[str] = None,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        language: str = "en",
+        category: Optional[str] = None,
+        parts: Sequence[str] = PROFILE_PARTS,
+        max_locations: Optional[int] = None,
+        max_concurrency: int = DEFAULT_MAX_WORKERS,
+    ) -> FanOut:
+        """
+        Search locations and stream a full profile (details, reviews and photos) for every result.
+
+        Runs search_locations (searchQuery) or search_nearby_locations (latitude/longitude), then fetches
+        get_location_details, get_location_reviews and get_location_photos for the results with a pool of
+        max_concurrency workers, each enriching one location with its requests in parallel. Profiles are yielded
+        as soon as they are complete, in completion order, not search order. Closing the iterator early cancels
+        the outstanding requests.
+
+        Args:
+            searchQuery(str): The text to search for; either this or latitude/longitude is required
+            latitude(float): Latitude coordinate for a nearby search
+            longitude(float): Longitude coordinate for a nearby search
+            language(str): Language code (default: 'en')
+            category(str): Optional category filter ('hotels', 'attractions', 'restaurants', 'geos')
+            parts(Sequence[str]): Profile parts to fetch, any of 'details', 'reviews', 'photos' (default: all)
+            max_locations(int): Maximum number of search results to enrich (default: all)
+            max_concurrency(int): Number of locations enriched concurrently (default: 4)
+
+        Returns:
+            FanOut: async iterator of profiles, e.g.
+            {
+                "location_id": "13189438",   # Location ID
+                "location": {...},           # Search result, same format as search_locations
+                "details": {...},            # Same format as get_location_details data, None if it failed
+                "reviews": [...],            # Same format as get_location_reviews data, None if it failed
+                "photos": [...],             # Same format as get_location_photos data, None if it failed
+                "errors": {"photos": "..."}  # Error message of each failed part
+            }
+            A failed search yields nothing and is listed in the iterator's errors attribute.
+
+        Example:
+            >>> async with client.tripadvisor.iter_location_profiles("hotel", category="hotels") as profiles:
+            ...     async for profile in profiles:
+            ...         print(profile["details"]["name"], len(profile["reviews"] or []))
+        """
+        unknown = [part for part in parts if part not in PROFILE_PARTS]
+        if unknown:
+            raise ValueError(f"Unknown profile parts: {', '.join(unknown)}")
+        if searchQuery is None and (latitude is None or longitude is None):
+            raise ValueError("Either searchQuery or latitude and longitude is required")
+
+        return FanOut(
+            self._location_profile_jobs(searchQuery, latitude, longitude, language, category, tuple(parts), max_locations),
+            max_workers=max_concurrency,
+        )
+
+    async def _location_profile_jobs(
+        self,
+        searchQuery: Optional[str],
+        latitude: Optional[float],
+        longitude: Optional[float],
+        language: str,
+        category: Optional[str],
+        parts: Sequence[str],
+        max_locations: Optional[int],
+    ) -> AsyncIterator[Job]:
+        """先搜索地点，再为每个结果生成获取档案的任务"""
+        if searchQuery is not None:
+            result = await self.search_locations(searchQuery=searchQuery, language=language, category=category)
+        else:
+            result = await self.search_nearby_locations(latitude=latitude, longitude=longitude, language=language, category=category)
+        if not result["success"]:
+            raise RuntimeError(f"Location search failed: {result['error']}")
+
+        locations = result["data"] if max_locations is None else result["data"][:max_locations]
+        for location in locations:
+            yield functools.partial(self._location_profile, location, language, parts)
+
+    async def _location_profile(self, location: Dict[str, Any], language: str, parts: Sequence[str]) -> Dict[str, Any]:
+        """并发获取一个地点的各项信息，组成档案；单项失败记录到 errors，值为 None"""
+        fetchers = {"details": self.get_location_details, "reviews": self.get_location_reviews, "photos": self.get_location_photos}
+        location_id = location["location_id"]
+        results = await asyncio.gather(*(fetchers[part](locationId=location_id, language=language) for part in parts))
+
+        profile: Dict[str, Any] = {"location_id": location_id, "location": location, "errors": {}}
+        for part, result in zip(parts, results):
+            profile[part] = result["data"] if result["success"] else None
+            if not result["success"]:
+                profile["errors"][part] = result["error"]
+        return profile
+
+    def _resolution_namespace(self, language: str, category: Optional[str]) -> str:
+        """解析索引的命名空间，按语言和类别区分"""
+        return f"tripadvisor.location:{language}:{category or 'all'}"
+
     async def search_nearby_locations(
         self,
         latitude: float,
@@ -177,6 +467,7 @@ class TripAdvisorSource(BaseAPI):
             logger.error(f"Error searching nearby locations: {e}")
             return {"success": False, "error": str(e)}
 
+    @cached(ttl=24 * 3600)
     async def get_location_details(
         self,
         locationId: int,
@@ -286,6 +577,7 @@ class TripAdvisorSource(BaseAPI):
             logger.error(f"Error getting location details: {e}")
             return {"success": False, "error": str(e)}
 
+    @cached(ttl=3600)
     async def get_location_reviews(
         self,
         locationId: int,
@@ -359,6 +651,7 @@ class TripAdvisorSource(BaseAPI):
             logger.error(f"Error getting location reviews: {e}")
             return {"success": False, "error": str(e)}
 
+    @cached(ttl=24 * 3600)
     async def get_location_photos(
         self,
         locationId: int,
@@ -414,165 +707,15 @@ class TripAdvisorSource(BaseAPI):
 
     def _parse_reviews(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Parse location review data"""
-        reviews = []
-        for review_data in data["data"]:
-            subratings = {}
-            for key, value in review_data.get("subratings", {}).items():
-                subratings[key] = {
-                    "name": value.get("name", ""),  # 评分类型
-                    "value": value.get("value", ""),  # 评分值
-                    "localized_name": value.get("localized_name", ""),  # 评分名称
-                }
-
-            review = {
-                "lang": review_data.get("lang", "en"),  # 语言 code
-                "location_id": review_data.get("location_id", ""),  # 地点 id
-                "published_date": self._parse_date(review_data.get("published_date", "")),  # 评论发布时间
-                "rating": review_data.get("rating", 0),  # 评分
-                "helpful_votes": review_data.get("helpful_votes", 0),  # 有用投票数
-                "url": review_data.get("url", ""),  # 评论链接
-                "text": review_data.get("text", ""),  # 评论内容
-                "title": review_data.get("title", ""),  # 评论标题
-                "trip_type": review_data.get("trip_type", ""),  # 旅行类型
-                "travel_date": review_data.get("travel_date", ""),  # 旅行日期
-                "user": {  # 评论用户信息
-                    "username": review_data.get("user", {}).get("username", ""),  # 用户名
-                    "avatar": {
-                        "original": review_data.get("user", {}).get("avatar", {}).get("original", "")  # 用户头像
-                    },
-                },
-                "subratings": subratings,
-                "owner_response": {  # 酒店回复
-                    "id": review_data.get("owner_response", {}).get("id", ""),  # 回复 id
-                    "title": review_data.get("owner_response", {}).get("title", ""),  # 回复标题
-                    "text": review_data.get("owner_response", {}).get("text", ""),  # 回复内容
-                    "lang": review_data.get("owner_response", {}).get("lang", ""),  # 回复语言
-                    "author": review_data.get("owner_response", {}).get("author", ""),  # 回复作者名
-                    "published_date": self._parse_date(review_data.get("owner_response", {}).get("published_date", "")),  # 回复发布时间
-                },
-            }
-            reviews.append(review)
-
-        return reviews
+        return [_extract_review(review_data) for review_data in data["data"]]
 
     def _parse_location_details(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Parse location detail data"""
-        ancestors = []
-        for ancestor in data.get("ancestors", []):
-            ancestors.append(
-                {
-                    "level": ancestor.get("level", ""),  # 级别
-                    "name": ancestor.get("name", ""),  # 名称
-                    "location_id": ancestor.get("location_id", ""),  # 地点ID
-                }
-            )
-
-        subratings = {}
-        for key, value in data.get("subratings", {}).items():
-            subratings[key] = {
-                "name": value.get("name", ""),  # 评分类型
-                "localized_name": value.get("localized_name", ""),  # 评分类别名称
-                "value": value.get("value", ""),  # 评分值
-            }
-
-        trip_types = []
-        for trip_type in data.get("trip_types", []):
-            trip_types.append(
-                {
-                    "name": trip_type.get("name", ""),  # 旅行类型
-                    "localized_name": trip_type.get("localized_name", ""),  # 旅行类型本地化名称
-                    "value": trip_type.get("value", ""),  # 旅行类型总数
-                }
-            )
-
-        subcategory = []
-        for subcat in data.get("subcategory", []):
-            subcategory.append(
-                {
-                    "name": subcat.get("name", ""),  # 子类别名称
-                    "localized_name": subcat.get("localized_name", ""),  # 子类别本地化名称
-                }
-            )
-
-        location_details = {  # 如果成功，包含以下字段
-            "location_id": data.get("location_id", ""),  # 地点ID
-            "name": data.get("name", ""),  # 地点名称
-            "description": data.get("description", ""),  # 地点描述
-            "web_url": data.get("web_url", ""),  # 地点官网链接
-            "address_obj": {
-                "street1": data.get("address_obj", {}).get("street1", ""),  # 街道位置
-                "city": data.get("address_obj", {}).get("city", ""),  # 城市
-                "state": data.get("address_obj", {}).get("state", ""),  # 州/省
-                "country": data.get("address_obj", {}).get("country", ""),  # 国家
-                "postalcode": data.get("address_obj", {}).get("postalcode", ""),  # 邮政编码
-                "address_string": data.get("address_obj", {}).get("address_string", ""),  # 完整地址
-            },
-            "ancestors": ancestors,
-            "latitude": data.get("latitude", ""),  # 纬度
-            "longitude": data.get("longitude", ""),  # 经度
-            "timezone": data.get("timezone", ""),  # 时区
-            "phone": data.get("phone", ""),  # 电话
-            "ranking_data": {
-                "geo_location_id": data.get("ranking_data", {}).get("geo_location_id", ""),  # 排名地区 id
-                "ranking_string": data.get("ranking_data", {}).get("ranking_string", ""),  # 排名信息
-                "geo_location_name": data.get("ranking_data", {}).get("geo_location_name", ""),  # 排名地区名称
-                "ranking_out_of": data.get("ranking_data", {}).get("ranking_out_of", ""),  # 排名总数
-                "ranking": data.get("ranking_data", {}).get("ranking", ""),  # 排名位置
-            },
-            "rating": data.get("rating", ""),  # 评分
-            "num_reviews": data.get("num_reviews", ""),  # 评论数
-            "review_rating_count": data.get("review_rating_count", {}),
-            "subratings": subratings,
-            "photo_count": data.get("photo_count", ""),  # 照片数
-            "see_all_photos": data.get("see_all_photos", ""),  # 查看所有照片链接
-            "price_level": data.get("price_level", ""),  # 价格等级
-            "amenities": data.get("amenities", []),  # 设施列表
-            "category": {
-                "name": data.get("category", {}).get("name", ""),  # 类别名称
-                "localized_name": data.get("category", {}).get("localized_name", ""),  # 类别本地化名称
-            },
-            "subcategory": subcategory,
-            "styles": data.get("styles", []),  # 风格
-            "neighborhood_info": data.get("neighborhood_info", []),  # 邻里信息
-            "trip_types": trip_types,
-            "awards": data.get("awards", []),  # 奖项数据
-        }
-
-        return location_details
+        return _extract_location_details(data)
 
     def _parse_photos(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """解析地点照片数据"""
-        photos = []
-        for photo_data in data.get("data", []):
-            photo = {
-                "id": photo_data.get("id", ""),  # 照片 id
-                "is_blessed": photo_data.get("is_blessed", False),  # 是否被认证
-                "caption": photo_data.get("caption", ""),  # 照片描述
-                "published_date": self._parse_date2(photo_data.get("published_date", "")),  # 照片发布时间
-                "images": photo_data.get("images", {}).get("original", {}).get("url", ""),  # 图片 url
-                "album": photo_data.get("album", ""),  # 照片所属相册
-                "source": photo_data.get("source", {}),  # 照片来源
-                "user": photo_data.get("user", {}),  # 照片上传者
-            }
-            photos.append(photo)
-
-        return photos
-
-    def _parse_date(self, date_str: str) -> str:
-        """解析日期字符串"""
-        # 新 API 日期格式：2025-04-24T22:29:34Z
-        try:
-            return datetime.strptime(date_str, "%Y-%m-%dT%H:%M:%SZ").strftime("%Y-%m-%d %H:%M:%S")
-        except ValueError:
-            return date_str
-
-    def _parse_date2(self, date_str: str) -> str:
-        """解析日期字符串"""
-        # 新 API 日期格式：2021-02-26T00:50:50.206Z
-        try:
-            return datetime.strptime(date_str, "%Y-%m-%dT%H:%M:%S.%fZ").strftime("%Y-%m-%d %H:%M:%S")
-        except ValueError:
-            return date_str
+        return [_extract_photo(photo_data) for photo_data in data.get("data", [])]
 
 
 async def main():
@@ -591,6 +734,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    import asyncio
-
     asyncio.run(main())
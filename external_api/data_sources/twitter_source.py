@@ -5,16 +5,198 @@ Twitter data source implementation
 import asyncio
 import json
 import logging
-from datetime import datetime
-from typing import Any, Dict, Optional
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import aiohttp
 
 from .base import BaseAPI
+from .cache import cached
+from .dates import DateNormalizer
+from .extractors import Field, as_records, compile_fields, compile_record
+from .incremental import DEFAULT_MAX_PAGES, IncrementalStateStore, collect_incremental
+from .paging import DEFAULT_PAGE_RETRIES, CursorPaginator
+from .records import SearchTweet, Tweet
 
 logger = logging.getLogger("twitter_source")
 
 
+# 新API的日期格式示例: "Thu Mar 13 18:08:35 +0000 2025"
+_format_date = DateNormalizer(("%a %b %d %H:%M:%S %z %Y",), empty_as_none=True)
+
+
+def _list_or_empty(value: Any) -> List[Any]:
+    return value if isinstance(value, list) else []
+
+
+def _url_list(value: Any) -> List[Any]:
+    """media_url / video_url 可能是单个地址或地址列表"""
+    if not value:
+        return []
+    return list(value) if isinstance(value, list) else [value]
+
+
+_PUBLIC_METRICS = {
+    "retweet_count": Field("retweet_count", 0),
+    "reply_count": Field("reply_count", 0),
+    "like_count": Field("favorite_count", 0),
+    "quote_count": Field("quote_count", 0),
+    "view_count": Field("views", 0),
+    "bookmark_count": Field("bookmark_count", 0),
+}
+
+# 搜索接口返回的推文
+_extract_search_tweet = compile_record(
+    {
+        "id": Field("tweet_id", convert=str),
+        "created_at": Field("creation_date", convert=_format_date),
+        "text": Field("text", ""),
+        "media_urls": Field("media_urls", convert=_list_or_empty),
+        "video_urls": Field("video_urls", convert=_list_or_empty),
+        "author": {
+            "id": Field("user.user_id", convert=str),
+            "name": "user.name",
+            "username": "user.username",
+            "followers_count": Field("user.follower_count", 0),
+            "is_verified": Field("user.is_verified", False),
+            "is_blue_verified": Field("user.is_blue_verified", False),
+        },
+        "public_metrics": _PUBLIC_METRICS,
+    },
+    name="extract_search_tweet",
+)
+
+_extract_user_info = compile_record(
+    {
+        "id": Field("user_id", convert=str),
+        "username": "username",
+        "name": "name",
+        "created_at": Field("creation_date", convert=_format_date),
+        "description": "description",
+        "location": "location",
+        "url": "external_url",
+        "profile_image_url": "profile_pic_url",
+        "profile_banner_url": "profile_banner_url",
+        "public_metrics": {
+            "followers_count": Field("follower_count", 0),
+            "following_count": Field("following_count", 0),
+            "tweet_count": Field("number_of_tweets", 0),
+            "listed_count": Field("listed_count", 0),
+            "like_count": Field("favourites_count", 0),
+        },
+        "verified": Field("is_verified", False),
+        "blue_verified": Field("is_blue_verified", False),
+        "private": Field("is_private", False),
+        "bot": Field("bot", False),
+    },
+    name="extract_user_info",
+)
+
+# 用户时间线接口返回的推文（不含引用推文）
+_extract_tweet = compile_record(
+    {
+        "id": Field("tweet_id", convert=str),
+        "created_at": Field("creation_date", convert=_format_date),
+        "text": Field("text", ""),
+        "language": "language",
+        "media_urls": Field("media_url", convert=_url_list),
+        "video_urls": Field("video_url", convert=_url_list),
+        "public_metrics": _PUBLIC_METRICS,
+        "user": Field("user", convert=_extract_user_info),
+    },
+    name="extract_tweet",
+)
+
+# raw_records=True 时使用的记录版本，字段与上面的 dict 版本相同
+_extract_search_tweet_record = as_records(_extract_search_tweet, SearchTweet)
+_extract_tweet_record = as_records(_extract_tweet, Tweet)
+
+# LazyTweet 按字段单独取值
+_tweet_fields = compile_fields(_extract_tweet)
+
+
+def _has_referenced_tweets(result: Dict[str, Any]) -> bool:
+    """是否为回复、转推或引用推文，与 _referenced_tweets 返回非空的条件一致"""
+    return bool(
+        result.get("in_reply_to_status_id")
+        or (result.get("retweet_tweet_id") and result.get("retweet_status"))
+        or (result.get("quoted_status_id") and result.get("quoted_status"))
+    )
+
+
+def _referenced_tweets(result: Dict[str, Any]) -> Dict[str, Any]:
+    """解析被回复、转推或引用的推文，没有时返回空 dict"""
+    referenced_tweets: Dict[str, Any] = {}
+    if result.get("in_reply_to_status_id"):
+        referenced_tweets = {"type": "reply", "id": str(result.get("in_reply_to_status_id", ""))}
+    elif result.get("retweet_tweet_id") and result.get("retweet_status"):
+        retweet = result.get("retweet_status", {})
+        referenced_tweets = {"type": "retweet", **_extract_tweet(retweet)}
+        if retweet.get("quoted_status"):
+            quoted = retweet.get("quoted_status", {})
+            referenced_tweets["quoted_status"] = {"type": "quote", **_extract_tweet(quoted)}
+    elif result.get("quoted_status_id") and result.get("quoted_status"):
+        quoted = result.get("quoted_status", {})
+        referenced_tweets = {"type": "quote", **_extract_tweet(quoted)}
+    return referenced_tweets
+
+
+class LazyTweet(Mapping):
+    """
+    Read-only view of a raw user timeline tweet that parses each field on first access
+
+    Returned by get_user_tweets(lazy=True). Keys and values are the same as the eagerly parsed tweet dicts:
+    reading tweet["id"] or tweet["text"] only touches those fields, while "user", "public_metrics", media
+    URLs and "referenced_tweets" (including nested retweeted / quoted tweets) are parsed when first read
+    and then cached. Tweets that are filtered out without reading the expensive fields cost almost nothing.
+
+    Example:
+        >>> result = await client.twitter.get_user_tweets("elonmusk", limit=100, lazy=True)
+        >>> tesla = [tweet.to_dict() for tweet in result["data"]["tweets"] if "Tesla" in tweet["text"]]
+    """
+
+    __slots__ = ("_raw", "_values")
+
+    def __init__(self, raw: Dict[str, Any]):
+        self._raw = raw
+        self._values: Optional[Dict[str, Any]] = None
+
+    @property
+    def raw(self) -> Dict[str, Any]:
+        """The unparsed API result"""
+        return self._raw
+
+    def __getitem__(self, key: str) -> Any:
+        values = self._values
+        if values is None:
+            values = self._values = {}
+        elif key in values:
+            return values[key]
+        if key == "referenced_tweets":
+            value = _referenced_tweets(self._raw)
+            if not value:
+                raise KeyError(key)
+        else:
+            value = _tweet_fields[key](self._raw)
+        values[key] = value
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        yield from _tweet_fields
+        if _has_referenced_tweets(self._raw):
+            yield "referenced_tweets"
+
+    def __len__(self) -> int:
+        return len(_tweet_fields) + _has_referenced_tweets(self._raw)
+
+    def __repr__(self) -> str:
+        return f"LazyTweet(id={self['id']!r}, parsed={sorted(self._values or ())})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Parse all fields, same as the dict returned by get_user_tweets without lazy"""
+        return {key: self[key] for key in self}
+
+
 class TwitterSource(BaseAPI):
     """Twitter data source"""
 
@@ -29,6 +211,8 @@ class TwitterSource(BaseAPI):
             "X-Biz-Id":"matrix-agent",
             "X-Request-Timeout": str(config["timeout"]-5),
             }
+        self._incremental_state_path = config.get("incremental_state_path")
+        self._state_store: Optional[IncrementalStateStore] = None
 
     @property
     def source_name(self) -> str:
@@ -52,6 +236,7 @@ class TwitterSource(BaseAPI):
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
         cursor: Optional[str] = None,
+        raw_records: bool = False,
     ) -> Dict[str, Any]:
         """
         Search for tweets.
@@ -66,6 +251,8 @@ class TwitterSource(BaseAPI):
             start_date (Optional[str]): Start date, format: YYYY-MM-DD, default is None
             end_date (Optional[str]): End date, format: YYYY-MM-DD, default is None
             cursor (Optional[str]): Pagination cursor, used to get next page results, default is None for first page
+            raw_records (bool): Return tweets as compact SearchTweet records (read-only mappings, to_dict() gives the dict below)
+                instead of dicts, to save memory when accumulating many tweets, default is False
 
         Returns:
             Dict[str, Any]: Dictionary containing tweet search results, e.g.
@@ -124,80 +311,145 @@ class TwitterSource(BaseAPI):
         #     ...     print(f"Search failed: {result['error']}")
         # """
         try:
-            # 构建查询参数
-            params = {
-                "query": query,
-                "section": "top",
-                "limit": min(limit, 100),  # API限制最大100条
-            }
-
-            # 添加可选参数
-            if min_retweets is not None:
-                params["min_retweets"] = min_retweets
-            if min_likes is not None:
-                params["min_likes"] = min_likes
-            if min_replies is not None:
-                params["min_replies"] = min_replies
-            if start_date:
-                params["start_date"] = start_date
-            if end_date:
-                params["end_date"] = end_date
+            params = self._search_params(query, limit, min_retweets, min_likes, min_replies, start_date, end_date)
             if cursor:
                 params["continuation_token"] = cursor
 
-            request_url = f"{self.proxy_url}/search/search"
+            tweets, next_cursor = await self._fetch_search_page(params, raw_records)
 
-            # 使用aiohttp发送异步请求
-            async with aiohttp.ClientSession(trust_env=True) as session:
-                async with session.get(request_url, headers=self.headers, params=params, timeout=self._timeout) as response:
-                    response.raise_for_status()
-                    # 解析响应
-                    data = await response.json(content_type=None)
+            return {
+                "success": True,
+                "data": {"query": query, "count": len(tweets), "tweets": tweets, "cursor": next_cursor},
+            }
 
-            # API返回的是JSON字符串，需要先解析
-            if isinstance(data, str):
-                data = json.loads(data)
+        except asyncio.TimeoutError:
+            error_msg = f"Request timeout (timeout={self._timeout}s)"
+            logger.error(error_msg)
+            return {"success": False, "error": error_msg}
+        except aiohttp.ClientError as e:
+            error_msg = f"HTTP request error: {str(e)}"
+            logger.error(error_msg)
+            return {"success": False, "error": error_msg}
+        except Exception as e:
+            error_msg = f"Error occurred while searching tweets: {str(e)}"
+            logger.error(error_msg)
+            logger.exception(e)
+            return {"success": False, "error": error_msg}
 
-            if not isinstance(data, dict):
-                raise ValueError(f"Invalid API response format: {data}")
+    def iter_tweets(
+        self,
+        query: str,
+        max_items: Optional[int] = 1000,
+        page_size: int = 100,
+        min_retweets: Optional[int] = None,
+        min_likes: Optional[int] = None,
+        min_replies: Optional[int] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        cursor: Optional[str] = None,
+        offset: int = 0,
+        max_retries: int = DEFAULT_PAGE_RETRIES,
+        raw_records: bool = False,
+    ) -> CursorPaginator:
+        """
+        Iterate over all tweets matching a query, following continuation tokens automatically
 
-            if "results" not in data:
-                raise ValueError(f"Missing results field in API response: {data}")
-
-            tweets = []
-            for result in data["results"]:
-                if not isinstance(result, dict):
-                    logger.warning(f"Skipping invalid tweet data: {result}")
-                    continue
-
-                tweet = {
-                    "id": str(result.get("tweet_id")),
-                    "created_at": self._format_date(result.get("creation_date")),
-                    "text": result.get("text", ""),
-                    "media_urls": result.get("media_urls", []) if isinstance(result.get("media_urls"), list) else [],
-                    "video_urls": result.get("video_urls", []) if isinstance(result.get("video_urls"), list) else [],
-                    "author": {
-                        "id": str(result.get("user", {}).get("user_id")),
-                        "name": result.get("user", {}).get("name"),
-                        "username": result.get("user", {}).get("username"),
-                        "followers_count": result.get("user", {}).get("follower_count", 0),
-                        "is_verified": result.get("user", {}).get("is_verified", False),
-                        "is_blue_verified": result.get("user", {}).get("is_blue_verified", False),
-                    },
-                    "public_metrics": {
-                        "retweet_count": result.get("retweet_count", 0),
-                        "reply_count": result.get("reply_count", 0),
-                        "like_count": result.get("favorite_count", 0),
-                        "quote_count": result.get("quote_count", 0),
-                        "view_count": result.get("views", 0),
-                        "bookmark_count": result.get("bookmark_count", 0),
-                    },
+        Returns an async iterator that yields tweets (same format as search_tweets) as pages arrive.
+        The next page is prefetched while the current one is consumed, so at most two pages are held
+        in memory regardless of max_items. A failed page is retried up to max_retries times.
+
+        Args:
+            query: Search query
+            max_items: Maximum number of tweets to yield, None for no limit, default 1000
+            page_size: Tweets per request, max 100
+            min_retweets: Minimum number of retweets
+            min_likes: Minimum number of likes
+            min_replies: Minimum number of replies
+            start_date: Start date, format: YYYY-MM-DD
+            end_date: End date, format: YYYY-MM-DD
+            cursor: Saved cursor to resume from (iterator.cursor)
+            offset: Saved position within the cursor's page (iterator.offset)
+            max_retries: Retries per page before the error is raised to the caller
+            raw_records: Yield compact SearchTweet records instead of dicts, see search_tweets
+
+        Returns:
+            CursorPaginator: async iterator of tweet dicts; its cursor and offset attributes
+            point at the next tweet and can be passed back to resume after an error or restart
+
+        Example:
+            >>> async with client.twitter.iter_tweets("Tesla", max_items=500) as tweets:
+            ...     async for tweet in tweets:
+            ...         print(tweet["id"], tweet["text"])
+            >>> saved = (tweets.cursor, tweets.offset)
+        """
+        params = self._search_params(query, page_size, min_retweets, min_likes, min_replies, start_date, end_date)
+
+        async def fetch_page(page_cursor: Optional[str]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+            page_params = dict(params, continuation_token=page_cursor) if page_cursor else params
+            return await self._fetch_search_page(page_params, raw_records)
+
+        return CursorPaginator(fetch_page, cursor=cursor, offset=offset, max_items=max_items, max_retries=max_retries)
+
+    async def search_new_tweets(
+        self,
+        query: str,
+        max_items: int = 100,
+        page_size: int = 100,
+        min_retweets: Optional[int] = None,
+        min_likes: Optional[int] = None,
+        min_replies: Optional[int] = None,
+        max_pages: int = DEFAULT_MAX_PAGES,
+    ) -> Dict[str, Any]:
+        """
+        Incrementally collect the latest tweets for a query, returning only tweets not seen in previous runs
+
+        The newest seen tweet ID is stored per query in a local state file. Each run pages through the
+        latest results until it reaches an already-seen ID, so scheduled monitoring jobs only download
+        new tweets. Results are deduplicated by tweet ID. A run cut short by max_items or max_pages
+        remembers its cursor and fills the gap on the next run.
+
+        Args:
+            query: Search query
+            max_items: Stop paging once this many new tweets were collected, default 100
+            page_size: Tweets per request, max 100
+            min_retweets: Minimum number of retweets
+            min_likes: Minimum number of likes
+            min_replies: Minimum number of replies
+            max_pages: Maximum requests per run, default 10
+
+        Returns:
+            Dict[str, Any]: Dictionary containing the new tweets, e.g.
+            {
+                "success": True,
+                "data": {
+                    "query": "Tesla",
+                    "count": 3,                # Number of new tweets
+                    "tweets": [...],           # New tweets, newest first, same format as search_tweets
+                    "since_id": "1903001084357947836",  # Newest tweet ID seen so far
+                    "stats": {
+                        "requests": 1,         # Upstream requests made in this run
+                        "bytes": 52133,        # Response bytes received
+                        "duplicates": 97,      # Already seen tweets that were dropped
+                        "requests_saved": 0,   # Requests saved compared to fetching max_items tweets
+                        "bytes_saved": 0,      # Estimated bytes saved
+                        "complete": True       # False if the run stopped before reaching seen tweets
+                    }
                 }
-                tweets.append(tweet)
+            }
+        """
+        try:
+            params = self._search_params(query, page_size, min_retweets, min_likes, min_replies, None, None, section="latest")
+            # 状态按查询条件保存，与每页条数无关：换一个 page_size 不应重新拉取整个窗口
+            key = "search:" + json.dumps({name: value for name, value in params.items() if name != "limit"}, sort_keys=True, ensure_ascii=False)
 
+            async def fetch_page(cursor: Optional[str]) -> Tuple[List[Dict[str, Any]], Optional[str], int]:
+                data, size = await self._request_results("search/search", dict(params, continuation_token=cursor) if cursor else params, with_size=True)
+                return self._parse_search_results(data["results"]), data.get("continuation_token"), size
+
+            tweets, stats = await collect_incremental(self.state_store, key, fetch_page, page_size, max_items, max_pages=max_pages)
             return {
                 "success": True,
-                "data": {"query": query, "count": len(tweets), "tweets": tweets, "cursor": data.get("continuation_token")},
+                "data": {"query": query, "count": len(tweets), "tweets": tweets, "since_id": stats.pop("since_id"), "stats": stats},
             }
 
         except asyncio.TimeoutError:
@@ -209,11 +461,102 @@ class TwitterSource(BaseAPI):
             logger.error(error_msg)
             return {"success": False, "error": error_msg}
         except Exception as e:
-            error_msg = f"Error occurred while searching tweets: {str(e)}"
+            error_msg = f"Error occurred while collecting new tweets: {str(e)}"
             logger.error(error_msg)
             logger.exception(e)
             return {"success": False, "error": error_msg}
 
+    @property
+    def state_store(self) -> IncrementalStateStore:
+        """
+        增量采集的状态存储，首次使用时按 config["incremental_state_path"] 创建
+
+        Returns:
+            IncrementalStateStore: 状态存储实例
+        """
+        if self._state_store is None:
+            self._state_store = IncrementalStateStore(self._incremental_state_path) if self._incremental_state_path else IncrementalStateStore()
+        return self._state_store
+
+    def _search_params(
+        self,
+        query: str,
+        limit: int,
+        min_retweets: Optional[int],
+        min_likes: Optional[int],
+        min_replies: Optional[int],
+        start_date: Optional[str],
+        end_date: Optional[str],
+        section: str = "top",
+    ) -> Dict[str, Any]:
+        """构建搜索接口的查询参数（不含 cursor）"""
+        params = {
+            "query": query,
+            "section": section,
+            "limit": min(limit, 100),  # API限制最大100条
+        }
+
+        # 添加可选参数
+        if min_retweets is not None:
+            params["min_retweets"] = min_retweets
+        if min_likes is not None:
+            params["min_likes"] = min_likes
+        if min_replies is not None:
+            params["min_replies"] = min_replies
+        if start_date:
+            params["start_date"] = start_date
+        if end_date:
+            params["end_date"] = end_date
+        return params
+
+    async def _fetch_search_page(self, params: Dict[str, Any], raw_records: bool = False) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        请求一页搜索结果并解析
+
+        Args:
+            params: 搜索接口的查询参数
+            raw_records: 是否解析为 SearchTweet 记录
+
+        Returns:
+            Tuple[List[Dict[str, Any]], Optional[str]]: 推文列表和下一页 cursor
+
+        Raises:
+            asyncio.TimeoutError, aiohttp.ClientError: 请求失败
+            ValueError: 响应格式错误
+        """
+        data = await self._request_results("search/search", params)
+        return self._parse_search_results(data["results"], raw_records), data.get("continuation_token")
+
+    async def _request_results(self, path: str, params: Dict[str, Any], with_size: bool = False) -> Any:
+        """请求返回 results 列表的接口，并校验响应格式；with_size 为 True 时返回 (数据, 响应字节数)"""
+        request_url = f"{self.proxy_url}/{path}"
+
+        # 发送异步请求
+        response = await self.transport.request_json(
+            "GET", request_url, headers=self.headers, params=params, timeout=self._timeout, content_type=None, with_size=with_size
+        )
+        data, size = response if with_size else (response, None)
+
+        if not isinstance(data, dict):
+            raise ValueError(f"Invalid API response format: {data}")
+
+        if "results" not in data:
+            raise ValueError(f"Missing results field in API response: {data}")
+
+        return (data, size) if with_size else data
+
+    def _parse_search_results(self, results: List[Any], raw_records: bool = False) -> List[Dict[str, Any]]:
+        """解析搜索接口返回的推文，raw_records 为 True 时解析为 SearchTweet 记录"""
+        extract = _extract_search_tweet_record if raw_records else _extract_search_tweet
+        tweets = []
+        for result in results:
+            if not isinstance(result, dict):
+                logger.warning(f"Skipping invalid tweet data: {result}")
+                continue
+            tweets.append(extract(result))
+        return tweets
+
+    @cached(ttl=600)
     async def get_user_info(self, username: str, user_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Get detailed information about a Twitter user.
@@ -272,16 +615,8 @@ class TwitterSource(BaseAPI):
             if user_id:
                 params["user_id"] = user_id
 
-            # 使用aiohttp发送异步请求
-            async with aiohttp.ClientSession(trust_env=True) as session:
-                async with session.get(request_url, headers=self.headers, params=params, timeout=self._timeout) as response:
-                    response.raise_for_status()
-                    # 解析响应
-                    data = await response.json(content_type=None)
-
-            # 解析响应数据
-            if isinstance(data, str):
-                data = json.loads(data)
+            # 发送异步请求
+            data = await self.transport.request_json("GET", request_url, headers=self.headers, params=params, timeout=self._timeout, content_type=None)
 
             if not isinstance(data, dict):
                 raise ValueError(f"Invalid API response format: {data}")
@@ -304,7 +639,14 @@ class TwitterSource(BaseAPI):
             return {"success": False, "error": error_msg}
 
     async def get_user_tweets(
-        self, username: str, limit: int = 10, user_id: Optional[str] = None, include_replies: bool = False, include_pinned: bool = False
+        self,
+        username: str,
+        limit: int = 10,
+        user_id: Optional[str] = None,
+        include_replies: bool = False,
+        include_pinned: bool = False,
+        raw_records: bool = False,
+        lazy: bool = False,
     ) -> Dict[str, Any]:
         """
         Get a list of tweets from a Twitter user.
@@ -315,6 +657,11 @@ class TwitterSource(BaseAPI):
             user_id (Optional[str]): Twitter user ID, default is None, if provided user_id, username will be ignored
             include_replies (bool): Whether to include reply tweets, default is False
             include_pinned (bool): Whether to include pinned tweets, default is False
+            raw_records (bool): Return tweets as compact Tweet records (read-only mappings, to_dict() gives the dict below)
+                instead of dicts, to save memory when accumulating many tweets, default is False
+            lazy (bool): Return tweets as LazyTweet views that parse each field on first access (to_dict() gives the dict
+                below), for callers that only read a few fields or filter most tweets out; takes precedence over
+                raw_records, default is False
 
         Returns:
             Dict[str, Any]: Dictionary containing user tweet list, e.g.
@@ -369,46 +716,82 @@ class TwitterSource(BaseAPI):
         #     ...     print(f"Failed to get tweets: {result['error']}")
         # """
         try:
-            # 构建请求URL
-            request_url = f"{self.proxy_url}/user/tweets"
+            params = self._user_tweets_params(username, limit, user_id, include_replies, include_pinned)
+            data = await self._request_results("user/tweets", params)
+            if lazy:
+                tweets = [LazyTweet(result) for result in data["results"]]
+            else:
+                tweets = [self._parse_tweet_with_ref(result, raw_records) for result in data["results"]]
 
-            # 设置请求参数
-            params = {
-                "username": username,
-                "limit": min(limit, 100),  # API限制最大100条
-                "include_replies": str(include_replies).lower(),
-                "include_pinned": str(include_pinned).lower(),
+            return {
+                "success": True,
+                "data": {"username": username, "count": len(tweets), "tweets": tweets, "cursor": data.get("continuation_token")},
             }
 
-            if user_id:
-                params["user_id"] = user_id
-
-            # 使用aiohttp发送异步请求
-            async with aiohttp.ClientSession(trust_env=True) as session:
-                async with session.get(request_url, headers=self.headers, params=params, timeout=self._timeout) as response:
-                    response.raise_for_status()
-                    # 解析响应
-                    data = await response.json(content_type=None)
+        except asyncio.TimeoutError:
+            error_msg = f"Request timeout (timeout={self._timeout}s)"
+            logger.error(error_msg)
+            return {"success": False, "error": error_msg}
+        except aiohttp.ClientError as e:
+            error_msg = f"HTTP request error: {str(e)}"
+            logger.error(error_msg)
+            return {"success": False, "error": error_msg}
+        except Exception as e:
+            error_msg = f"Error occurred while getting user tweets: {str(e)}"
+            logger.error(error_msg)
+            logger.exception(e)
+            return {"success": False, "error": error_msg}
 
-            # 解析响应数据
-            if isinstance(data, str):
-                data = json.loads(data)
+    async def get_new_user_tweets(
+        self,
+        username: str,
+        max_items: int = 100,
+        page_size: int = 100,
+        user_id: Optional[str] = None,
+        include_replies: bool = False,
+        max_pages: int = DEFAULT_MAX_PAGES,
+    ) -> Dict[str, Any]:
+        """
+        Incrementally collect a user's tweets, returning only tweets not seen in previous runs
 
-            if not isinstance(data, dict):
-                raise ValueError(f"Invalid API response format: {data}")
+        Works like search_new_tweets: the newest seen tweet ID is stored per user, each run stops paging once it
+        reaches already-seen tweets, and results are deduplicated by tweet ID. Pinned tweets are excluded since
+        they break the newest-first order of the timeline.
 
-            if "results" not in data:
-                raise ValueError(f"Missing results field in API response: {data}")
+        Args:
+            username: Twitter username without @ symbol
+            max_items: Stop paging once this many new tweets were collected, default 100
+            page_size: Tweets per request, max 100
+            user_id: Twitter user ID, if provided username will be ignored
+            include_replies: Whether to include reply tweets, default is False
+            max_pages: Maximum requests per run, default 10
 
-            tweets = []
-            for result in data["results"]:
-                tweet = self._parse_tweet_with_ref(result)
+        Returns:
+            Dict[str, Any]: Dictionary containing the new tweets, e.g.
+            {
+                "success": True,
+                "data": {
+                    "username": "elonmusk",
+                    "count": 2,                # Number of new tweets
+                    "tweets": [...],           # New tweets, newest first, same format as get_user_tweets
+                    "since_id": "1903001084357947836",  # Newest tweet ID seen so far
+                    "stats": {...}             # Same as search_new_tweets
+                }
+            }
+        """
+        try:
+            params = self._user_tweets_params(username, page_size, user_id, include_replies, False)
+            key = f"user:{user_id or username}:{str(include_replies).lower()}"
 
-                tweets.append(tweet)
+            async def fetch_page(cursor: Optional[str]) -> Tuple[List[Dict[str, Any]], Optional[str], int]:
+                data, size = await self._request_results("user/tweets", dict(params, continuation_token=cursor) if cursor else params, with_size=True)
+                tweets = [self._parse_tweet_with_ref(result) for result in data["results"]]
+                return tweets, data.get("continuation_token"), size
 
+            tweets, stats = await collect_incremental(self.state_store, key, fetch_page, page_size, max_items, max_pages=max_pages)
             return {
                 "success": True,
-                "data": {"username": username, "count": len(tweets), "tweets": tweets, "cursor": data.get("continuation_token")},
+                "data": {"username": username, "count": len(tweets), "tweets": tweets, "since_id": stats.pop("since_id"), "stats": stats},
             }
 
         except asyncio.TimeoutError:
@@ -420,102 +803,42 @@ class TwitterSource(BaseAPI):
             logger.error(error_msg)
             return {"success": False, "error": error_msg}
         except Exception as e:
-            error_msg = f"Error occurred while getting user tweets: {str(e)}"
+            error_msg = f"Error occurred while collecting new user tweets: {str(e)}"
             logger.error(error_msg)
             logger.exception(e)
             return {"success": False, "error": error_msg}
 
-    def _format_date(self, date_str: Optional[str]) -> Optional[str]:
-        """Format date string"""
-        if not date_str:
-            return None
-        try:
-            # 新API的日期格式示例: "Thu Mar 13 18:08:35 +0000 2025"
-            dt = datetime.strptime(date_str, "%a %b %d %H:%M:%S %z %Y")
-            return dt.strftime("%Y-%m-%d %H:%M:%S")
-        except Exception:
-            return date_str
+    def _user_tweets_params(
+        self, username: str, limit: int, user_id: Optional[str], include_replies: bool, include_pinned: bool
+    ) -> Dict[str, Any]:
+        """构建用户推文接口的查询参数（不含 cursor）"""
+        params = {
+            "username": username,
+            "limit": min(limit, 100),  # API限制最大100条
+            "include_replies": str(include_replies).lower(),
+            "include_pinned": str(include_pinned).lower(),
+        }
+
+        if user_id:
+            params["user_id"] = user_id
+        return params
 
     def _parse_user_info(self, data: dict[str, Any]) -> dict[str, Any]:
-        return {
-            "id": str(data.get("user_id")),
-            "username": data.get("username"),
-            "name": data.get("name"),
-            "created_at": self._format_date(data.get("creation_date")),
-            "description": data.get("description"),
-            "location": data.get("location"),
-            "url": data.get("external_url"),
-            "profile_image_url": data.get("profile_pic_url"),
-            "profile_banner_url": data.get("profile_banner_url"),
-            "public_metrics": {
-                "followers_count": data.get("follower_count", 0),
-                "following_count": data.get("following_count", 0),
-                "tweet_count": data.get("number_of_tweets", 0),
-                "listed_count": data.get("listed_count", 0),
-                "like_count": data.get("favourites_count", 0),
-            },
-            "verified": data.get("is_verified", False),
-            "blue_verified": data.get("is_blue_verified", False),
-            "private": data.get("is_private", False),
-            "bot": data.get("bot", False),
-        }
+        return _extract_user_info(data)
 
     def _parse_tweet_without_ref(self, result: dict[str, Any]) -> dict[str, Any]:
-        media_urls = []
-        if result.get("media_url"):
-            if isinstance(result["media_url"], list):
-                media_urls.extend(result["media_url"])
-            else:
-                media_urls.append(result["media_url"])
-
-        # 处理视频URL
-        video_urls = []
-        if result.get("video_url"):
-            if isinstance(result["video_url"], list):
-                video_urls.extend(result["video_url"])
-            elif result["video_url"]:
-                video_urls.append(result["video_url"])
-
-        tweet = {
-            "id": str(result.get("tweet_id")),
-            "created_at": self._format_date(result.get("creation_date")),
-            "text": result.get("text", ""),
-            "language": result.get("language"),
-            "media_urls": media_urls,
-            "video_urls": video_urls,
-            "public_metrics": {
-                "retweet_count": result.get("retweet_count", 0),
-                "reply_count": result.get("reply_count", 0),
-                "like_count": result.get("favorite_count", 0),
-                "quote_count": result.get("quote_count", 0),
-                "view_count": result.get("views", 0),
-                "bookmark_count": result.get("bookmark_count", 0),
-            },
-            "user": self._parse_user_info(result.get("user", {})),
-        }
-
-        return tweet
+        return _extract_tweet(result)
 
-    def _parse_tweet_with_ref(self, result: dict[str, Any]) -> dict[str, Any]:
+    def _parse_tweet_with_ref(self, result: dict[str, Any], raw_records: bool = False) -> dict[str, Any]:
         """Parse tweet data"""
 
-        tweet = self._parse_tweet_without_ref(result)
-
-        # 处理引用推文
-        referenced_tweets: dict[str, Any] = {}
-        if result.get("in_reply_to_status_id"):
-            referenced_tweets = {"type": "reply", "id": str(result.get("in_reply_to_status_id", ""))}
-        elif result.get("retweet_tweet_id") and result.get("retweet_status"):
-            retweet = result.get("retweet_status", {})
-            referenced_tweets = {"type": "retweet", **self._parse_tweet_without_ref(retweet)}
-            if retweet.get("quoted_status"):
-                quoted = retweet.get("quoted_status", {})
-                referenced_tweets["quoted_status"] = {"type": "quote", **self._parse_tweet_without_ref(quoted)}
-        elif result.get("quoted_status_id") and result.get("quoted_status"):
-            quoted = result.get("quoted_status", {})
-            referenced_tweets = {"type": "quote", **self._parse_tweet_without_ref(quoted)}
+        tweet = _extract_tweet_record(result) if raw_records else self._parse_tweet_without_ref(result)
 
+        referenced_tweets = _referenced_tweets(result)
         if referenced_tweets:
-            tweet["referenced_tweets"] = referenced_tweets
+            if raw_records:
+                tweet.referenced_tweets = referenced_tweets
+            else:
+                tweet["referenced_tweets"] = referenced_tweets
 
         return tweet
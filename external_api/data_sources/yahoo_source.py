@@ -10,9 +10,59 @@ from typing import Any, Dict, List, Optional
 import aiohttp
 
 from .base import BaseAPI
+from .cache import cached
+from .dates import format_epoch_dates
+from .records import PriceBar
 
 logger = logging.getLogger("yahoo_finance_source")
 
+# get_stock_price 支持的返回格式
+PRICE_FORMATS = ("records", "columns", "dataframe")
+
+
+def _is_cacheable_prices(result: Any) -> bool:
+    """只缓存 dict 格式的行情结果
+
+    NumPy 数组、DataFrame 和 PriceBar 记录在内存缓存中每次读写都要深拷贝，SQLite 缓存也无法 JSON 序列化，
+    缓存它们反而抵消了列式/记录格式节省的开销
+    """
+    if not isinstance(result, dict) or not result.get("success"):
+        return False
+    prices = result["data"]["prices"]
+    return isinstance(prices, list) and (not prices or type(prices[0]) is dict)
+
+
+def _build_price_columns(timestamps: List[int], quote: Dict[str, List[Any]], as_dataframe: bool) -> Any:
+    """直接由行情数组构建列式数据，不创建逐行的 Python 对象
+
+    Args:
+        timestamps: Unix 时间戳数组（秒）
+        quote: 包含 open/high/low/close/volume 数组的行情数据
+        as_dataframe: 是否返回 pandas DataFrame
+
+    Returns:
+        Any: 列名到 NumPy 数组的字典，或 pandas DataFrame
+    """
+    import numpy as np
+
+    ts = np.asarray(timestamps, dtype="int64")
+    # 缺失值 (None) 转为 NaN，因此 volume 也使用 float64
+    columns = {
+        "timestamp": ts,
+        "date": ts.astype("datetime64[s]"),
+        "open": np.asarray(quote["open"], dtype="float64"),
+        "high": np.asarray(quote["high"], dtype="float64"),
+        "low": np.asarray(quote["low"], dtype="float64"),
+        "close": np.asarray(quote["close"], dtype="float64"),
+        "volume": np.asarray(quote["volume"], dtype="float64"),
+    }
+    if not as_dataframe:
+        return columns
+
+    import pandas as pd
+
+    return pd.DataFrame(columns, copy=False)
+
 
 class YahooFinanceSource(BaseAPI):
     """Yahoo Finance API data source implementation"""
@@ -53,6 +103,7 @@ class YahooFinanceSource(BaseAPI):
             "description": "Yahoo Finance data source, providing stock price and company information query and stock related news query",
         }
 
+    @cached(ttl=300, cache_if=_is_cacheable_prices)
     async def get_stock_price(
         self,
         symbol: str,
@@ -60,6 +111,8 @@ class YahooFinanceSource(BaseAPI):
         end_date: str,
         interval: str = "1d",
         events: str = "",
+        format: str = "records",
+        raw_records: bool = False,
     ) -> Dict[str, Any]:
         """Get stock price data. Please set start_date, end_date, interval reasonably to avoid getting too much data,
         which could cause request timeout or performance issues.
@@ -70,6 +123,11 @@ class YahooFinanceSource(BaseAPI):
             end_date: End date in YYYY-MM-DD format
             interval: Time interval, options: 1m|2m|5m|15m|30m|60m|1d|1wk|1mo, default: 1d
             events: Event type, options: capitalGain|div|split|earn|history, default: empty
+            format: Shape of "prices", options: records|columns|dataframe, default: records.
+                "columns" returns a dict of NumPy arrays (timestamp, date as UTC datetime64, open, high, low, close, volume),
+                "dataframe" returns the same columns as a pandas DataFrame. Both are recommended for intraday intervals.
+            raw_records: With format "records", return compact PriceBar records (read-only mappings, to_dict() gives
+                the dict below) instead of dicts, default: False
 
         Returns:
             Dict[str, Any]: Dictionary containing stock price data, e.g.
@@ -99,6 +157,9 @@ class YahooFinanceSource(BaseAPI):
             }
         """
         try:
+            if format not in PRICE_FORMATS:
+                raise ValueError(f"Unsupported format: {format}, options: {'|'.join(PRICE_FORMATS)}")
+
             # Convert date string to timestamp
             start_timestamp = int(datetime.strptime(start_date, "%Y-%m-%d").timestamp())
             end_timestamp = int(datetime.strptime(end_date, "%Y-%m-%d").timestamp())
@@ -124,12 +185,8 @@ class YahooFinanceSource(BaseAPI):
 
             request_url = f"{self.proxy_url}/stock/v3/get-chart"
 
-            # Send request using aiohttp
-            async with aiohttp.ClientSession(trust_env=True) as session:
-                async with session.get(request_url, headers=self.headers, params=params, timeout=self._timeout) as response:
-                    response.raise_for_status()
-                    # Parse the response
-                    data = await response.json()
+            # Send request
+            data = await self.transport.request_json("GET", request_url, headers=self.headers, params=params, timeout=self._timeout)
 
             # Check if there is an error in API response
             if data.get("chart", {}).get("error"):
@@ -140,16 +197,30 @@ class YahooFinanceSource(BaseAPI):
             timestamps = chart_data["timestamp"]
             quote = chart_data["indicators"]["quote"][0]
 
+            if format != "records":
+                prices_columns = _build_price_columns(timestamps, quote, as_dataframe=format == "dataframe")
+                return {"success": True, "data": {"symbol": symbol, "prices": prices_columns}}
+
+            if raw_records:
+                prices_records = [
+                    PriceBar(date, open_, high, low, close, int(volume) if volume is not None else None)
+                    for date, open_, high, low, close, volume in zip(
+                        format_epoch_dates(timestamps), quote["open"], quote["high"], quote["low"], quote["close"], quote["volume"]
+                    )
+                ]
+                return {"success": True, "data": {"symbol": symbol, "prices": prices_records}}
+
             # Build price data list
             prices = []
-            for i, timestamp in enumerate(timestamps):
+            for i, date in enumerate(format_epoch_dates(timestamps)):
                 price_data = {
-                    "date": datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d"),
+                    "date": date,
                     "open": quote["open"][i],
                     "high": quote["high"][i],
                     "low": quote["low"][i],
                     "close": quote["close"][i],
-                    "volume": int(quote["volume"][i]),
+                    # 当前未收盘的 K 线成交量可能为 None
+                    "volume": int(quote["volume"][i]) if quote["volume"][i] is not None else None,
                 }
                 prices.append(price_data)
 
@@ -168,6 +239,7 @@ class YahooFinanceSource(BaseAPI):
             logger.exception(e)
             return {"success": False, "error": f"Unknown error: {str(e)}"}
 
+    @cached(ttl=300)
     async def get_stock_news(self, symbol: str, region: str = "US", snippet_count: int = 10) -> Dict[str, Any]:
         """获取股票相关的新闻数据
         Args:
@@ -204,57 +276,56 @@ class YahooFinanceSource(BaseAPI):
 
             # 发送POST请求
             try:
-                async with aiohttp.ClientSession(trust_env=True) as session:
-                    # 使用POST请求，并设置空数据体
-                    async with session.post(
-                        request_url,
-                        headers=self.headers,
-                        params=params,
-                        data="",  # load_more 逻辑，先不适配
-                        timeout=self._timeout,
-                    ) as response:
-                        response.raise_for_status()
-                        data = await response.json()
-
-                        # 提取并处理新闻数据 - 根据实际响应格式调整
-                        stream_items = []
-                        # 检查响应结构中的main.stream路径
-                        if data.get("data") and data["data"].get("main") and data["data"]["main"].get("stream"):
-                            stream_items = data["data"]["main"]["stream"]
-
-                        # 转换为简化的新闻对象列表
-                        simple_news = []
-                        for stream_item in stream_items:
-                            content = stream_item.get("content", {})
-                            if not content:
-                                continue
-
-                            # 获取链接
-                            link = ""
-                            click_through_url = content.get("clickThroughUrl", {})
-                            if click_through_url and click_through_url.get("url"):
-                                link = click_through_url["url"]
-
-                            # 获取发布者
-                            publisher = ""
-                            if content.get("provider") and content["provider"].get("displayName"):
-                                publisher = content["provider"]["displayName"]
-
-                            # 创建简化的新闻项
-                            news_item = {
-                                "title": content.get("title", ""),
-                                "publisher": publisher,
-                                "publish_date": content.get("pubDate", ""),
-                                "link": link,
-                                "uuid": content.get("id", ""),
-                                "content_type": content.get("contentType", ""),
-                                "thumbnail": self._extract_thumbnail(content.get("thumbnail", {})),
-                                "tickers": self._extract_tickers(content.get("finance", {})),
-                            }
-                            simple_news.append(news_item)
-
-                        # 返回结构化的新闻列表
-                        return {"success": True, "data": {"symbol": symbol, "simple_news": simple_news}}
+                # 使用POST请求，并设置空数据体
+                data = await self.transport.request_json(
+                    "POST",
+                    request_url,
+                    headers=self.headers,
+                    params=params,
+                    data="",  # load_more 逻辑，先不适配
+                    timeout=self._timeout,
+                    idempotent=True,
+                )
+
+                # 提取并处理新闻数据 - 根据实际响应格式调整
+                stream_items = []
+                # 检查响应结构中的main.stream路径
+                if data.get("data") and data["data"].get("main") and data["data"]["main"].get("stream"):
+                    stream_items = data["data"]["main"]["stream"]
+
+                # 转换为简化的新闻对象列表
+                simple_news = []
+                for stream_item in stream_items:
+                    content = stream_item.get("content", {})
+                    if not content:
+                        continue
+
+                    # 获取链接
+                    link = ""
+                    click_through_url = content.get("clickThroughUrl", {})
+                    if click_through_url and click_through_url.get("url"):
+                        link = click_through_url["url"]
+
+                    # 获取发布者
+                    publisher = ""
+                    if content.get("provider") and content["provider"].get("displayName"):
+                        publisher = content["provider"]["displayName"]
+
+                    # 创建简化的新闻项
+                    news_item = {
+                        "title": content.get("title", ""),
+                        "publisher": publisher,
+                        "publish_date": content.get("pubDate", ""),
+                        "link": link,
+                        "uuid": content.get("id", ""),
+                        "content_type": content.get("contentType", ""),
+                        "thumbnail": self._extract_thumbnail(content.get("thumbnail", {})),
+                        "tickers": self._extract_tickers(content.get("finance", {})),
+                    }
+                    simple_news.append(news_item)
+
+                # 返回结构化的新闻列表
+                return {"success": True, "data": {"symbol": symbol, "simple_news": simple_news}}
 
             except asyncio.TimeoutError:
                 error_msg = f"请求超时 (timeout={self._timeout}秒)"
@@ -315,6 +386,7 @@ class YahooFinanceSource(BaseAPI):
                     tickers.append(ticker_data["symbol"])
         return tickers
 
+    @cached(ttl=300)
     async def get_stock_info(self, symbol: str) -> Dict[str, Any]:
         """Get basic stock information
 
@@ -356,10 +428,7 @@ class YahooFinanceSource(BaseAPI):
 
             # Send request
             try:
-                async with aiohttp.ClientSession(trust_env=True) as session:
-                    async with session.get(request_url, headers=self.headers, params=params, timeout=self._timeout) as response:
-                        response.raise_for_status()
-                        data = await response.json()
+                data = await self.transport.request_json("GET", request_url, headers=self.headers, params=params, timeout=self._timeout)
 
             except asyncio.TimeoutError:
                 error_msg = f"Request timeout (timeout={self._timeout}s)"
@@ -416,8 +485,12 @@ class YahooFinanceSource(BaseAPI):
         end_date: str,
         interval: str = "1d",
         events: str = "",
+        max_concurrency: int = 8,
+        symbol_timeout: Optional[float] = None,
+        format: str = "records",
+        raw_records: bool = False,
     ) -> Dict[str, Any]:
-        """Get price data for multiple stocks
+        """Get price data for multiple stocks, fetched concurrently
 
         Args:
             symbols(List[str]): Stock code list
@@ -425,6 +498,10 @@ class YahooFinanceSource(BaseAPI):
             end_date(str): End date in YYYY-MM-DD format
             interval(str): Time interval, options: 1m|2m|5m|15m|30m|60m|1d|1wk|1mo, default: 1d
             events(str): Event type, options: capitalGain|div|split|earn|history, default: empty
+            max_concurrency(int): Maximum number of symbols fetched at the same time, default: 8
+            symbol_timeout(Optional[float]): Timeout in seconds for each symbol, default: None (use the request timeout)
+            format(str): Shape of each stock's "prices", options: records|columns|dataframe, see get_stock_price, default: records
+            raw_records(bool): With format "records", return compact PriceBar records, see get_stock_price, default: False
 
         Returns:
             Dict[str, Any]: Dictionary containing stock price data, e.g.
@@ -468,22 +545,38 @@ class YahooFinanceSource(BaseAPI):
         try:
             stocks_data = []
             failed_symbols = []
-
-            # Iterate over stock code list to get data for each stock
-            for symbol in symbols:
-                try:
-                    result = await self.get_stock_price(
-                        symbol=symbol, start_date=start_date, end_date=end_date, interval=interval, events=events
-                    )
-                    if result["success"]:
-                        stocks_data.append(result["data"])
-                    else:
-                        failed_symbols.append((symbol, result["error"]))
-                        logger.warning(f"Failed to get data for stock {symbol}: {result['error']}")
-                except Exception as e:
-                    failed_symbols.append((symbol, str(e)))
-                    logger.error(f"Error occurred while getting data for stock {symbol}: {str(e)}")
-                    logger.exception(e)
+            semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+            async def fetch(symbol: str) -> Dict[str, Any]:
+                async with semaphore:
+                    try:
+                        return await asyncio.wait_for(
+                            self.get_stock_price(
+                                symbol=symbol,
+                                start_date=start_date,
+                                end_date=end_date,
+                                interval=interval,
+                                events=events,
+                                format=format,
+                                raw_records=raw_records,
+                            ),
+                            timeout=symbol_timeout,
+                        )
+                    except asyncio.TimeoutError:
+                        return {"success": False, "error": f"Request timeout (timeout={symbol_timeout}s)"}
+                    except Exception as e:
+                        logger.error(f"Error occurred while getting data for stock {symbol}: {str(e)}")
+                        logger.exception(e)
+                        return {"success": False, "error": str(e)}
+
+            # Fetch all symbols with bounded concurrency, gather keeps the input order
+            results = await asyncio.gather(*(fetch(symbol) for symbol in symbols))
+            for symbol, result in zip(symbols, results):
+                if result["success"]:
+                    stocks_data.append(result["data"])
+                else:
+                    failed_symbols.append((symbol, result["error"]))
+                    logger.warning(f"Failed to get data for stock {symbol}: {result['error']}")
 
             # If all stocks fail to get data
             if len(failed_symbols) == len(symbols):
@@ -505,6 +598,7 @@ class YahooFinanceSource(BaseAPI):
             logger.exception(e)
             return {"success": False, "error": str(e)}
 
+    @cached(ttl=900)
     async def get_stock_insights(self, symbol: str) -> Dict[str, Any]:
         """Get stock insight data, including technical analysis, valuation, and company snapshot
 
@@ -568,16 +662,12 @@ class YahooFinanceSource(BaseAPI):
             params = {"symbol": symbol}
 
             # Send request
-            async with aiohttp.ClientSession(trust_env=True) as session:
-                try:
-                    async with session.get(request_url, headers=self.headers, params=params, timeout=self._timeout) as response:
-                        # Check response status
-                        response.raise_for_status()
-                        data = await response.json()
-                except asyncio.TimeoutError:
-                    return {"success": False, "error": f"Request timeout (timeout={self._timeout}s)"}
-                except aiohttp.ClientError as e:
-                    return {"success": False, "error": f"HTTP request error: {str(e)}"}
+            try:
+                data = await self.transport.request_json("GET", request_url, headers=self.headers, params=params, timeout=self._timeout)
+            except asyncio.TimeoutError:
+                return {"success": False, "error": f"Request timeout (timeout={self._timeout}s)"}
+            except aiohttp.ClientError as e:
+                return {"success": False, "error": f"HTTP request error: {str(e)}"}
 
             # Check if there is an error in API response
             if data.get("finance", {}).get("error"):
@@ -634,6 +724,7 @@ class YahooFinanceSource(BaseAPI):
             logger.exception(e)
             return {"success": False, "error": str(e)}
 
+    @cached(ttl=3600)
     async def get_stock_statistics(self, symbol: str, region: Optional[str] = None, lang: Optional[str] = None) -> Dict[str, Any]:
         """Get stock statistics data, including valuation metrics, financial ratios, and shareholder information
 
@@ -709,16 +800,12 @@ class YahooFinanceSource(BaseAPI):
                 params["lang"] = lang
 
             # Send request
-            async with aiohttp.ClientSession(trust_env=True) as session:
-                try:
-                    async with session.get(request_url, headers=self.headers, params=params, timeout=self._timeout) as response:
-                        # Check response status
-                        response.raise_for_status()
-                        data = await response.json()
-                except asyncio.TimeoutError:
-                    return {"success": False, "error": f"Request timeout (timeout={self._timeout}s)"}
-                except aiohttp.ClientError as e:
-                    return {"success": False, "error": f"HTTP request error: {str(e)}"}
+            try:
+                data = await self.transport.request_json("GET", request_url, headers=self.headers, params=params, timeout=self._timeout)
+            except asyncio.TimeoutError:
+                return {"success": False, "error": f"Request timeout (timeout={self._timeout}s)"}
+            except aiohttp.ClientError as e:
+                return {"success": False, "error": f"HTTP request error: {str(e)}"}
 
             # Check if there is an error in API response
             if data.get("quoteSummary", {}).get("error"):
@@ -772,6 +859,7 @@ class YahooFinanceSource(BaseAPI):
             logger.exception(e)
             return {"success": False, "error": str(e)}
 
+    @cached(ttl=3600)
     async def get_financial_data(self, symbol: str) -> Dict[str, Any]:
         """Get stock financial data
 
@@ -852,10 +940,7 @@ class YahooFinanceSource(BaseAPI):
 
             # Send request
             try:
-                async with aiohttp.ClientSession(trust_env=True) as session:
-                    async with session.get(request_url, headers=self.headers, params=params, timeout=self._timeout) as response:
-                        response.raise_for_status()
-                        data = await response.json()
+                data = await self.transport.request_json("GET", request_url, headers=self.headers, params=params, timeout=self._timeout)
 
             except asyncio.TimeoutError:
                 error_msg = f"Request timeout (timeout={self._timeout}s)"
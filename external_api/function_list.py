@@ -0,0 +1,94 @@
+"""
+函数列表加载
+
+只依赖标准库，导入 external_api 时不会引入 aiohttp / pydantic。
+解析后的函数列表以 marshal 格式缓存在 __pycache__ 中，按源文件的 mtime 和大小校验，源文件变化后自动重建。
+"""
+
+import json
+import marshal
+import os
+import sys
+from typing import Any, Dict
+
+MCP_FUNCTION_LIST_JSON_FILE = "mcp_function_list.json"
+
+# 缓存格式变化时递增
+_CACHE_VERSION = 1
+
+
+def _cache_path(file_path: str) -> str:
+    directory, name = os.path.split(os.path.abspath(file_path))
+    return os.path.join(directory, "__pycache__", f"{name}.marshal")
+
+
+def _read_cache(cache_path: str, mtime_ns: int, size: int) -> Any:
+    try:
+        with open(cache_path, "rb") as f:
+            version, cached_mtime_ns, cached_size, data = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if (version, cached_mtime_ns, cached_size) != (_CACHE_VERSION, mtime_ns, size):
+        return None
+    return data
+
+
+def _write_cache(cache_path: str, mtime_ns: int, size: int, data: Any) -> None:
+    if sys.dont_write_bytecode:
+        return
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            f.write(marshal.dumps((_CACHE_VERSION, mtime_ns, size, data)))
+        os.replace(tmp_path, cache_path)
+    except (OSError, ValueError):
+        # 只读目录或无法 marshal 的数据，下次仍然解析 JSON
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def load_function_list(file_path: str, use_cache: bool = True) -> Any:
+    """
+    加载函数列表 JSON，优先使用 marshal 缓存
+
+    Args:
+        file_path: 函数列表 JSON 路径
+        use_cache: 是否读写 __pycache__ 中的缓存
+
+    Returns:
+        Any: 解析后的 JSON 数据
+    """
+    if not use_cache:
+        with open(file_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    stat = os.stat(file_path)
+    cache_path = _cache_path(file_path)
+    data = _read_cache(cache_path, stat.st_mtime_ns, stat.st_size)
+    if data is not None:
+        return data
+
+    with open(file_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    _write_cache(cache_path, stat.st_mtime_ns, stat.st_size, data)
+    return data
+
+
+def index_function_list(function_list: Any) -> Dict[str, Dict[str, Any]]:
+    """
+    按函数名索引函数列表，忽略没有 name 的条目
+
+    Args:
+        function_list: load_function_list 的返回值
+
+    Returns:
+        Dict[str, Dict[str, Any]]: 函数名 -> 函数信息
+    """
+    return {
+        function_info["name"]: function_info
+        for function_info in function_list
+        if isinstance(function_info, dict) and "name" in function_info
+    }
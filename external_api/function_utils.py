@@ -1,19 +1,42 @@
 import asyncio
-import json
+import atexit
+import codecs
 import os
+import threading
 import uuid
-from typing import Any, Dict, List, Optional, cast
+import weakref
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple, cast
 
 import aiohttp
 from pydantic import BaseModel
 
+from external_api.data_sources.codec import JSON_CONTENT_TYPE, dumps, read_json
+from external_api.function_list import MCP_FUNCTION_LIST_JSON_FILE, index_function_list, load_function_list
+
 ENV_AGENT_NAME = "AGENT_NAME"
 ENV_FUNC_SERVER_PORT = "FUNC_SERVER_PORT"
-MCP_FUNCTION_LIST_JSON_FILE = "mcp_function_list.json"
 
 SERVER_PORT = 12306
 PROXY_TIMEOUT = 3600
 
+# 单次 /execute_batch 请求最多包含的调用数
+BATCH_MAX_SIZE = 100
+# 服务端不支持 /execute_batch、/execute_stream 时返回的状态码
+UNSUPPORTED_ENDPOINT_STATUS = (404, 405, 501)
+
+# 流式调用: 两次读取之间的最长等待（秒）、每次读取的块大小、单行 NDJSON 的最大长度
+STREAM_READ_TIMEOUT = 300
+STREAM_CHUNK_SIZE = 64 * 1024
+STREAM_MAX_LINE = 16 * 1024 * 1024
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/jsonl")
+# 请求体由 codec.dumps 编码（可选 orjson），不经过 aiohttp 默认的标准库编码
+JSON_HEADERS = {"Content-Type": JSON_CONTENT_TYPE}
+
+# 连接池配置，可通过环境变量覆盖
+POOL_LIMIT = int(os.environ.get("FUNC_SERVER_POOL_LIMIT", "100"))
+POOL_LIMIT_PER_HOST = int(os.environ.get("FUNC_SERVER_POOL_LIMIT_PER_HOST", "0"))
+POOL_KEEPALIVE_TIMEOUT = float(os.environ.get("FUNC_SERVER_POOL_KEEPALIVE_TIMEOUT", "30"))
+
 
 class ToolResult(BaseModel):
     """工具结果"""
@@ -22,8 +45,117 @@ class ToolResult(BaseModel):
     is_error: bool
 
 
+class ToolStreamEvent(BaseModel):
+    """流式调用事件，type 为 progress / output / result，result 为最后一个事件"""
+
+    type: str
+    message: str = ""
+    data: Any = None
+    is_error: bool = False
+
+
+async def _iter_lines(content: aiohttp.StreamReader, max_line: int = STREAM_MAX_LINE) -> AsyncIterator[bytes]:
+    """按块读取响应并切分为非空行，缓冲区不超过 max_line"""
+    buffer = bytearray()
+    async for chunk in content.iter_chunked(STREAM_CHUNK_SIZE):
+        buffer.extend(chunk)
+        start = 0
+        while True:
+            end = buffer.find(b"\n", start)
+            if end < 0:
+                break
+            line = bytes(buffer[start:end])
+            start = end + 1
+            if line.strip():
+                yield line
+        del buffer[:start]
+        if len(buffer) > max_line:
+            raise ValueError(f"Stream line exceeds {max_line} bytes")
+    if buffer.strip():
+        yield bytes(buffer)
+
+
+# 退出时清理各实例中事件循环已关闭的会话
+_live_pools: "weakref.WeakSet[ProxySessionPool]" = weakref.WeakSet()
+
+
+@atexit.register
+def _discard_closed_sessions() -> None:
+    for owner in list(_live_pools):
+        owner._discard_closed_loops()
+
+
+class ProxySessionPool:
+    """
+    按事件循环复用的 aiohttp 会话池
+
+    每个事件循环懒加载一个带 keep-alive 连接池的 ClientSession，
+    所有 FunctionProxy 共享，避免每次调用都重新建立 TCP 连接。
+    事件循环关闭前未调用 close() 的会话在下次获取会话或进程退出时丢弃。
+    """
+
+    def __init__(
+        self,
+        limit: int = POOL_LIMIT,
+        limit_per_host: int = POOL_LIMIT_PER_HOST,
+        keepalive_timeout: float = POOL_KEEPALIVE_TIMEOUT,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        # 会话和连接器引用了自己的事件循环，弱引用字典的键永远不会被回收；改为在循环关闭后显式清理
+        self._sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+        self._lock = threading.Lock()
+        _live_pools.add(self)
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """获取当前事件循环的会话，不存在或已关闭时创建"""
+        loop = asyncio.get_running_loop()
+        self._discard_closed_loops()
+        with self._lock:
+            session = self._sessions.get(loop)
+            if session is None or session.closed:
+                connector = aiohttp.TCPConnector(
+                    limit=self.limit,
+                    limit_per_host=self.limit_per_host,
+                    keepalive_timeout=self.keepalive_timeout,
+                )
+                session = aiohttp.ClientSession(connector=connector, trust_env=True)
+                self._sessions[loop] = session
+        return session
+
+    def _discard_closed_loops(self) -> None:
+        """丢弃事件循环已关闭（如 asyncio.run 结束后）而未调用 close() 的会话"""
+        with self._lock:
+            closed = [loop for loop in self._sessions if loop.is_closed()]
+            sessions = [self._sessions.pop(loop) for loop in closed]
+        for session in sessions:
+            # 循环已关闭，无法 await session.close()；连接随循环一起失效，同步标记连接器关闭，避免退出时报告未关闭的会话
+            connector = session.connector
+            session.detach()
+            if connector is not None:
+                connector._close()
+
+    async def close(self) -> None:
+        """关闭当前事件循环的会话，应在进程/事件循环退出前调用"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            session = self._sessions.pop(loop, None)
+        if session is not None and not session.closed:
+            await session.close()
+
+
+# 全局默认会话池
+default_session_pool = ProxySessionPool()
+
+
+async def close_proxy_sessions() -> None:
+    """关闭默认会话池在当前事件循环中的会话"""
+    await default_session_pool.close()
+
+
 class FunctionProxy:
-    def __init__(self, function_info: Dict[str, Any]):
+    def __init__(self, function_info: Dict[str, Any], session_pool: Optional[ProxySessionPool] = None):
         self.name: str = function_info["name"]
         self.origin_name: str | None = function_info.get("origin_name", None)
         self.params: List[Dict[str, Any]] = function_info["parameters"]
@@ -32,13 +164,14 @@ class FunctionProxy:
         self.agent_name: str = os.environ.get(ENV_AGENT_NAME, "")
         self.server_port = SERVER_PORT
         self.timeout: int = PROXY_TIMEOUT
+        self.session_pool = session_pool or default_session_pool
 
     def get_server_url(self):
         if self.server_port == 0:
             raise Exception("PORT is not set, please set it in the environment variable")
         return f"http://localhost:{self.server_port}"
 
-    async def __call__(self, *args, **kwargs) -> ToolResult:
+    def _build_request(self, args: Sequence[Any], kwargs: Dict[str, Any]) -> Dict[str, Any]:
         call_params = kwargs.copy()
         args_len = len(args)
 
@@ -50,7 +183,7 @@ class FunctionProxy:
                 if i < self.params_len:
                     call_params[self.params[i]["name"]] = args[i]
 
-        request = {
+        return {
             "request_id": str(uuid.uuid4()),
             "function_name": self.origin_name or self.name,
             "function_kind": self.kind,
@@ -58,32 +191,103 @@ class FunctionProxy:
             "parameters": call_params,
         }
 
+    def _parse_result(self, request: Dict[str, Any], result: Dict[str, Any]) -> ToolResult:
+        if result.get("is_error", False):
+            return ToolResult(is_error=True, message=result.get("message", "Unknown error"))
+
+        tool_result = ToolResult(is_error=False, message=result.get("message", "succeed"))
+        return self._intercept_response(self.name, request, tool_result)
+
+    async def __call__(self, *args, **kwargs) -> ToolResult:
+        request = self._build_request(args, kwargs)
+
         # 发出请求前的拦截
         tool_result = self._intercept_request(self.name, request)
         if tool_result is not None:
             return tool_result
 
+        return await self._execute(request)
+
+    async def _execute(self, request: Dict[str, Any]) -> ToolResult:
         timeout = aiohttp.ClientTimeout(total=self.timeout)
-        async with aiohttp.ClientSession(timeout=timeout, trust_env=True) as session:
-            try:
-                async with session.post(f"{self.get_server_url()}/execute", json=request) as response:
-                    if response.status != 200:
-                        return ToolResult(is_error=True, message=f"Function call failed: {await response.text()}")
-
-                    result = await response.json()
-                    if result.get("is_error", False):
-                        return ToolResult(is_error=True, message=result.get("message", "Unknown error"))
-
-                    tool_result = ToolResult(is_error=False, message=result.get("message", "succeed"))
-                    return self._intercept_response(self.name, request, tool_result)
-            except asyncio.TimeoutError:
-                error_msg = f"Timeout when calling function {self.name}"
-                return ToolResult(is_error=True, message=error_msg)
-            except Exception as e:
-                import traceback
-
-                error_msg = f"Error: {str(e)}\nTraceback:\n{traceback.format_exc()}"
-                return ToolResult(is_error=True, message=error_msg)
+        session = self.session_pool.get_session()
+        try:
+            async with session.post(f"{self.get_server_url()}/execute", data=dumps(request), headers=JSON_HEADERS, timeout=timeout) as response:
+                if response.status != 200:
+                    return ToolResult(is_error=True, message=f"Function call failed: {await response.text()}")
+
+                return self._parse_result(request, await read_json(response))
+        except asyncio.TimeoutError:
+            error_msg = f"Timeout when calling function {self.name}"
+            return ToolResult(is_error=True, message=error_msg)
+        except Exception as e:
+            import traceback
+
+            error_msg = f"Error: {str(e)}\nTraceback:\n{traceback.format_exc()}"
+            return ToolResult(is_error=True, message=error_msg)
+
+    def _result_event(self, request: Dict[str, Any], result: Dict[str, Any]) -> ToolStreamEvent:
+        tool_result = self._parse_result(request, result)
+        return ToolStreamEvent(type="result", message=tool_result.message, is_error=tool_result.is_error, data=result.get("data"))
+
+    async def stream(self, *args, **kwargs) -> AsyncIterator[ToolStreamEvent]:
+        """
+        流式调用函数，服务端的进度和部分输出到达后立即产出，不在内存中累积完整结果
+
+        POST /execute_stream，请求体与 /execute 相同:
+        - NDJSON 响应: 每行一个事件 {"type", "message", "data", "is_error"}，以 type="result" 结束
+        - text/* 分块响应: 每块作为一个 output 事件，结束后产出成功的 result 事件
+        - 普通 JSON 响应: 作为单个 result 事件
+        服务端不支持流式接口（404/405/501）时回退为 /execute。所有错误都以 is_error=True 的 result 事件返回。
+        """
+        request = self._build_request(args, kwargs)
+
+        # 发出请求前的拦截
+        tool_result = self._intercept_request(self.name, request)
+        if tool_result is not None:
+            yield ToolStreamEvent(type="result", message=tool_result.message, is_error=tool_result.is_error)
+            return
+
+        timeout = aiohttp.ClientTimeout(total=self.timeout, sock_read=STREAM_READ_TIMEOUT)
+        session = self.session_pool.get_session()
+        unsupported = False
+        try:
+            async with session.post(f"{self.get_server_url()}/execute_stream", data=dumps(request), headers=JSON_HEADERS, timeout=timeout) as response:
+                if response.status in UNSUPPORTED_ENDPOINT_STATUS:
+                    unsupported = True
+                elif response.status != 200:
+                    yield ToolStreamEvent(type="result", is_error=True, message=f"Function call failed: {await response.text()}")
+                elif response.content_type in NDJSON_CONTENT_TYPES:
+                    async for line in _iter_lines(response.content):
+                        event = ToolStreamEvent.model_validate_json(line)
+                        if event.type == "result":
+                            yield self._result_event(request, event.model_dump(exclude_unset=True))
+                            return
+                        yield event
+                    yield ToolStreamEvent(type="result", is_error=True, message=f"Stream of function {self.name} ended without a result")
+                elif response.content_type.startswith("text/"):
+                    decoder = codecs.getincrementaldecoder(response.charset or "utf-8")(errors="replace")
+                    async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                        text = decoder.decode(chunk)
+                        if text:
+                            yield ToolStreamEvent(type="output", message=text)
+                    text = decoder.decode(b"", final=True)
+                    if text:
+                        yield ToolStreamEvent(type="output", message=text)
+                    yield self._result_event(request, {"is_error": False})
+                else:
+                    yield self._result_event(request, await read_json(response))
+        except asyncio.TimeoutError:
+            yield ToolStreamEvent(type="result", is_error=True, message=f"Timeout when calling function {self.name}")
+        except Exception as e:
+            import traceback
+
+            error_msg = f"Error: {str(e)}\nTraceback:\n{traceback.format_exc()}"
+            yield ToolStreamEvent(type="result", is_error=True, message=error_msg)
+
+        if unsupported:
+            tool_result = await self._execute(request)
+            yield ToolStreamEvent(type="result", message=tool_result.message, is_error=tool_result.is_error)
 
     def _intercept_request(self, function_name: str, request: Dict[str, Any]) -> Optional[ToolResult]:
         if self.kind == "agent" and self.agent_name and "planner" not in self.agent_name:
@@ -97,14 +301,118 @@ class FunctionProxy:
         return result
 
 
-def load_function_proxys(file_path: str) -> tuple[List[Dict[str, Any]], Dict[str, FunctionProxy]]:
+BatchCall = Tuple[FunctionProxy, Sequence[Any], Dict[str, Any]]
+
+# 已确认不支持 /execute_batch 的服务端地址，之后直接回退为单次调用
+_batch_unsupported_servers = set()
+
+
+def _fail_all(items: List[Tuple[int, FunctionProxy, Dict[str, Any]]], results: List[Optional[ToolResult]], message: str) -> None:
+    for index, _, _ in items:
+        results[index] = ToolResult(is_error=True, message=message)
+
+
+async def _execute_each(items: List[Tuple[int, FunctionProxy, Dict[str, Any]]], results: List[Optional[ToolResult]]) -> None:
+    tool_results = await asyncio.gather(*(proxy._execute(request) for _, proxy, request in items))
+    for (index, _, _), tool_result in zip(items, tool_results):
+        results[index] = tool_result
+
+
+async def _execute_batch_request(
+    server_url: str,
+    session_pool: ProxySessionPool,
+    items: List[Tuple[int, FunctionProxy, Dict[str, Any]]],
+    results: List[Optional[ToolResult]],
+) -> None:
+    if server_url in _batch_unsupported_servers:
+        await _execute_each(items, results)
+        return
+
+    timeout = aiohttp.ClientTimeout(total=max(proxy.timeout for _, proxy, _ in items))
+    session = session_pool.get_session()
+    try:
+        async with session.post(
+            f"{server_url}/execute_batch",
+            data=dumps({"requests": [request for _, _, request in items]}),
+            headers=JSON_HEADERS,
+            timeout=timeout,
+        ) as response:
+            unsupported = response.status in UNSUPPORTED_ENDPOINT_STATUS
+            if not unsupported:
+                if response.status != 200:
+                    _fail_all(items, results, f"Function call failed: {await response.text()}")
+                    return
+                body = await read_json(response)
+    except asyncio.TimeoutError:
+        _fail_all(items, results, f"Timeout when calling functions {', '.join(proxy.name for _, proxy, _ in items)}")
+        return
+    except Exception as e:
+        import traceback
+
+        _fail_all(items, results, f"Error: {str(e)}\nTraceback:\n{traceback.format_exc()}")
+        return
+
+    if unsupported:
+        _batch_unsupported_servers.add(server_url)
+        await _execute_each(items, results)
+        return
+
+    returned = {item.get("request_id"): item for item in body.get("results", []) if isinstance(item, dict)}
+    for index, proxy, request in items:
+        result = returned.get(request["request_id"])
+        if result is None:
+            results[index] = ToolResult(is_error=True, message=f"No result returned for function {proxy.name}")
+        else:
+            results[index] = proxy._parse_result(request, result)
+
+
+async def execute_batch(calls: Sequence[BatchCall], max_batch_size: int = BATCH_MAX_SIZE) -> List[ToolResult]:
+    """
+    批量调用函数，多个调用合并为一次 POST /execute_batch
+
+    请求体为 {"requests": [request, ...]}，每个 request 与 /execute 的请求相同；
+    响应体为 {"results": [{"request_id", "is_error", "message"}, ...]}，按 request_id 对应。
+    服务端返回 404/405/501 时认为不支持批量接口，回退为并发的单次调用。
+
+    Args:
+        calls: (proxy, args, kwargs) 列表
+        max_batch_size: 单次请求最多包含的调用数，超出时拆分为多个并发请求
+
+    Returns:
+        List[ToolResult]: 与 calls 顺序一致的结果，单个调用的失败只体现在对应的 ToolResult 中
+    """
+    results: List[Optional[ToolResult]] = [None] * len(calls)
+    groups: Dict[Tuple[str, ProxySessionPool], List[Tuple[int, FunctionProxy, Dict[str, Any]]]] = {}
+    for index, (proxy, args, kwargs) in enumerate(calls):
+        try:
+            request = proxy._build_request(args, kwargs)
+            tool_result = proxy._intercept_request(proxy.name, request)
+            if tool_result is None:
+                groups.setdefault((proxy.get_server_url(), proxy.session_pool), []).append((index, proxy, request))
+        except Exception as e:
+            tool_result = ToolResult(is_error=True, message=f"Error: {str(e)}")
+        if tool_result is not None:
+            results[index] = tool_result
+
+    await asyncio.gather(
+        *(
+            _execute_batch_request(server_url, session_pool, items[start : start + max_batch_size], results)
+            for (server_url, session_pool), items in groups.items()
+            for start in range(0, len(items), max_batch_size)
+        )
+    )
+    return cast(List[ToolResult], results)
+
+
+def load_function_proxys(
+    file_path: str, session_pool: Optional[ProxySessionPool] = None
+) -> tuple[List[Dict[str, Any]], Dict[str, FunctionProxy]]:
     # 加载 function_list.json 并创建 function proxies
-    with open(file_path, "r", encoding="utf-8") as f:
-        function_list = json.load(f)
+    function_list = load_function_list(file_path)
 
-    proxies = {}
-    for function_info in function_list:
-        if isinstance(function_info, dict) and "name" in function_info:
-            proxies[function_info["name"]] = FunctionProxy(function_info)
+    proxies = {
+        name: FunctionProxy(function_info, session_pool=session_pool)
+        for name, function_info in index_function_list(function_list).items()
+    }
 
     return function_list, proxies
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Benchmark the shared date normalization (data_sources.dates) against per-call strptime
+
+The previous per-source helpers (a strptime + strftime for every item) are
+copied here and timed against the DateNormalizer instances the sources now use:
+
+- Twitter creation dates, --items tweets sharing --distinct timestamps, and all distinct
+- Pinterest dates alternating between its two formats
+- TripAdvisor review and photo dates
+- Yahoo bar dates: datetime.fromtimestamp per bar vs format_epoch_dates, for
+  one-minute bars, daily bars and a NumPy array of one-minute bars
+
+The run also checks that every normalized value equals the previous helper's
+output (including empty and unparsable values), and that format_epoch_dates
+matches datetime.fromtimestamp in time zones with half-hour, 45-minute and
+daylight-saving offsets.
+
+Exits non-zero if any check fails.
+
+Usage: python scripts/benchmarks/bench_dates.py [--items 20000] [--distinct 500] [--repeat 5]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, List, Optional
+
+import stub_server  # noqa: F401
+
+from external_api.data_sources import dates
+from external_api.data_sources.metal_source import _parse_time
+from external_api.data_sources.pinterest_source import _format_date as pinterest_format_date
+from external_api.data_sources.tripadvisor_source import _parse_date
+from external_api.data_sources.twitter_source import _format_date as twitter_format_date
+
+TIME_ZONES = ("UTC", "Asia/Kolkata", "Asia/Kathmandu", "America/St_Johns", "Australia/Lord_Howe", "America/New_York")
+
+
+def previous_twitter_date(date_str: Optional[str]) -> Optional[str]:
+    if not date_str:
+        return None
+    try:
+        return datetime.strptime(date_str, "%a %b %d %H:%M:%S %z %Y").strftime("%Y-%m-%d %H:%M:%S")
+    except Exception:
+        return date_str
+
+
+def previous_pinterest_date(date_str: Optional[str]) -> Optional[str]:
+    if not date_str:
+        return None
+    try:
+        return datetime.strptime(date_str, "%a, %d %b %Y %H:%M:%S %z").strftime("%Y-%m-%d %H:%M:%S")
+    except Exception:
+        return date_str
+
+
+def previous_tripadvisor_date(date_str: str) -> str:
+    try:
+        return datetime.strptime(date_str, "%Y-%m-%dT%H:%M:%SZ").strftime("%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return date_str
+
+
+def previous_tripadvisor_date2(date_str: str) -> str:
+    try:
+        return datetime.strptime(date_str, "%Y-%m-%dT%H:%M:%S.%fZ").strftime("%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return date_str
+
+
+def previous_bar_dates(timestamps: List[int]) -> List[str]:
+    return [datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d") for timestamp in timestamps]
+
+
+def moments(count: int, distinct: int) -> List[datetime]:
+    start = datetime(2025, 3, 13, 18, 8, 35, tzinfo=timezone(timedelta(hours=-5)))
+    return [start + timedelta(seconds=97 * (i % distinct)) for i in range(count)]
+
+
+def best_of(func: Callable[[], Any], repeat: int, reset: Callable[[], None]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        reset()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def clear_caches() -> None:
+    for normalizer in (twitter_format_date, pinterest_format_date, _parse_date, _parse_time):
+        normalizer.cache_clear()
+    dates._bucket_date.cache_clear()
+
+
+def main(items: int, distinct: int, repeat: int) -> int:
+    failures = []
+    shared = moments(items, distinct)
+    unique = moments(items, items)
+    tweets_shared = [moment.strftime("%a %b %d %H:%M:%S %z %Y") for moment in shared]
+    tweets_unique = [moment.strftime("%a %b %d %H:%M:%S %z %Y") for moment in unique]
+    pins = [moment.strftime("%a, %d %b %Y %H:%M:%S %z" if i % 2 else "%a %b %d %H:%M:%S %z %Y") for i, moment in enumerate(shared)]
+    reviews = [moment.strftime("%Y-%m-%dT%H:%M:%SZ") for moment in shared]
+    photos = [moment.strftime("%Y-%m-%dT%H:%M:%S.%fZ") for moment in shared]
+    minute_bars = [1_700_000_000 + 60 * i for i in range(items)]
+    daily_bars = [1_700_000_000 + 86_400 * i for i in range(items)]
+
+    try:
+        import numpy as np
+    except ImportError:  # pragma: no cover - numpy 是可选依赖
+        np = None
+
+    cases = [
+        ("twitter, shared timestamps", lambda: [previous_twitter_date(d) for d in tweets_shared], lambda: [twitter_format_date(d) for d in tweets_shared]),
+        ("twitter, distinct timestamps", lambda: [previous_twitter_date(d) for d in tweets_unique], lambda: [twitter_format_date(d) for d in tweets_unique]),
+        ("pinterest, two formats", lambda: [previous_pinterest_date(d) for d in pins], lambda: [pinterest_format_date(d) for d in pins]),
+        ("tripadvisor reviews", lambda: [previous_tripadvisor_date(d) for d in reviews], lambda: [_parse_date(d) for d in reviews]),
+        ("tripadvisor photos", lambda: [previous_tripadvisor_date2(d) for d in photos], lambda: [_parse_date(d) for d in photos]),
+        ("yahoo one-minute bars", lambda: previous_bar_dates(minute_bars), lambda: dates.format_epoch_dates(minute_bars)),
+        ("yahoo daily bars", lambda: previous_bar_dates(daily_bars), lambda: dates.format_epoch_dates(daily_bars)),
+    ]
+    if np is not None:
+        minute_array = np.asarray(minute_bars, dtype="int64")
+        cases.append(("yahoo one-minute bars (numpy)", lambda: previous_bar_dates(minute_bars), lambda: dates.format_epoch_dates(minute_array)))
+
+    print(f"{items} values, best of {repeat}, caches cleared before every run")
+    for name, before, after in cases:
+        clear_caches()
+        if name.startswith("pinterest"):
+            # 原实现只认识逗号格式，另一种格式现在按推文格式规范化
+            expected = [previous_pinterest_date(d) if i % 2 else previous_twitter_date(d) for i, d in enumerate(pins)]
+        else:
+            expected = before()
+        if after() != expected:
+            failures.append(f"{name}: normalized dates differ from the previous implementation")
+        previous = best_of(before, repeat, clear_caches)
+        shared_impl = best_of(after, repeat, clear_caches)
+        print(f"{name:30s} strptime {previous * 1000:8.2f}ms  shared {shared_impl * 1000:8.2f}ms  ({previous / shared_impl:5.1f}x)")
+
+    odd_values = ["", None, "not a date", "Thu Mar 13 18:08:35 +0000", "2025-02-30T00:00:00Z", 1741889315]
+    for value in odd_values:
+        if twitter_format_date(value) != previous_twitter_date(value):
+            failures.append(f"twitter: {value!r} normalized differently")
+        if pinterest_format_date(value) != previous_pinterest_date(value):
+            failures.append(f"pinterest: {value!r} normalized differently")
+        if isinstance(value, str) and _parse_date(value) != previous_tripadvisor_date(value):
+            failures.append(f"tripadvisor: {value!r} normalized differently")
+    if _parse_time("2025-04-25T17:00:00Z") != "2025-04-25 17:00:00" or _parse_time("") != "":
+        failures.append("metal: originalTime normalized incorrectly")
+
+    clear_caches()
+    _parse_date(photos[0])
+    _parse_date(photos[0])
+    if _parse_date._order[0] != "%Y-%m-%dT%H:%M:%S.%fZ":
+        failures.append("DateNormalizer does not try the last successful format first")
+    if _parse_date.cache_info().hits != 1:
+        failures.append("DateNormalizer does not cache repeated values")
+
+    if hasattr(time, "tzset"):
+        # 跨越夏令时切换和非整点偏移的时间戳，逐秒附近的边界也要一致
+        edges = [1_710_054_000 + 450 * i + offset for i in range(2000) for offset in (-1, 0, 1)]
+        previous_tz = os.environ.get("TZ")
+        for zone in TIME_ZONES:
+            os.environ["TZ"] = zone
+            time.tzset()
+            dates._bucket_date.cache_clear()
+            if dates.format_epoch_dates(edges) != previous_bar_dates(edges) or dates.format_epoch_dates(daily_bars) != previous_bar_dates(daily_bars):
+                failures.append(f"format_epoch_dates differs from datetime.fromtimestamp in {zone}")
+        if previous_tz is None:
+            os.environ.pop("TZ", None)
+        else:
+            os.environ["TZ"] = previous_tz
+        time.tzset()
+        dates._bucket_date.cache_clear()
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=20000)
+    parser.add_argument("--distinct", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    sys.exit(main(args.items, args.distinct, args.repeat))
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark execute_batch against concurrent single FunctionProxy calls
+
+Every HTTP request to the fake function server takes --latency seconds, so
+single calls pay one round trip each (bounded by the connection pool) while a
+batch pays one round trip per --batch-size calls. The run also checks that
+per-item errors stay per-item and that a server without /execute_batch falls
+back to single calls; it exits non-zero if any check fails.
+
+Usage: python scripts/benchmarks/bench_execute_batch.py [--calls 200] [--latency 0.02] [--batch-size 100]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+from stub_server import StubServer
+
+from external_api.function_utils import FunctionProxy, ProxySessionPool, execute_batch
+
+
+def make_proxy(name: str, pool: ProxySessionPool, port: int) -> FunctionProxy:
+    proxy = FunctionProxy({"name": name, "parameters": [{"name": "symbol"}]}, session_pool=pool)
+    proxy.server_port = port
+    return proxy
+
+
+async def main(calls: int, latency: float, batch_size: int) -> int:
+    failures = []
+
+    async with StubServer(delay=latency) as server:
+        pool = ProxySessionPool(limit=10)
+        proxy = make_proxy("get_stock_price", pool, server.port)
+        batch = [(proxy, (f"SYM{i}",), {}) for i in range(calls)]
+
+        start = time.perf_counter()
+        single_results = await asyncio.gather(*(proxy(*args, **kwargs) for _, args, kwargs in batch))
+        single_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batch_results = await execute_batch(batch, max_batch_size=batch_size)
+        batch_elapsed = time.perf_counter() - start
+
+        print(f"calls={calls} latency={latency * 1000:.0f}ms batch_size={batch_size}")
+        print(f"single calls : {single_elapsed:6.3f}s ({server.hits['/execute']} requests)")
+        print(f"execute_batch: {batch_elapsed:6.3f}s ({server.hits['/execute_batch']} requests)")
+        if [r.model_dump() for r in batch_results] != [r.model_dump() for r in single_results]:
+            failures.append("batch results differ from single-call results")
+
+        mixed = await execute_batch([(proxy, ("A",), {}), (make_proxy("fail", pool, server.port), ("B",), {}), (proxy, ("C",), {})])
+        if [r.is_error for r in mixed] != [False, True, False]:
+            failures.append(f"per-item errors leaked across the batch: {mixed}")
+        await pool.close()
+
+    async with StubServer(delay=latency, batch=False) as server:
+        pool = ProxySessionPool()
+        proxy = make_proxy("get_stock_price", pool, server.port)
+        results = await execute_batch([(proxy, (f"SYM{i}",), {}) for i in range(10)])
+        print(f"fallback     : {server.hits['/execute']} single requests after /execute_batch returned 404")
+        if any(r.is_error for r in results) or server.hits["/execute"] != 10:
+            failures.append("fallback to single calls did not run every call")
+        await pool.close()
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.calls, args.latency, args.batch_size)))
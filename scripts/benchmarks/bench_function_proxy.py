@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark FunctionProxy calls/sec: per-call ClientSession vs pooled session
+
+Usage: python scripts/benchmarks/bench_function_proxy.py [--calls 2000] [--concurrency 1]
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+import aiohttp
+from stub_server import StubServer
+
+from external_api.function_utils import FunctionProxy, ProxySessionPool
+
+
+async def legacy_call(url: str, request: dict) -> dict:
+    """The previous behaviour: a fresh session (and TCP connection) per call"""
+    timeout = aiohttp.ClientTimeout(total=60)
+    async with aiohttp.ClientSession(timeout=timeout, trust_env=True) as session:
+        async with session.post(url, json=request) as response:
+            return await response.json()
+
+
+async def run(calls: int, concurrency: int, fn) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await fn()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(calls)))
+    return calls / (time.perf_counter() - start)
+
+
+async def main(calls: int, concurrency: int) -> None:
+    async with StubServer() as server:
+        pool = ProxySessionPool()
+        proxy = FunctionProxy({"name": "echo", "parameters": [{"name": "text"}]}, session_pool=pool)
+        proxy.server_port = server.port
+        url = f"{server.base_url}/execute"
+
+        def legacy():
+            request = {"request_id": str(uuid.uuid4()), "function_name": "echo", "parameters": {"text": "hi"}}
+            return legacy_call(url, request)
+
+        legacy_rate = await run(calls, concurrency, legacy)
+        pooled_rate = await run(calls, concurrency, lambda: proxy("hi"))
+        await pool.close()
+
+    print(f"calls={calls} concurrency={concurrency}")
+    print(f"per-call session : {legacy_rate:8.1f} calls/s")
+    print(f"pooled session   : {pooled_rate:8.1f} calls/s ({pooled_rate / legacy_rate:.2f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.concurrency))
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark BookingSource.search_hotels_batch against sequential search_hotels_by_dest_name
+
+Every request to the fake booking endpoints takes --latency seconds. The
+sequential loop pays two round trips per city; the batch resolves all
+destinations concurrently and fetches hotel pages with bounded concurrency.
+A second batch, from a fresh BookingSource sharing the same resolution cache
+file, must not resolve any destination again.
+
+Exits non-zero if results differ from the sequential ones or destinations are
+resolved again.
+
+Usage: python scripts/benchmarks/bench_hotel_batch.py [--cities 30] [--latency 0.1] [--concurrency 32]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from aiohttp import web
+from stub_server import StubServer
+
+from external_api.data_sources.booking_source import BookingSource
+from external_api.data_sources.client import config
+from external_api.data_sources.resolution_index import ResolutionIndex
+from external_api.data_sources.transport import HttpTransport
+
+
+async def main(cities: int, latency: float, concurrency: int) -> int:
+    failures = []
+
+    async def destinations(request: web.Request) -> web.Response:
+        await asyncio.sleep(latency)
+        name = request.query["query"]
+        dest = {"dest_id": f"-{abs(hash(name)) % 10**7}", "search_type": "city", "name": name.title(), "city_name": name.title()}
+        dest.update(label=name, longitude=0.0, latitude=0.0, country="Nowhere")
+        return web.json_response({"status": True, "data": [dest]})
+
+    async def hotels(request: web.Request) -> web.Response:
+        await asyncio.sleep(latency)
+        dest_id, page = request.query["dest_id"], int(request.query["page_number"])
+        items = []
+        for i in range(20):
+            price = {"grossPrice": {"value": 100.0 + i, "currency": "USD"}}
+            prop = {"name": f"Hotel {dest_id}/{page}/{i}", "latitude": 0.0, "longitude": 0.0, "priceBreakdown": price}
+            items.append({"hotel_id": f"{dest_id}-{page}-{i}", "property": prop})
+        return web.json_response({"status": True, "data": {"hotels": items}})
+
+    server = StubServer()
+    server.add_route("GET", "/api/v1/hotels/searchDestination", destinations)
+    server.add_route("GET", "/api/v1/hotels/searchHotels", hotels)
+    async with server:
+        transport = HttpTransport()
+        resolution_path = os.path.join(tempfile.mkdtemp(), "resolutions.sqlite3")
+        names = [f"city{i}" for i in range(cities)]
+        dates = {"arrival_date": "2025-04-19", "departure_date": "2025-04-20"}
+
+        sequential_source = BookingSource(config, server.base_url)
+        sequential_source.bind_transport(transport)
+        sequential_source.bind_resolution_index(ResolutionIndex(os.path.join(tempfile.mkdtemp(), "sequential.sqlite3")))
+        start = time.perf_counter()
+        sequential = [await sequential_source.search_hotels_by_dest_name(name, **dates) for name in names]
+        sequential_elapsed = time.perf_counter() - start
+        sequential_requests = sum(server.hits.values())
+
+        source = BookingSource(config, server.base_url)
+        source.bind_transport(transport)
+        source.bind_resolution_index(ResolutionIndex(resolution_path))
+        start = time.perf_counter()
+        batch = await source.search_hotels_batch([dict(dates, dest_name=name) for name in names], max_concurrency=concurrency)
+        batch_elapsed = time.perf_counter() - start
+
+        print(f"{cities} cities, {latency * 1000:.0f}ms per request, concurrency {concurrency}")
+        print(f"sequential search_hotels_by_dest_name: {sequential_elapsed:6.3f}s ({sequential_requests} requests)")
+        print(f"search_hotels_batch                  : {batch_elapsed:6.3f}s")
+        batch_hotels = [result["data"]["hotels"] for result in batch["data"]["results"]]
+        if batch_hotels != [result["data"]["hotels"] for result in sequential]:
+            failures.append("batch results differ from sequential results")
+
+        before = server.hits["/api/v1/hotels/searchDestination"]
+        warm_source = BookingSource(config, server.base_url)
+        warm_source.bind_transport(transport)
+        warm_source.bind_resolution_index(ResolutionIndex(resolution_path))
+        start = time.perf_counter()
+        queries = [dict(dates, dest_name=name.upper(), pages=2) for name in names]
+        warm = await warm_source.search_hotels_batch(queries, max_concurrency=concurrency)
+        warm_elapsed = time.perf_counter() - start
+        resolved_again = server.hits["/api/v1/hotels/searchDestination"] - before
+        print(f"warm batch, 2 pages per city         : {warm_elapsed:6.3f}s ({resolved_again} destination lookups)")
+        if resolved_again or warm["data"]["count"] != cities or len(warm["data"]["results"][0]["data"]["hotels"]) != 40:
+            failures.append("persistent destination cache or multi-page fetch did not work")
+
+        bad = await source.search_hotels_batch([{"dest_name": "x", "arrival_date": "2025-04-19"}, dict(dates, dest_name="y", stars=5)])
+        if [result["success"] for result in bad["data"]["results"]] != [False, False]:
+            failures.append("invalid queries were not rejected per query")
+
+        await transport.close()
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cities", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.cities, args.latency, args.concurrency)))
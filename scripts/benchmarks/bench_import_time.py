@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Measure import cost of the data source client with `python -X importtime`
+
+Each scenario runs in a fresh interpreter. -X importtime does not see modules
+loaded through importlib.import_module (which is how ApiClient loads sources
+lazily), so each scenario also reports its own wall time and the source
+modules present in sys.modules afterwards. The slowest modules from the
+-X importtime log are listed so regressions (a source pulling in a heavy
+dependency at import time) are easy to spot.
+
+With --check it doubles as an import-latency regression test: a bare
+`import external_api` must not load aiohttp, pydantic or any data source, and
+its median wall time must stay under --max-ms, and the names the package
+exported before its proxies became lazy must still import from it. The exit
+status is non-zero on failure.
+
+Usage: python scripts/benchmarks/bench_import_time.py [--runs 5] [--top 10] [--check] [--max-ms 50]
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+SCENARIOS = {
+    "external_api": "import external_api",
+    "client": "from external_api.data_sources.client import get_client; get_client()",
+    "client.metal": "from external_api.data_sources.client import get_client; get_client().metal",
+    "client.preload": "from external_api.data_sources.client import get_client; get_client().preload()",
+}
+
+WRAPPER = """
+import json, sys, time
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+sources = sorted(name for name in sys.modules if name.endswith("_source"))
+heavy = sorted(name for name in {heavy!r} if name in sys.modules)
+print(json.dumps({{"elapsed": elapsed, "modules": len(sys.modules), "sources": sources, "heavy": heavy}}))
+"""
+
+# Modules that `import external_api` must not load eagerly
+HEAVY_MODULES = ("aiohttp", "pydantic", "docstring_parser", "external_api.function_utils", "external_api.data_sources.client")
+
+# Names `from external_api import ...` provided before FunctionProxy objects were created lazily
+EXPORTS = ("ToolResult", "load_function_proxys", "MCP_FUNCTION_LIST_JSON_FILE", "proxies")
+
+LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S.*)$")
+
+
+def run_importtime(code: str):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", WRAPPER.format(code=code, heavy=HEAVY_MODULES)],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    modules = []
+    for line in result.stderr.splitlines():
+        match = LINE_RE.match(line)
+        if not match:
+            continue
+        modules.append((int(match.group(2)), int(match.group(1)), match.group(3).strip()))
+    return report, modules
+
+
+def main(runs: int, top: int, check: bool, max_ms: float) -> int:
+    failures = []
+    for label, code in SCENARIOS.items():
+        timings = []
+        for _ in range(runs):
+            report, modules = run_importtime(code)
+            timings.append(report["elapsed"])
+        print(f"{label}: median {statistics.median(timings) * 1000:.1f}ms over {runs} runs, {report['modules']} modules loaded")
+        print(f"  sources imported: {', '.join(report['sources']) or '-'}")
+        for cumulative_us, self_us, name in sorted(modules, reverse=True)[:top]:
+            print(f"  {cumulative_us / 1000:8.1f}ms cumulative {self_us / 1000:8.1f}ms self  {name}")
+
+        if label == "external_api":
+            median_ms = statistics.median(timings) * 1000
+            if report["heavy"] or report["sources"]:
+                failures.append(f"import external_api eagerly loads {', '.join(report['heavy'] + report['sources'])}")
+            if median_ms > max_ms:
+                failures.append(f"import external_api took {median_ms:.1f}ms (limit {max_ms:.1f}ms)")
+
+    if not check:
+        return 0
+    exports = subprocess.run(
+        [sys.executable, "-c", f"from external_api import {', '.join(EXPORTS)}"], cwd=REPO_ROOT, capture_output=True, text=True
+    )
+    if exports.returncode != 0:
+        failures.append(f"from external_api import {', '.join(EXPORTS)} failed: {exports.stderr.strip().splitlines()[-1]}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--check", action="store_true", help="exit non-zero if `import external_api` regresses")
+    parser.add_argument("--max-ms", type=float, default=50.0)
+    args = parser.parse_args()
+    sys.exit(main(args.runs, args.top, args.check, args.max_ms))
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark TwitterSource.iter_tweets against manual search_tweets paging
+
+The fake search endpoint serves --pages pages of --page-size tweets, each
+request taking --latency seconds, and the consumer spends --work seconds per
+page. Manual paging pays latency + work per page; iter_tweets prefetches the
+next page while the current one is processed, so it pays roughly
+max(latency, work) per page.
+
+The run also checks that every tweet is yielded once and in order, that at
+most one request is in flight at a time, that a page failing once is retried
+that iteration resumes exactly from a saved (cursor, offset), and that
+breaking out of the loop cancels the prefetch; it exits non-zero if any check
+fails.
+
+Usage: python scripts/benchmarks/bench_iter_tweets.py [--pages 10] [--page-size 100] [--latency 0.05] [--work 0.05]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+from aiohttp import web
+from stub_server import StubServer
+
+from external_api.data_sources.client import config
+from external_api.data_sources.transport import HttpTransport
+from external_api.data_sources.twitter_source import TwitterSource
+
+
+async def main(pages: int, page_size: int, latency: float, work: float) -> int:
+    failures = []
+    state = {"in_flight": 0, "max_in_flight": 0, "fail_once": set()}
+
+    async def search(request: web.Request) -> web.Response:
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        try:
+            await asyncio.sleep(latency)
+            page = int(request.query.get("continuation_token") or 0)
+            if page in state["fail_once"]:
+                state["fail_once"].discard(page)
+                return web.json_response({"message": "Bad Request"}, status=400)
+            limit = int(request.query["limit"])
+            results = [{"tweet_id": page * limit + i, "text": f"tweet {page * limit + i}", "user": {}} for i in range(limit)]
+            token = str(page + 1) if page + 1 < pages else None
+            return web.json_response({"results": results, "continuation_token": token})
+        finally:
+            state["in_flight"] -= 1
+
+    server = StubServer()
+    server.add_route("GET", "/search/search", search)
+    async with server:
+        transport = HttpTransport()
+        source = TwitterSource(config, proxy_url=server.base_url)
+        source.bind_transport(transport)
+        expected = [str(i) for i in range(pages * page_size)]
+
+        start = time.perf_counter()
+        manual, cursor = [], None
+        while True:
+            result = await source.search_tweets("tesla", limit=page_size, cursor=cursor)
+            manual.extend(tweet["id"] for tweet in result["data"]["tweets"])
+            await asyncio.sleep(work)
+            cursor = result["data"]["cursor"]
+            if not cursor:
+                break
+        manual_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        streamed = []
+        tweets = source.iter_tweets("tesla", max_items=None, page_size=page_size)
+        async for tweet in tweets:
+            streamed.append(tweet["id"])
+            if len(streamed) % page_size == 0:
+                await asyncio.sleep(work)
+        iter_elapsed = time.perf_counter() - start
+
+        print(f"pages={pages} page_size={page_size} latency={latency * 1000:.0f}ms work={work * 1000:.0f}ms/page")
+        print(f"manual search_tweets: {manual_elapsed:6.3f}s ({len(manual)} tweets)")
+        print(f"iter_tweets         : {iter_elapsed:6.3f}s ({len(streamed)} tweets, {tweets.pages} pages)")
+        if manual != expected or streamed != expected:
+            failures.append("tweets missing, duplicated or out of order")
+        if state["max_in_flight"] > 1:
+            failures.append(f"{state['max_in_flight']} page requests in flight at once")
+
+        limited = [tweet["id"] async for tweet in source.iter_tweets("tesla", max_items=page_size + 5, page_size=page_size)]
+        if limited != expected[: page_size + 5]:
+            failures.append("max_items was not honoured")
+
+        # 第 3 页失败一次后应被重试；中途停止后用保存的 cursor/offset 恢复
+        state["fail_once"].add(2)
+        tweets = source.iter_tweets("tesla", max_items=None, page_size=page_size, max_retries=1)
+        tweets.retry_delay = 0.01
+        first = []
+        async for tweet in tweets:
+            first.append(tweet["id"])
+            if len(first) == page_size * 2 + 7:
+                break
+        saved = (tweets.cursor, tweets.offset)
+        rest = [tweet["id"] async for tweet in source.iter_tweets("tesla", max_items=None, page_size=page_size, cursor=saved[0], offset=saved[1])]
+        print(f"resume              : stopped after {len(first)} tweets at cursor={saved[0]!r} offset={saved[1]}, {len(rest)} more after resuming")
+        if first + rest != expected:
+            failures.append("resuming from the saved cursor lost or repeated tweets")
+
+        # break 后不调用 aclose()：事件循环关闭迭代器时应取消正在进行的预取
+        tweets = source.iter_tweets("tesla", max_items=None, page_size=page_size)
+        async for tweet in tweets:
+            break
+        prefetch = tweets._prefetch
+        await asyncio.sleep(latency / 5)
+        if prefetch is None or not prefetch.cancelled() or tweets._prefetch is not None:
+            failures.append("breaking out of iter_tweets left the prefetch task running")
+
+        await transport.close()
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--work", type=float, default=0.05)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.pages, args.page_size, args.latency, args.work)))
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark codec.decode_json against the previous response decoding path
+
+The payloads mimic large recorded responses: a Booking hotel list, a Yahoo
+1-minute intraday chart and a double-encoded Twitter search page (the proxy
+returns the JSON document as a JSON string). The previous path is what
+aiohttp's response.json() plus the per-source isinstance(data, str) check did:
+decode the body to str, json.loads it, and json.loads again when the result is
+a string. A FunctionProxy /execute_batch request body is encoded both ways as
+well.
+
+Exits non-zero if the codec decodes or encodes anything differently.
+
+Usage: python scripts/benchmarks/bench_json_decode.py [--hotels 2000] [--bars 23400] [--tweets 500] [--repeat 20]
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Any, Callable, Dict
+
+import stub_server  # noqa: F401  (adds the repo root to sys.path)
+
+from external_api.data_sources import codec
+
+
+def hotel_list(count: int) -> Dict[str, Any]:
+    hotels = []
+    for i in range(count):
+        price = {"grossPrice": {"value": 100.5 + i, "currency": "USD"}, "excludedPrice": {"value": 12.3, "currency": "USD"}}
+        prop = {
+            "name": f"Hôtel Numéro {i}",
+            "reviewScore": 8.4,
+            "reviewCount": 1200 + i,
+            "reviewScoreWord": "Very good",
+            "latitude": 31.2 + i * 1e-4,
+            "longitude": 121.4 - i * 1e-4,
+            "photoUrls": [f"https://cf.bstatic.com/xdata/images/hotel/square60/{i}{n}.jpg" for n in range(4)],
+            "priceBreakdown": price,
+            "checkin": {"fromTime": "14:00", "untilTime": "00:00"},
+            "checkout": {"fromTime": "00:00", "untilTime": "12:00"},
+        }
+        hotels.append({"hotel_id": 10_000_000 + i, "accessibilityLabel": f"Hotel {i}. 8.4 Very good. 1 king bed", "property": prop})
+    return {"status": True, "message": "Success", "data": {"hotels": hotels, "meta": [{"title": f"{count} properties"}]}}
+
+
+def intraday_chart(bars: int) -> Dict[str, Any]:
+    timestamps = [1_700_000_000 + 60 * i for i in range(bars)]
+    quote = {
+        "open": [150.0 + (i % 97) * 0.01 for i in range(bars)],
+        "high": [150.5 + (i % 89) * 0.01 for i in range(bars)],
+        "low": [149.5 + (i % 83) * 0.01 for i in range(bars)],
+        "close": [150.1 + (i % 79) * 0.01 for i in range(bars)],
+        "volume": [1000 + i % 5000 for i in range(bars)],
+    }
+    meta = {"currency": "USD", "symbol": "AAPL", "exchangeName": "NMS", "dataGranularity": "1m", "range": "60d"}
+    return {"chart": {"result": [{"meta": meta, "timestamp": timestamps, "indicators": {"quote": [quote]}}], "error": None}}
+
+
+def search_page(count: int) -> Dict[str, Any]:
+    results = []
+    for i in range(count):
+        user = {"user_id": str(44196397 + i), "username": "elonmusk", "name": "Elon Musk", "follower_count": 200_000_000}
+        results.append({"tweet_id": str(1_800_000_000_000_000_000 + i), "text": f"Tweet {i} 🚀 " * 5, "creation_date": "Sat Apr 19 12:00:00 +0000 2025", "user": user})
+    return {"results": results, "continuation_token": "DAACCgACGdy"}
+
+
+def previous_decode(body: bytes) -> Any:
+    data = json.loads(body.decode("utf-8"))
+    if isinstance(data, str):
+        data = json.loads(data)
+    return data
+
+
+def best_of(func: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(hotels: int, bars: int, tweets: int, repeat: int) -> int:
+    failures = []
+    payloads = {
+        "booking hotel list": json.dumps(hotel_list(hotels)).encode(),
+        "yahoo intraday chart": json.dumps(intraday_chart(bars)).encode(),
+        "twitter search (double-encoded)": json.dumps(json.dumps(search_page(tweets))).encode(),
+    }
+
+    print(f"codec backend: {codec.JSON_BACKEND}")
+    for name, body in payloads.items():
+        if codec.decode_json(body) != previous_decode(body):
+            failures.append(f"{name}: decoded result differs")
+        before = best_of(lambda: previous_decode(body), repeat)
+        after = best_of(lambda: codec.decode_json(body), repeat)
+        print(f"{name:32s} {len(body) / 1e6:6.2f} MB  previous {before * 1000:7.2f}ms  codec {after * 1000:7.2f}ms  ({before / after:4.1f}x)")
+
+    batch = {"requests": [{"request_id": str(i), "function_name": "search_tweets", "parameters": search_page(5)} for i in range(100)]}
+    encoded = codec.dumps(batch)
+    if json.loads(encoded) != batch:
+        failures.append("encoded request body differs")
+    before = best_of(lambda: json.dumps(batch).encode("utf-8"), repeat)
+    after = best_of(lambda: codec.dumps(batch), repeat)
+    print(f"{'execute_batch request body':32s} {len(encoded) / 1e6:6.2f} MB  previous {before * 1000:7.2f}ms  codec {after * 1000:7.2f}ms  ({before / after:4.1f}x)")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hotels", type=int, default=2000)
+    parser.add_argument("--bars", type=int, default=23400)
+    parser.add_argument("--tweets", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    sys.exit(main(args.hotels, args.bars, args.tweets, args.repeat))
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark LazyTweet against eager parsing of user timeline tweets
+
+A timeline of --tweets raw results, a third of them retweets or quotes with
+nested tweet payloads, is consumed three ways, eagerly parsed
+(_parse_tweet_with_ref) and through LazyTweet views:
+
+- read id and text of every tweet
+- filter on text (about 1% match) and copy the matches into dicts
+- read every field of every tweet (the worst case for the lazy view)
+
+The run also checks that every LazyTweet converts to exactly the eager dict,
+that fields are parsed once and cached, and that get_user_tweets(lazy=True)
+matches the default result end to end.
+
+Exits non-zero if any check fails.
+
+Usage: python scripts/benchmarks/bench_lazy_tweets.py [--tweets 10000] [--repeat 5]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+from aiohttp import web
+from stub_server import StubServer
+
+from external_api.data_sources.client import config
+from external_api.data_sources.transport import HttpTransport
+from external_api.data_sources.twitter_source import LazyTweet, TwitterSource
+
+
+def raw_tweet(i: int, nested: bool = True) -> Dict[str, Any]:
+    user = {"user_id": 44196397, "username": "elonmusk", "name": "Elon Musk", "creation_date": "Tue Jun 02 20:12:29 +0000 2009"}
+    user.update(follower_count=200_000_000, following_count=900, number_of_tweets=70_000, is_blue_verified=True)
+    tweet = {
+        "tweet_id": 1_900_000_000_000_000_000 + i,
+        "creation_date": "Thu Mar 13 18:08:35 +0000 2025",
+        "text": f"Tweet {i} about {'Tesla' if i % 100 == 0 else 'rockets'}",
+        "language": "en",
+        "media_url": [f"https://pbs.twimg.com/media/{i}.jpg"],
+        "video_url": None,
+        "retweet_count": 10,
+        "favorite_count": 100,
+        "views": 10_000,
+        "user": user,
+    }
+    if nested and i % 3 == 1:
+        retweet = raw_tweet(i + 1_000_000, nested=False)
+        retweet["quoted_status"] = raw_tweet(i + 2_000_000, nested=False)
+        tweet.update(retweet_tweet_id=retweet["tweet_id"], retweet_status=retweet)
+    elif nested and i % 3 == 2:
+        tweet.update(quoted_status_id=i, quoted_status=raw_tweet(i + 3_000_000, nested=False))
+    return tweet
+
+
+def best_of(func: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+async def main(tweets: int, repeat: int) -> int:
+    failures = []
+    source = TwitterSource(config)
+    results = [raw_tweet(i) for i in range(tweets)]
+
+    def eager() -> List[Dict[str, Any]]:
+        return [source._parse_tweet_with_ref(result) for result in results]
+
+    def lazy() -> List[LazyTweet]:
+        return [LazyTweet(result) for result in results]
+
+    cases = {
+        "read id and text": lambda parse: [(tweet["id"], tweet["text"]) for tweet in parse()],
+        "filter on text, copy matches": lambda parse: [dict(tweet) for tweet in parse() if "Tesla" in tweet["text"]],
+        "read every field": lambda parse: [dict(tweet) for tweet in parse()],
+    }
+    print(f"{tweets} timeline tweets, best of {repeat}")
+    for name, consume in cases.items():
+        if consume(eager) != consume(lazy):
+            failures.append(f"{name}: lazy result differs from eager parsing")
+        before = best_of(lambda: consume(eager), repeat)
+        after = best_of(lambda: consume(lazy), repeat)
+        print(f"{name:26s} eager {before * 1000:8.2f}ms  lazy {after * 1000:8.2f}ms  ({before / after:5.1f}x)")
+
+    expected = eager()
+    views = lazy()
+    if [view.to_dict() for view in views] != expected or views != expected:
+        failures.append("LazyTweet.to_dict() differs from the eagerly parsed tweets")
+    view = LazyTweet(results[1])
+    if view["user"] is not view["user"] or view["referenced_tweets"] is not view["referenced_tweets"]:
+        failures.append("LazyTweet fields are not cached")
+    if "referenced_tweets" in LazyTweet(raw_tweet(3, nested=False)):
+        failures.append("LazyTweet reports referenced_tweets for a plain tweet")
+
+    async def timeline(request: web.Request) -> web.Response:
+        return web.json_response({"results": results[:200], "continuation_token": "next"})
+
+    server = StubServer()
+    server.add_route("GET", "/user/tweets", timeline)
+    async with server:
+        transport = HttpTransport()
+        remote = TwitterSource(dict(config, external_api_proxy_url=server.base_url))
+        remote.bind_transport(transport)
+        plain = await remote.get_user_tweets("elonmusk", limit=100)
+        lazy_result = await remote.get_user_tweets("elonmusk", limit=100, lazy=True)
+        if not isinstance(lazy_result["data"]["tweets"][0], LazyTweet) or lazy_result != plain:
+            failures.append("get_user_tweets(lazy=True) differs from the default result")
+        await transport.close()
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tweets", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.tweets, args.repeat)))
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Benchmark TripAdvisorSource.iter_location_profiles against sequential enrichment
+
+Every request to the fake Tripadvisor endpoints takes --latency seconds. The
+sequential loop searches, then calls get_location_details,
+get_location_reviews and get_location_photos one after another for each
+result; the pipeline fans them out with --workers locations in flight and
+streams each profile as it completes. The run also checks that the profiles
+match, that no more than --workers locations are enriched at once, that a
+failing part is reported per profile, that all requests reuse a few pooled
+connections, and that closing the iterator early stops the remaining
+requests. FanOut itself is checked to hold at most --workers unread results
+for a slow consumer, to close an async generator job source on aclose(), and
+to cancel its workers when the consumer breaks out of the loop.
+
+Exits non-zero if any check fails.
+
+Usage: python scripts/benchmarks/bench_location_profiles.py [--locations 30] [--latency 0.05] [--workers 8]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+from aiohttp import web
+from stub_server import StubServer
+
+from external_api.data_sources.client import config
+from external_api.data_sources.fanout import FanOut
+from external_api.data_sources.transport import HttpTransport
+from external_api.data_sources.tripadvisor_source import TripAdvisorSource
+
+
+async def main(locations: int, latency: float, workers: int) -> int:
+    failures = []
+    state = {"in_flight": set(), "max_in_flight": 0, "peers": set()}
+
+    def track(request: web.Request) -> str:
+        location_id = request.match_info.get("location_id", "")
+        state["peers"].add(request.transport.get_extra_info("peername")[1])
+        return location_id
+
+    async def search(request: web.Request) -> web.Response:
+        track(request)
+        await asyncio.sleep(latency)
+        data = [{"location_id": str(1000 + i), "name": f"Place {i}", "address_obj": {}} for i in range(locations)]
+        return web.json_response({"data": data})
+
+    def part(name: str):
+        async def handler(request: web.Request) -> web.Response:
+            location_id = track(request)
+            state["in_flight"].add(location_id)
+            state["max_in_flight"] = max(state["max_in_flight"], len(state["in_flight"]))
+            try:
+                await asyncio.sleep(latency)
+            finally:
+                state["in_flight"].discard(location_id)
+            if name == "photos" and location_id == "1003":
+                return web.json_response({"message": "upstream error"}, status=500)
+            if name == "details":
+                return web.json_response({"location_id": location_id, "name": f"Place {location_id}"})
+            return web.json_response({"data": [{"id": int(location_id), "text": f"{name} of {location_id}"}]})
+
+        return handler
+
+    server = StubServer()
+    server.add_route("GET", "/api/v1/location/search", search)
+    for name in ("details", "reviews", "photos"):
+        server.add_route("GET", f"/api/v1/location/{{location_id}}/{name}", part(name))
+    async with server:
+        transport = HttpTransport()
+        source = TripAdvisorSource(config, server.base_url)
+        source.bind_transport(transport)
+
+        start = time.perf_counter()
+        sequential = {}
+        found = await source.search_locations(searchQuery="hotel")
+        for location in found["data"]:
+            location_id = location["location_id"]
+            sequential[location_id] = (
+                await source.get_location_details(locationId=location_id),
+                await source.get_location_reviews(locationId=location_id),
+                await source.get_location_photos(locationId=location_id),
+            )
+        sequential_elapsed = time.perf_counter() - start
+
+        state["peers"].clear()
+        start = time.perf_counter()
+        first = None
+        profiles = {}
+        async with source.iter_location_profiles("hotel", max_concurrency=workers) as stream:
+            async for profile in stream:
+                if first is None:
+                    first = time.perf_counter() - start
+                profiles[profile["location_id"]] = profile
+        pipeline_elapsed = time.perf_counter() - start
+
+        print(f"{locations} locations, {latency * 1000:.0f}ms per request, {workers} workers")
+        print(f"sequential            : {sequential_elapsed:6.3f}s")
+        print(f"iter_location_profiles: first profile after {first:.3f}s, all after {pipeline_elapsed:.3f}s")
+        print(f"max {state['max_in_flight']} locations in flight, {len(state['peers'])} connections used")
+        if set(profiles) != set(sequential):
+            failures.append("pipeline did not enrich every location exactly once")
+        for location_id, (details, reviews, photos) in sequential.items():
+            profile = profiles.get(location_id, {})
+            expected = (details.get("data"), reviews.get("data"), photos.get("data") if photos["success"] else None)
+            if (profile.get("details"), profile.get("reviews"), profile.get("photos")) != expected:
+                failures.append(f"profile {location_id} differs from the sequential results")
+        if set(profiles.get("1003", {}).get("errors", {})) != {"photos"}:
+            failures.append("failed photos request was not reported in the profile errors")
+        if state["max_in_flight"] > workers:
+            failures.append(f"{state['max_in_flight']} locations in flight, pool has {workers} workers")
+        if len(state["peers"]) > workers * 3:
+            failures.append(f"{len(state['peers'])} connections opened, requests were not pooled")
+
+        before = sum(server.hits.values())
+        stream = source.iter_location_profiles("hotel", parts=("details",), max_concurrency=2)
+        async for profile in stream:
+            break
+        await stream.aclose()
+        await asyncio.sleep(latency * 2)
+        requested = sum(server.hits.values()) - before
+        print(f"closed after 1 profile: {requested} requests made")
+        if requested > 1 + 3:
+            failures.append("closing the iterator did not stop the remaining requests")
+
+        failed = source.iter_location_profiles(latitude=0.0, longitude=0.0)
+        if await failed.collect() or not failed.errors:
+            failures.append("a failed search was not reported in errors")
+
+        await transport.close()
+
+    async def instant(i: int) -> int:
+        return i
+
+    fanout = FanOut([lambda i=i: instant(i) for i in range(1000)], max_workers=workers)
+    results = fanout.__aiter__()
+    await results.__anext__()
+    await asyncio.sleep(latency)
+    # 已取 1 个结果：队列中最多 workers 个，另有每个 worker 手上一个等待放入
+    print(f"slow consumer: {fanout.started} of 1000 jobs started after reading 1 result")
+    if fanout.started > 1 + 2 * workers:
+        failures.append(f"FanOut started {fanout.started} jobs for a consumer that read 1 result")
+    await fanout.aclose()
+
+    closed = {"jobs": False}
+
+    async def slow(i: int) -> int:
+        await asyncio.sleep(latency)
+        return i
+
+    async def job_source():
+        try:
+            for i in range(1000):
+                yield lambda i=i: slow(i)
+        finally:
+            closed["jobs"] = True
+
+    fanout = FanOut(job_source(), max_workers=workers)
+    await fanout.__aiter__().__anext__()
+    await fanout.aclose()
+    if not closed["jobs"]:
+        failures.append("aclose() did not close the async generator job source")
+
+    # break 后不调用 aclose()：事件循环关闭迭代器时应取消阻塞在结果队列上的 worker
+    fanout = FanOut([lambda i=i: instant(i) for i in range(1000)], max_workers=workers)
+    async for _ in fanout:
+        break
+    pending = list(fanout._workers)
+    await asyncio.sleep(latency)
+    if not pending or any(not worker.done() for worker in pending) or fanout._workers:
+        failures.append("breaking out of a FanOut left its workers blocked on the result queue")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--locations", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.locations, args.latency, args.workers)))
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Benchmark YahooFinanceSource.get_multiple_stocks_price against a local fake proxy
+
+Every chart request takes --latency seconds, so wall time should scale with
+ceil(symbols / max_concurrency) rather than with the number of symbols.
+
+Usage: python scripts/benchmarks/bench_multiple_stocks.py [--symbols 50] [--latency 0.05]
+"""
+
+import argparse
+import asyncio
+import time
+
+from stub_server import StubServer
+
+from external_api.data_sources.client import config
+from external_api.data_sources.yahoo_source import YahooFinanceSource
+
+
+def chart_payload(request):
+    timestamps = [1704153600 + i * 86400 for i in range(20)]
+    quote = {key: [100.0 + i for i in range(20)] for key in ("open", "high", "low", "close")}
+    quote["volume"] = [1000 + i for i in range(20)]
+    return {"chart": {"result": [{"timestamp": timestamps, "indicators": {"quote": [quote]}}], "error": None}}
+
+
+async def main(n_symbols: int, latency: float) -> None:
+    server = StubServer(delay=latency)
+    server.add_json_route("GET", "/stock/v3/get-chart", chart_payload)
+    async with server:
+        source = YahooFinanceSource(config, proxy_url=server.base_url)
+        symbols = [f"SYM{i}" for i in range(n_symbols)]
+        print(f"symbols={n_symbols} latency={latency * 1000:.0f}ms")
+        for concurrency in (1, 5, 10, 25, n_symbols):
+            start = time.perf_counter()
+            result = await source.get_multiple_stocks_price(
+                symbols, "2024-01-01", "2024-02-01", max_concurrency=concurrency
+            )
+            elapsed = time.perf_counter() - start
+            order_ok = [stock["symbol"] for stock in result["data"]["stocks"]] == symbols
+            print(f"max_concurrency={concurrency:3d}: {elapsed:6.3f}s (order preserved: {order_ok})")
+        await source.transport.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+    asyncio.run(main(args.symbols, args.latency))
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark PatentSource.iter_patents / ScholarSource.iter_scholar against the
+all-pages-at-once search_patents / search_scholar
+
+Each page of the fake serper endpoint takes --latency seconds, with one page
+(--slow-page) taking --slow-latency. search_* returns only after the slowest
+page; iter_* yields page 1 as soon as it lands. The run also checks that
+results come out in page order, that no more than --window pages are in
+flight, and that breaking out after --take results cancels the remaining page
+requests. It exits non-zero if any check fails.
+
+Usage: python scripts/benchmarks/bench_paged_search.py [--latency 0.05] [--slow-page 4] [--slow-latency 0.5] [--window 3] [--take 60]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+from aiohttp import web
+from stub_server import StubServer
+
+from external_api.data_sources.client import config
+from external_api.data_sources.patents_source import MAX_PAGE_SIZE, PatentSource
+from external_api.data_sources.scholar_source import ScholarSource
+from external_api.data_sources.transport import HttpTransport
+
+
+async def main(latency: float, slow_page: int, slow_latency: float, window: int, take: int) -> int:
+    failures = []
+    state = {"in_flight": 0, "max_in_flight": 0}
+
+    async def serper(request: web.Request) -> web.Response:
+        body = await request.json()
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        try:
+            await asyncio.sleep(slow_latency if body["page"] == slow_page else latency)
+        finally:
+            state["in_flight"] -= 1
+        return web.json_response({"organic": [{"title": f"{body['page']}-{i}"} for i in range(body["num"])]})
+
+    server = StubServer()
+    server.add_route("POST", "/patents", serper)
+    server.add_route("POST", "/scholar", serper)
+    async with server:
+        transport = HttpTransport()
+        patents = PatentSource(config)
+        scholar = ScholarSource(config)
+        for source in (patents, scholar):
+            source.proxy_url = server.base_url
+            source.bind_transport(transport)
+        expected = [f"{page}-{i}" for page in range(1, 11) for i in range(MAX_PAGE_SIZE)]
+
+        start = time.perf_counter()
+        result = await patents.search_patents("machine learning", num_results=500)
+        search_elapsed = time.perf_counter() - start
+        if [p["title"] for p in result["data"]["patents"]] != expected:
+            failures.append("search_patents results out of order")
+
+        state["max_in_flight"] = 0
+        start = time.perf_counter()
+        first = None
+        titles = []
+        async for patent in patents.iter_patents("machine learning", num_results=500, max_in_flight=window):
+            if first is None:
+                first = time.perf_counter() - start
+            titles.append(patent["title"])
+        iter_elapsed = time.perf_counter() - start
+
+        print(f"500 patents, {latency * 1000:.0f}ms/page, page {slow_page} takes {slow_latency * 1000:.0f}ms")
+        print(f"search_patents: all results after {search_elapsed:.3f}s")
+        print(f"iter_patents  : first result after {first:.3f}s, all after {iter_elapsed:.3f}s, max {state['max_in_flight']} pages in flight")
+        if titles != expected:
+            failures.append("iter_patents results out of order")
+        if state["max_in_flight"] > window:
+            failures.append(f"{state['max_in_flight']} pages in flight, window is {window}")
+        if first >= search_elapsed:
+            failures.append("iter_patents did not yield before the slowest page")
+
+        before = server.hits["/scholar"]
+        papers = scholar.iter_scholar("machine learning", num_results=500, max_in_flight=window)
+        taken = []
+        async for paper in papers:
+            taken.append(paper["title"])
+            if len(taken) == take:
+                break
+            if len(taken) % 20 == 0:
+                await asyncio.sleep(latency)
+        # break 后不调用 aclose()：事件循环关闭迭代器时应取消尚未完成的页
+        outstanding = [task for _, task in papers._in_flight]
+        await asyncio.sleep(latency / 5)
+        requested = server.hits["/scholar"] - before
+        print(f"iter_scholar  : stopped after {take} papers, {requested} of 25 pages requested")
+        if requested > take // 20 + window:
+            failures.append("stopping early did not cancel outstanding pages")
+        if any(not task.cancelled() for task in outstanding) or papers._in_flight:
+            failures.append("breaking out of iter_scholar left page requests running")
+
+        await transport.close()
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--slow-page", type=int, default=4)
+    parser.add_argument("--slow-latency", type=float, default=0.5)
+    parser.add_argument("--window", type=int, default=3)
+    parser.add_argument("--take", type=int, default=60)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.latency, args.slow_page, args.slow_latency, args.window, args.take)))
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark get_stock_price records vs columnar output on a large intraday chart
+
+Also checks that with a response cache bound only the dict records format is
+cached: columns, DataFrames and PriceBar records would be deep-copied on every
+cache read and write. Exits non-zero if the check fails.
+
+Usage: python scripts/benchmarks/bench_price_columns.py [--bars 200000]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+import tracemalloc
+
+from aiohttp import web
+from stub_server import StubServer
+
+from external_api.data_sources.cache import MemoryCacheBackend, ResponseCache
+from external_api.data_sources.client import config
+from external_api.data_sources.yahoo_source import YahooFinanceSource
+
+
+def chart_body(bars: int) -> str:
+    start = 1704153600
+    quote = {key: [100.0 + (i % 97) * 0.01 for i in range(bars)] for key in ("open", "high", "low", "close")}
+    quote["volume"] = [1000 + i % 500 for i in range(bars)]
+    chart = {"chart": {"result": [{"timestamp": [start + i * 60 for i in range(bars)], "indicators": {"quote": [quote]}}], "error": None}}
+    return json.dumps(chart)
+
+
+async def main(bars: int) -> int:
+    failures = []
+    body = chart_body(bars)
+    server = StubServer()
+    server.add_json_route("GET", "/stock/v3/get-chart", lambda request: web.Response(text=body, content_type="application/json"))
+    async with server:
+        source = YahooFinanceSource(config, proxy_url=server.base_url)
+        print(f"bars={bars} payload={len(body) / 1e6:.1f}MB")
+        for fmt in ("records", "columns", "dataframe"):
+            start = time.perf_counter()
+            result = await source.get_stock_price("AAPL", "2024-01-01", "2024-06-01", interval="1m", format=fmt)
+            elapsed = time.perf_counter() - start
+            assert result["success"], result
+            del result
+
+            tracemalloc.start()
+            result = await source.get_stock_price("AAPL", "2024-01-01", "2024-06-01", interval="1m", format=fmt)
+            retained, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{fmt:10s}: {elapsed:6.3f}s, retained {retained / 1e6:6.1f}MB, peak {peak / 1e6:6.1f}MB")
+            del result
+
+        cache = ResponseCache(MemoryCacheBackend())
+        source.bind_cache(cache)
+        for fmt, raw_records in (("records", False), ("records", True), ("columns", False), ("dataframe", False)):
+            for _ in range(2):
+                await source.get_stock_price("AAPL", "2024-01-01", "2024-06-01", interval="1m", format=fmt, raw_records=raw_records)
+        hits = cache.stats()["hits"]
+        if hits != 1 or len(cache.backend) != 1:
+            failures.append(f"expected only the dict records result to be cached, got {hits} hits and {len(cache.backend)} entries")
+        await source.transport.close()
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bars", type=int, default=200000)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.bars)))
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Check the per-host rate limiter against PatentSource.search_patents fan-out
+
+search_patents(num_results=500) fires 10 page requests at once. With the
+serper host limited to --rate requests/s (burst --burst) the stub proxy must
+never see more than burst + rate requests in any one-second window. The
+limiter's queue-depth and wait-time metrics are printed.
+
+--processes N additionally starts N worker processes that each take --tokens
+tokens from a shared SQLite-backed bucket, showing that the quota is shared
+across processes (wall time ~ N * tokens / rate instead of tokens / rate).
+
+Exits non-zero if the observed request rate exceeds the limit.
+
+Usage: python scripts/benchmarks/bench_rate_limit.py [--rate 4] [--burst 2] [--processes 2] [--tokens 10]
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from aiohttp import web
+from stub_server import StubServer
+
+from external_api.data_sources.client import config
+from external_api.data_sources.patents_source import PatentSource
+from external_api.data_sources.rate_limit import RateLimiter
+from external_api.data_sources.transport import HttpTransport
+
+
+async def fan_out(rate: float, burst: float) -> bool:
+    arrivals = []
+
+    async def patents(request: web.Request) -> web.Response:
+        arrivals.append(time.perf_counter())
+        body = await request.json()
+        return web.json_response({"organic": [{"title": f"p{body['page']}-{i}"} for i in range(body["num"])]})
+
+    server = StubServer()
+    server.add_route("POST", "/patents", patents)
+    async with server:
+        host = config["serper_base_url"]
+        transport = HttpTransport(rate_limiter=RateLimiter(limits={host: {"rate": rate, "burst": burst}}))
+        source = PatentSource(config)
+        source.proxy_url = server.base_url
+        source.bind_transport(transport)
+
+        start = time.perf_counter()
+        result = await source.search_patents("machine learning", num_results=500)
+        elapsed = time.perf_counter() - start
+        await transport.close()
+
+    window_max = max(sum(1 for t in arrivals if first <= t < first + 1.0) for first in arrivals)
+    stats = transport.rate_limiter.stats()[host]
+    print(f"search_patents: {len(result['data']['patents'])} patents, {len(arrivals)} requests in {elapsed:.2f}s")
+    print(f"  max requests in any 1s window: {window_max} (limit {burst + rate:.0f})")
+    print(
+        f"  queue depth max {stats['max_queue_depth']}, delayed {stats['delayed']}/{stats['acquired']}, "
+        f"wait avg {stats['wait_time_avg']:.2f}s max {stats['wait_time_max']:.2f}s"
+    )
+    return window_max <= burst + rate
+
+
+async def worker(path: str, rate: float, tokens: int) -> None:
+    limiter = RateLimiter(limits={"shared": {"rate": rate, "burst": 1}}, backend="sqlite", path=path)
+    for _ in range(tokens):
+        await limiter.acquire("shared")
+
+
+def cross_process(processes: int, rate: float, tokens: int) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "rate_limits.sqlite3")
+    start = time.perf_counter()
+    workers = [
+        subprocess.Popen([sys.executable, __file__, "--worker", path, "--rate", str(rate), "--tokens", str(tokens)])
+        for _ in range(processes)
+    ]
+    for process in workers:
+        process.wait()
+    elapsed = time.perf_counter() - start
+    expected = (processes * tokens - 1) / rate
+    print(f"sqlite backend: {processes} processes x {tokens} tokens at {rate}/s took {elapsed:.2f}s (shared quota needs >= {expected:.2f}s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rate", type=float, default=4)
+    parser.add_argument("--burst", type=float, default=2)
+    parser.add_argument("--processes", type=int, default=2)
+    parser.add_argument("--tokens", type=int, default=10)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        asyncio.run(worker(args.worker, args.rate, args.tokens))
+        sys.exit(0)
+
+    ok = asyncio.run(fan_out(args.rate, args.burst))
+    if args.processes:
+        cross_process(args.processes, args.rate * 2.5, args.tokens)
+    if not ok:
+        print("FAIL: request rate exceeded the configured limit")
+    sys.exit(0 if ok else 1)
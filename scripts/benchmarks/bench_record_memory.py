@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Measure the memory held by parsed results as dicts vs raw_records=True
+
+Each fake endpoint returns --items items in one response: Twitter search and
+user timeline, Pinterest pins, a Yahoo chart with --items bars (the last one
+still open, with None values), patent and scholar result pages, and a Booking
+hotel page. Every method is called once with the default dict results and
+once with raw_records=True. tracemalloc measures how much memory the returned
+result keeps alive after collection.
+
+The run also checks that the records compare equal to the dicts, that
+to_dict() gives back exactly the dict result, and that codec.dumps encodes
+both the same way.
+
+Exits non-zero if any check fails.
+
+Usage: python scripts/benchmarks/bench_record_memory.py [--items 10000]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from aiohttp import web
+from stub_server import StubServer
+
+from external_api.data_sources import codec
+from external_api.data_sources.booking_source import BookingSource
+from external_api.data_sources.client import config
+from external_api.data_sources.patents_source import PatentSource
+from external_api.data_sources.pinterest_source import PinterestSource
+from external_api.data_sources.records import to_plain
+from external_api.data_sources.resolution_index import ResolutionIndex
+from external_api.data_sources.scholar_source import ScholarSource
+from external_api.data_sources.transport import HttpTransport
+from external_api.data_sources.twitter_source import TwitterSource
+from external_api.data_sources.yahoo_source import YahooFinanceSource
+
+
+def user(i: int) -> Dict[str, Any]:
+    return {"user_id": 44196397 + i % 50, "name": f"User {i % 50}", "username": f"user{i % 50}", "follower_count": 1200, "is_blue_verified": True}
+
+
+def search_tweet(i: int) -> Dict[str, Any]:
+    metrics = {"retweet_count": i % 7, "reply_count": i % 5, "favorite_count": i % 11, "quote_count": 0, "views": 100 + i, "bookmark_count": 0}
+    return {"tweet_id": 1_900_000_000_000_000_000 + i, "creation_date": None, "text": f"Tweet {i}", "media_urls": [], "user": user(i), **metrics}
+
+
+def timeline_tweet(i: int) -> Dict[str, Any]:
+    tweet = search_tweet(i)
+    tweet.update(language="en", media_url=[f"https://pbs.twimg.com/media/{i}.jpg"], video_url=None)
+    if i % 10 == 0:
+        tweet["in_reply_to_status_id"] = 1_800_000_000_000_000_000 + i
+    return tweet
+
+
+def pin(i: int) -> Dict[str, Any]:
+    pinner = {"id": str(750412494069279813 + i % 50), "image_large_url": "https://i.pinimg.com/140x140/a.jpg", "follower_count": 2379}
+    pinner.update(username=f"pinner{i % 50}", full_name="Pinner")
+    return {
+        "id": str(5559199536733192 + i),
+        "title": f"Pin {i}",
+        "description": "Modern living room ideas",
+        "images": {"original": {"url": f"https://i.pinimg.com/originals/{i}.jpg"}},
+        "reaction_counts": {"1": i % 100},
+        "pinner": pinner,
+    }
+
+
+def patent(i: int) -> Dict[str, Any]:
+    return {
+        "title": f"Method and system {i}",
+        "snippet": "A method for training machine learning models ...",
+        "link": f"https://patents.google.com/patent/US{10_000_000 + i}B2/en",
+        "priorityDate": "2019-03-01",
+        "filingDate": "2020-02-28",
+        "grantDate": "2023-05-02",
+        "inventor": "Jane Doe",
+        "assignee": "Example Inc.",
+        "publicationNumber": f"US{10_000_000 + i}B2",
+        "pdfUrl": f"https://patentimages.storage.googleapis.com/{i}.pdf",
+    }
+
+
+def paper(i: int) -> Dict[str, Any]:
+    return {
+        "title": f"Deep learning study {i}",
+        "snippet": "We study ...",
+        "link": f"https://arxiv.org/abs/{2000 + i}",
+        "publicationInfo": "J Doe - arXiv, 2021",
+        "year": 2021,
+        "citedBy": i % 300,
+        "pdfUrl": f"https://arxiv.org/pdf/{2000 + i}",
+    }
+
+
+def hotel(i: int) -> Dict[str, Any]:
+    price = {"grossPrice": {"value": 100.5 + i % 200, "currency": "USD"}}
+    prop = {"name": f"Hotel {i}", "propertyClass": 4, "reviewScore": 8.4, "reviewCount": 1200, "latitude": 31.2, "longitude": 121.4}
+    return {"hotel_id": 10_000_000 + i, "property": dict(prop, priceBreakdown=price)}
+
+
+def chart(bars: int) -> Dict[str, Any]:
+    quote = {
+        "open": [150.0 + (i % 97) * 0.01 for i in range(bars)],
+        "high": [150.5 + (i % 89) * 0.01 for i in range(bars)],
+        "low": [149.5 + (i % 83) * 0.01 for i in range(bars)],
+        "close": [150.1 + (i % 79) * 0.01 for i in range(bars)],
+        "volume": [1000 + i % 5000 for i in range(bars)],
+    }
+    # 当前未收盘的最后一根 K 线各字段为 None
+    for values in quote.values():
+        values[-1] = None
+    timestamps = [1_700_000_000 + 60 * i for i in range(bars)]
+    return {"chart": {"result": [{"meta": {"symbol": "AAPL"}, "timestamp": timestamps, "indicators": {"quote": [quote]}}], "error": None}}
+
+
+async def retained(call: Callable[[], Awaitable[Any]]) -> Tuple[Any, int]:
+    """调用并返回结果及其在回收后仍占用的内存"""
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    # PinterestSource._parse_pins 会打印整个响应
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        result = await call()
+    gc.collect()
+    return result, tracemalloc.get_traced_memory()[0] - before
+
+
+async def main(items: int) -> int:
+    failures = []
+    payloads = {
+        "/search/search": {"results": [search_tweet(i) for i in range(items)]},
+        "/user/tweets": {"results": [timeline_tweet(i) for i in range(items)]},
+        "/pinterest/pins/advance": {"data": [pin(i) for i in range(items)]},
+        "/stock/v3/get-chart": chart(items),
+        "/patents": {"organic": [patent(i) for i in range(items)]},
+        "/scholar": {"organic": [paper(i) for i in range(items)]},
+        "/api/v1/hotels/searchHotels": {"status": True, "data": {"hotels": [hotel(i) for i in range(items)]}},
+    }
+    bodies = {path: codec.dumps(payload) for path, payload in payloads.items()}
+
+    def route(path: str):
+        async def handler(request: web.Request) -> web.Response:
+            return web.Response(body=bodies[path], content_type="application/json")
+
+        return handler
+
+    async def destinations(request: web.Request) -> web.Response:
+        dest = {"dest_id": "-1924465", "search_type": "city", "name": "Shanghai", "city_name": "Shanghai", "label": "Shanghai, China"}
+        dest.update(longitude=121.4, latitude=31.2, country="China")
+        return web.json_response({"status": True, "data": [dest]})
+
+    server = StubServer()
+    server.add_route("GET", "/search/search", route("/search/search"))
+    server.add_route("GET", "/user/tweets", route("/user/tweets"))
+    server.add_route("POST", "/pinterest/pins/advance", route("/pinterest/pins/advance"))
+    server.add_route("GET", "/stock/v3/get-chart", route("/stock/v3/get-chart"))
+    server.add_route("POST", "/patents", route("/patents"))
+    server.add_route("POST", "/scholar", route("/scholar"))
+    server.add_route("GET", "/api/v1/hotels/searchHotels", route("/api/v1/hotels/searchHotels"))
+    server.add_route("GET", "/api/v1/hotels/searchDestination", destinations)
+    async with server:
+        transport = HttpTransport()
+        source_config = dict(config, external_api_proxy_url=server.base_url)
+        twitter = TwitterSource(source_config)
+        pinterest = PinterestSource(source_config)
+        yahoo = YahooFinanceSource(source_config, server.base_url)
+        patents = PatentSource(source_config)
+        scholar = ScholarSource(source_config)
+        booking = BookingSource(source_config, server.base_url)
+        booking.bind_resolution_index(ResolutionIndex(os.path.join(tempfile.mkdtemp(), "resolutions.sqlite3")))
+        for source in (twitter, pinterest, yahoo, patents, scholar, booking):
+            source.bind_transport(transport)
+
+        dates = {"arrival_date": "2025-04-19", "departure_date": "2025-04-20"}
+        cases = {
+            "twitter search_tweets": (lambda raw: twitter.search_tweets("tesla", raw_records=raw), ("data", "tweets")),
+            "twitter get_user_tweets": (lambda raw: twitter.get_user_tweets("elonmusk", raw_records=raw), ("data", "tweets")),
+            "pinterest search_pins": (lambda raw: pinterest.search_pins("cat", raw_records=raw), ("data", "pins")),
+            "yahoo get_stock_price": (lambda raw: yahoo.get_stock_price("AAPL", "2024-01-01", "2024-02-01", raw_records=raw), ("data", "prices")),
+            "patents page": (lambda raw: patents._fetch_patents_page("ml", None, 50, 1, None, None, raw_records=raw), ("data",)),
+            "scholar page": (lambda raw: scholar._fetch_scholar_page("ml", 20, 1, None, None, raw_records=raw), ("data",)),
+            "booking hotels": (lambda raw: booking.search_hotels_by_dest_name("shanghai", raw_records=raw, **dates), ("data", "hotels")),
+        }
+
+        tracemalloc.start()
+        print(f"{items} items per result, memory retained after gc.collect()")
+        for name, (call, path) in cases.items():
+            plain, plain_size = await retained(lambda: call(False))
+            records, records_size = await retained(lambda: call(True))
+            if not plain["success"] or not records["success"]:
+                failures.append(f"{name}: {plain.get('error') or records.get('error')}")
+                continue
+            plain_items, record_items = plain, records
+            for key in path:
+                plain_items, record_items = plain_items[key], record_items[key]
+            if len(record_items) != items or type(record_items[0]) is dict:
+                failures.append(f"{name}: raw_records=True did not return {items} records")
+            if records != plain:
+                failures.append(f"{name}: records do not compare equal to the dict results")
+            if to_plain(records) != plain or [list(item) for item in to_plain(record_items)] != [list(item) for item in plain_items]:
+                failures.append(f"{name}: to_dict() differs from the dict results")
+            if codec.dumps(records) != codec.dumps(plain):
+                failures.append(f"{name}: records encode differently")
+            print(f"{name:24s} dicts {plain_size / 2**20:7.2f} MiB  records {records_size / 2**20:7.2f} MiB  ({plain_size / records_size:4.2f}x)")
+            del plain, records, plain_items, record_items
+        tracemalloc.stop()
+
+        await transport.close()
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=10000)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.items)))
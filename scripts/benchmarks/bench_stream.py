@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark FunctionProxy.stream against a buffered FunctionProxy call
+
+The fake function server runs in a subprocess so tracemalloc only sees the
+client. A buffered call holds the whole --megabytes result in memory before
+returning; stream() yields NDJSON events as they arrive, so the caller sees the
+first event after one chunk and peak memory stays around one chunk.
+
+Before timing, the run checks that a stream whose result carries no message
+(a text/plain stream, or an NDJSON result event without "message") ends with
+the same "succeed" message a buffered call returns. Exits non-zero if it does not.
+
+Usage: python scripts/benchmarks/bench_stream.py [--megabytes 50] [--chunk-kb 64]
+"""
+
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import List
+
+import stub_server
+from aiohttp import web
+
+from external_api.function_utils import FunctionProxy, ProxySessionPool
+
+
+async def buffered(proxy: FunctionProxy, total_bytes: int):
+    start = time.perf_counter()
+    result = await proxy(payload_bytes=total_bytes)
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed, len(result.message)
+
+
+async def streamed(proxy: FunctionProxy, total_bytes: int, chunk_bytes: int):
+    start = time.perf_counter()
+    first_event = None
+    received = 0
+    async for event in proxy.stream(chunks=total_bytes // chunk_bytes, chunk_bytes=chunk_bytes):
+        if first_event is None:
+            first_event = time.perf_counter() - start
+        if event.type == "output":
+            received += len(event.message)
+    return first_event, time.perf_counter() - start, received
+
+
+async def measure(fn, *args):
+    tracemalloc.start()
+    first, total, received = await fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return first, total, received, peak
+
+
+class BareResultServer(stub_server.StubServer):
+    """流式接口的结果不带 message: "text" 函数返回 text/plain 分块，其余返回 NDJSON"""
+
+    async def _execute_stream(self, request: web.Request) -> web.StreamResponse:
+        data = await request.json()
+        if data["function_name"] == "text":
+            return web.Response(text="line 1\nline 2\n", content_type="text/plain")
+        lines = [{"type": "output", "message": "line 1"}, {"type": "result", "is_error": False}]
+        return web.Response(text="".join(f"{json.dumps(line)}\n" for line in lines), content_type="application/x-ndjson")
+
+
+async def check_result_message() -> List[str]:
+    failures = []
+    pool = ProxySessionPool()
+    async with BareResultServer() as server:
+        for name in ("text", "ndjson"):
+            proxy = FunctionProxy({"name": name, "parameters": []}, session_pool=pool)
+            proxy.server_port = server.port
+            events = [event async for event in proxy.stream()]
+            if events[-1].type != "result" or events[-1].is_error or events[-1].message != "succeed":
+                failures.append(f"{name} stream ended with {events[-1]!r} instead of a \"succeed\" result")
+    await pool.close()
+    return failures
+
+
+async def main(megabytes: int, chunk_kb: int, port: int) -> int:
+    failures = await check_result_message()
+    for failure in failures:
+        print(f"FAIL: {failure}")
+
+    pool = ProxySessionPool()
+    proxy = FunctionProxy({"name": "export_report", "parameters": []}, session_pool=pool)
+    proxy.server_port = port
+    total_bytes = megabytes * 1024 * 1024
+    chunk_bytes = chunk_kb * 1024
+
+    print(f"result={megabytes}MB chunk={chunk_kb}KB")
+    for label, fn, args in (
+        ("buffered __call__", buffered, (proxy, total_bytes)),
+        ("stream()", streamed, (proxy, total_bytes, chunk_bytes)),
+    ):
+        first, total, received, peak = await measure(fn, *args)
+        print(
+            f"{label:18s}: first data {first * 1000:8.1f}ms, total {total:6.3f}s, "
+            f"received {received / 1024 / 1024:6.1f}MB, peak traced {peak / 1024 / 1024:7.1f}MB"
+        )
+    await pool.close()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--megabytes", type=int, default=50)
+    parser.add_argument("--chunk-kb", type=int, default=64)
+    args = parser.parse_args()
+
+    server = subprocess.Popen([sys.executable, stub_server.__file__], stdout=subprocess.PIPE, text=True)
+    try:
+        status = asyncio.run(main(args.megabytes, args.chunk_kb, int(server.stdout.readline())))
+    finally:
+        server.terminate()
+        server.wait()
+    sys.exit(status)
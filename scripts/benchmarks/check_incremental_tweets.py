@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Check incremental tweet collection (TwitterSource.search_new_tweets / get_new_user_tweets)
+
+A fake timeline grows between scheduled runs. Every run should return only the
+tweets added since the previous run, newest first and without duplicates, and
+stop paging as soon as it reaches already-seen IDs. A run cut short by
+--max-pages must leave a gap cursor that the next run fills in. The reported
+bytes must equal the response bodies actually sent, and a run with a different
+page size must continue from the same state. The requests and bytes each run
+saved, compared with re-downloading --max-items tweets, are printed.
+
+Exits non-zero if any check fails.
+
+Usage: python scripts/benchmarks/check_incremental_tweets.py [--max-items 300] [--page-size 100]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+from aiohttp import web
+from stub_server import StubServer
+
+from external_api.data_sources.client import config
+from external_api.data_sources.transport import HttpTransport
+from external_api.data_sources.twitter_source import TwitterSource
+
+
+async def main(max_items: int, page_size: int) -> int:
+    failures = []
+    timeline = {"size": 0}
+    sent = {"bytes": 0}
+
+    async def page(request: web.Request) -> web.Response:
+        # 从新到旧分页，continuation_token 为已跳过的条数
+        offset = int(request.query.get("continuation_token") or 0)
+        limit = int(request.query["limit"])
+        ids = range(timeline["size"] - offset, max(0, timeline["size"] - offset - limit), -1)
+        results = [{"tweet_id": i, "text": f"tweet {i}", "user": {}} for i in ids]
+        token = str(offset + limit) if offset + limit < timeline["size"] else None
+        body = json.dumps({"results": results, "continuation_token": token}).encode()
+        sent["bytes"] += len(body)
+        return web.Response(body=body, content_type="application/json")
+
+    server = StubServer()
+    server.add_route("GET", "/search/search", page)
+    server.add_route("GET", "/user/tweets", page)
+    async with server:
+        transport = HttpTransport()
+        source = TwitterSource(dict(config, incremental_state_path=os.path.join(tempfile.mkdtemp(), "state.sqlite3")))
+        source.proxy_url = server.base_url
+        source.bind_transport(transport)
+
+        collected = []
+        # (新增推文数, max_pages, 期望新推文数)
+        runs = [(250, 10, 250), (5, 10, 5), (0, 10, 0), (250, 1, page_size), (0, 10, 250 - page_size)]
+        for run, (added, max_pages, expected_new) in enumerate(runs, 1):
+            timeline["size"] += added
+            before, sent["bytes"] = server.hits["/search/search"], 0
+            result = await source.search_new_tweets("tesla", max_items=max_items, page_size=page_size, max_pages=max_pages)
+            stats = result["data"]["stats"]
+            ids = [int(tweet["id"]) for tweet in result["data"]["tweets"]]
+            collected.extend(ids)
+            print(
+                f"run {run}: +{added} upstream, {result['data']['count']} new, {stats['requests']} requests "
+                f"({stats['bytes']} bytes), saved {stats['requests_saved']} requests / {stats['bytes_saved']} bytes, "
+                f"complete={stats['complete']}"
+            )
+            if len(ids) != expected_new:
+                failures.append(f"run {run}: expected {expected_new} new tweets, got {len(ids)}")
+            if server.hits["/search/search"] - before != stats["requests"]:
+                failures.append(f"run {run}: request count mismatch")
+            if stats["bytes"] != sent["bytes"]:
+                failures.append(f"run {run}: reported {stats['bytes']} bytes, the server sent {sent['bytes']}")
+        if sorted(collected) != list(range(1, timeline["size"] + 1)):
+            failures.append("tweets were missed or collected twice across runs")
+
+        timeline["size"] += 3
+        resized = await source.search_new_tweets("tesla", max_items=max_items, page_size=max(1, page_size // 2))
+        if resized["data"]["count"] != 3 or resized["data"]["stats"]["requests"] != 1:
+            failures.append(f"a different page_size started from fresh state: {resized['data']['count']} new tweets")
+
+        timeline["size"] = 120
+        first = await source.get_new_user_tweets("elonmusk", max_items=max_items, page_size=page_size)
+        timeline["size"] = 130
+        second = await source.get_new_user_tweets("elonmusk", max_items=max_items, page_size=page_size)
+        print(f"user timeline: {first['data']['count']} then {second['data']['count']} new tweets")
+        if first["data"]["count"] != 120 or [t["id"] for t in second["data"]["tweets"]] != [str(i) for i in range(130, 120, -1)]:
+            failures.append("user timeline was not collected incrementally")
+
+        print(f"state: {source.state_store.keys()}")
+        await transport.close()
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--max-items", type=int, default=300)
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.max_items, args.page_size)))
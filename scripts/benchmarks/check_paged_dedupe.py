@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Check cross-page deduplication of search_patents / search_scholar
+
+The fake serper endpoint returns overlapping pages: every page repeats the
+last --overlap results of the previous page. search_patents (keyed on
+publicationNumber) and search_scholar (results without links, keyed on a
+title hash) must return num_results unique results in rank order, fetching
+extra pages only as needed to replace the dropped duplicates.
+
+Exits non-zero if any check fails.
+
+Usage: python scripts/benchmarks/check_paged_dedupe.py [--num-results 120] [--overlap 5]
+"""
+
+import argparse
+import asyncio
+import sys
+
+from aiohttp import web
+from stub_server import StubServer
+
+from external_api.data_sources.client import config
+from external_api.data_sources.patents_source import PatentSource
+from external_api.data_sources.scholar_source import ScholarSource
+from external_api.data_sources.transport import HttpTransport
+
+
+async def main(num_results: int, overlap: int) -> int:
+    failures = []
+
+    def overlapping(request_body: dict, make_item) -> web.Response:
+        page, num = request_body["page"], request_body["num"]
+        start = max(0, (page - 1) * num - overlap)
+        return web.json_response({"organic": [make_item(rank) for rank in range(start, start + num)]})
+
+    async def patents(request: web.Request) -> web.Response:
+        return overlapping(await request.json(), lambda rank: {"title": "Same title", "publicationNumber": f"US{rank}"})
+
+    async def scholar(request: web.Request) -> web.Response:
+        return overlapping(await request.json(), lambda rank: {"title": f"Paper  {rank}", "link": None})
+
+    server = StubServer()
+    server.add_route("POST", "/patents", patents)
+    server.add_route("POST", "/scholar", scholar)
+    async with server:
+        transport = HttpTransport()
+        for source_cls, method, route, key in (
+            (PatentSource, "search_patents", "/patents", "publicationNumber"),
+            (ScholarSource, "search_scholar", "/scholar", "title"),
+        ):
+            source = source_cls(config)
+            source.proxy_url = server.base_url
+            source.bind_transport(transport)
+            result = await getattr(source, method)("machine learning", num_results=num_results)
+            items = next(iter(result["data"].values()))
+            keys = [item[key] for item in items]
+            expected = [f"US{rank}" if key == "publicationNumber" else f"Paper  {rank}" for rank in range(num_results)]
+            print(f"{method}: {len(items)} results, {len(set(keys))} unique, {server.hits[route]} page requests")
+            if keys != expected:
+                failures.append(f"{method} returned duplicates, gaps or out-of-order results")
+
+        await transport.close()
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num-results", type=int, default=120)
+    parser.add_argument("--overlap", type=int, default=5)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.num_results, args.overlap)))
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Check retry/backoff and circuit breaking of HttpTransport against a local fake proxy
+
+- a host that fails twice with 503 before answering is retried transparently
+- a 429 with Retry-After is retried after the advertised delay
+- non-idempotent POSTs are not retried
+- a host that keeps returning 502 (after --latency seconds) trips the breaker,
+  after which calls fail immediately instead of waiting on the upstream
+- a half-open probe that gets an unparsable body reopens the breaker, and a
+  probe that is cancelled frees the probe slot for the next call
+- a request whose timeout is used up waiting for a rate-limit token fails with
+  asyncio.TimeoutError instead of being sent without a timeout to a host that hangs
+
+Exits non-zero if any check fails.
+
+Usage: python scripts/benchmarks/check_resilience.py [--latency 0.2] [--calls 20]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+import aiohttp
+from aiohttp import web
+from stub_server import StubServer
+
+from external_api.data_sources.rate_limit import RateLimiter
+from external_api.data_sources.resilience import CircuitBreaker, CircuitOpenError, RetryPolicy
+from external_api.data_sources.transport import HttpTransport
+
+
+class ExhaustingRateLimiter(RateLimiter):
+    """令牌总是在 max_wait 用完时才到"""
+
+    async def acquire(self, host: str, max_wait=None) -> float:
+        await asyncio.sleep(max_wait or 0.0)
+        return max_wait or 0.0
+
+
+async def main(latency: float, calls: int) -> int:
+    failures = []
+    counts = {"flaky": 0, "throttled": 0}
+
+    async def flaky(request: web.Request) -> web.Response:
+        counts["flaky"] += 1
+        if counts["flaky"] % 3:
+            return web.json_response({"message": "unavailable"}, status=503)
+        return web.json_response({"status": True})
+
+    async def throttled(request: web.Request) -> web.Response:
+        counts["throttled"] += 1
+        if counts["throttled"] == 1:
+            return web.json_response({}, status=429, headers={"Retry-After": "0.3"})
+        return web.json_response({"status": True})
+
+    async def down(request: web.Request) -> web.Response:
+        await asyncio.sleep(latency)
+        return web.json_response({}, status=502)
+
+    async def garbage(request: web.Request) -> web.Response:
+        return web.Response(text="{not json", content_type="application/json")
+
+    async def hang(request: web.Request) -> web.Response:
+        await asyncio.sleep(latency * 10)
+        return web.json_response({"status": True})
+
+    async def ok(request: web.Request) -> web.Response:
+        return web.json_response({"status": True})
+
+    server = StubServer()
+    server.add_route("GET", "/flaky", flaky)
+    server.add_route("POST", "/flaky", flaky)
+    server.add_route("GET", "/throttled", throttled)
+    server.add_route("GET", "/down", down)
+    server.add_route("GET", "/garbage", garbage)
+    server.add_route("GET", "/ok", ok)
+    server.add_route("GET", "/hang", hang)
+    async with server:
+        transport = HttpTransport(
+            retry_policy=RetryPolicy(base_delay=0.01), circuit_breaker=CircuitBreaker(failure_threshold=5, reset_timeout=30)
+        )
+
+        result = await transport.request_json("GET", f"{server.base_url}/flaky", headers={"X-Original-Host": "flaky"}, timeout=5)
+        print(f"flaky GET: {result} after {server.hits['/flaky']} requests")
+        if server.hits["/flaky"] != 3:
+            failures.append(f"expected 3 requests for the flaky host, got {server.hits['/flaky']}")
+
+        start = time.perf_counter()
+        await transport.request_json("GET", f"{server.base_url}/throttled", timeout=5)
+        waited = time.perf_counter() - start
+        print(f"429 with Retry-After: 0.3 answered after {waited:.2f}s")
+        if waited < 0.3:
+            failures.append("Retry-After was not honoured")
+
+        before = server.hits["/flaky"]
+        try:
+            await transport.request_json("POST", f"{server.base_url}/flaky", timeout=5)
+        except Exception:
+            pass
+        if server.hits["/flaky"] - before != 1:
+            failures.append("POST was retried")
+
+        elapsed = []
+        rejected = 0
+        for _ in range(calls):
+            start = time.perf_counter()
+            try:
+                await transport.request_json("GET", f"{server.base_url}/down", headers={"X-Original-Host": "down"}, timeout=60)
+            except CircuitOpenError:
+                rejected += 1
+            except Exception:
+                pass
+            elapsed.append(time.perf_counter() - start)
+        print(
+            f"down host: {server.hits['/down']} upstream requests for {calls} calls, {rejected} rejected by the breaker, "
+            f"first call {elapsed[0]:.2f}s, last call {elapsed[-1] * 1000:.2f}ms"
+        )
+        print(f"breaker: {transport.circuit_breaker.stats()['down']}")
+        if server.hits["/down"] > 5 or elapsed[-1] > latency / 2:
+            failures.append("breaker did not fail fast")
+
+        await transport.close()
+
+        # 熔断后等 reset_timeout 进入 half_open，只放行一个探测请求
+        probing = HttpTransport(circuit_breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0.3))
+        probe = {"X-Original-Host": "probe"}
+        try:
+            await probing.request_json("GET", f"{server.base_url}/down", headers=probe, timeout=5, idempotent=False)
+        except aiohttp.ClientResponseError:
+            pass
+
+        await asyncio.sleep(0.35)
+        try:
+            await probing.request_json("GET", f"{server.base_url}/garbage", headers=probe, timeout=5)
+        except ValueError:
+            pass
+        if probing.circuit_breaker.stats()["probe"]["state"] != "open":
+            failures.append("a probe with an unparsable body left the breaker half-open")
+
+        await asyncio.sleep(0.35)
+        try:
+            await asyncio.wait_for(probing.request_json("GET", f"{server.base_url}/down", headers=probe, timeout=5), latency / 4)
+        except asyncio.TimeoutError:
+            pass
+        try:
+            await probing.request_json("GET", f"{server.base_url}/ok", headers=probe, timeout=5)
+        except CircuitOpenError:
+            failures.append("a cancelled probe kept the probe slot until reset_timeout")
+        print(f"probe host after a bad body and a cancelled probe: {probing.circuit_breaker.stats()['probe']}")
+        await probing.close()
+
+        limited = HttpTransport(rate_limiter=ExhaustingRateLimiter())
+        start = time.perf_counter()
+        try:
+            await limited.request_json("GET", f"{server.base_url}/hang", timeout=latency, idempotent=False)
+            failures.append("a request with no time left was sent anyway")
+        except asyncio.TimeoutError:
+            pass
+        waited = time.perf_counter() - start
+        print(f"timeout of {latency}s used up by the rate limiter: failed after {waited:.2f}s, {server.hits['/hang']} requests sent")
+        if waited > latency * 5 or server.hits["/hang"]:
+            failures.append("a request whose timeout was used up by the rate limiter was sent without a timeout")
+        await limited.close()
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--calls", type=int, default=20)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.latency, args.calls)))
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Check the persistent name -> ID resolution index
+
+Booking destinations and Tripadvisor locations are resolved against fake
+endpoints. The checks: normalised spellings ("São Paulo," / "sao paulo") hit
+the index, near-miss city names ("Hangzhou" / "Changzhou") and misspellings
+are resolved on their own while fuzzy matching is off (the default), close
+misspellings hit an index with fuzzy=True but names differing only in digits
+do not, a seed file answers known places with no request at all, resolutions
+survive a new ResolutionIndex on the same file, and expired entries are
+resolved again.
+
+Exits non-zero if any check fails.
+
+Usage: python scripts/benchmarks/check_resolution_index.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+from aiohttp import web
+from stub_server import StubServer
+
+from external_api.data_sources.booking_source import RESOLUTION_NAMESPACE, BookingSource
+from external_api.data_sources.client import config
+from external_api.data_sources.resolution_index import ResolutionIndex
+from external_api.data_sources.transport import HttpTransport
+from external_api.data_sources.tripadvisor_source import TripAdvisorSource
+
+
+async def main() -> int:
+    failures = []
+
+    async def destinations(request: web.Request) -> web.Response:
+        name = request.query["query"]
+        dest = {"dest_id": f"-{len(name)}", "search_type": "city", "name": name, "city_name": name}
+        dest.update(label=name, longitude=0.0, latitude=0.0, country="Nowhere")
+        return web.json_response({"status": True, "data": [dest]})
+
+    async def locations(request: web.Request) -> web.Response:
+        name = request.query["searchQuery"]
+        return web.json_response({"data": [{"location_id": str(len(name)), "name": name, "address_obj": {}}]})
+
+    server = StubServer()
+    server.add_route("GET", "/api/v1/hotels/searchDestination", destinations)
+    server.add_route("GET", "/api/v1/location/search", locations)
+    async with server:
+        transport = HttpTransport()
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, "resolutions.sqlite3")
+
+        booking = BookingSource(config, server.base_url)
+        booking.bind_transport(transport)
+        booking.bind_resolution_index(ResolutionIndex(path))
+        for name in ("São Paulo", "sao paulo,", "SAO  PAULO", "Shanghai", "shangai"):
+            await booking._resolve_destination(name)
+        lookups = server.hits["/api/v1/hotels/searchDestination"]
+        print(f"booking: 5 names, {lookups} destination lookups, {booking.resolution_index.stats()}")
+        if lookups != 3:
+            failures.append(f"expected 3 destination lookups (sao paulo, shanghai, shangai), got {lookups}")
+        hangzhou = await booking._resolve_destination("Hangzhou")
+        changzhou = await booking._resolve_destination("Changzhou")
+        if server.hits["/api/v1/hotels/searchDestination"] != lookups + 2 or changzhou["data"]["name"] != "Changzhou":
+            failures.append(f"Changzhou resolved to {changzhou['data']['name']} ({hangzhou['data']['name']} was already indexed)")
+
+        fuzzy = ResolutionIndex(os.path.join(directory, "fuzzy.sqlite3"), fuzzy=True)
+        booking.bind_resolution_index(fuzzy)
+        before = server.hits["/api/v1/hotels/searchDestination"]
+        for name in ("Shanghai", "shangai", "city1", "city12"):
+            await booking._resolve_destination(name)
+        lookups = server.hits["/api/v1/hotels/searchDestination"] - before
+        if lookups != 3 or fuzzy.stats()["fuzzy_hits"] != 1:
+            failures.append(f"expected 3 destination lookups with fuzzy=True (shanghai, city1, city12), got {lookups}")
+        if fuzzy.get(RESOLUTION_NAMESPACE, "shangai", fuzzy=False) is not None:
+            failures.append("get(fuzzy=False) returned a fuzzy match")
+
+        reopened = ResolutionIndex(path)
+        if (reopened.get(RESOLUTION_NAMESPACE, "São Paulo") or {}).get("dest_id") != "-9":
+            failures.append("resolutions did not persist across index instances")
+
+        seed_path = os.path.join(directory, "seed.json")
+        with open(seed_path, "w", encoding="utf-8") as f:
+            seed = {
+                RESOLUTION_NAMESPACE: {"Lisbon": {"name": "Lisbon", "dest_id": "-2167973", "search_type": "city"}},
+                "tripadvisor.location:en:hotels": {"Hotel Xcaret Mexico": {"location_id": "13189438", "name": "Hotel Xcaret Mexico"}},
+            }
+            json.dump(seed, f)
+        seeded = ResolutionIndex(os.path.join(directory, "seeded.sqlite3"), seed_path=seed_path)
+        booking.bind_resolution_index(seeded)
+        before = server.hits["/api/v1/hotels/searchDestination"]
+        lisbon = await booking._resolve_destination("lisbon")
+        if server.hits["/api/v1/hotels/searchDestination"] != before or lisbon["data"]["dest_id"] != "-2167973":
+            failures.append("seeded booking destination was resolved over the network")
+
+        tripadvisor = TripAdvisorSource(config, server.base_url)
+        tripadvisor.bind_transport(transport)
+        tripadvisor.bind_resolution_index(seeded)
+        xcaret = await tripadvisor.resolve_location("hotel xcaret, mexico", category="hotels")
+        if server.hits["/api/v1/location/search"] or xcaret["data"]["location_id"] != "13189438":
+            failures.append("seeded tripadvisor location was resolved over the network")
+        first = await tripadvisor.resolve_location("Eiffel Tower")
+        second = await tripadvisor.resolve_location("eiffel tower!")
+        print(f"tripadvisor: {server.hits['/api/v1/location/search']} location lookups for 3 resolutions")
+        if server.hits["/api/v1/location/search"] != 1 or first != second:
+            failures.append("tripadvisor location was not remembered after the first lookup")
+
+        expiring = ResolutionIndex(os.path.join(directory, "expiring.sqlite3"), ttl=0.05)
+        expiring.set(RESOLUTION_NAMESPACE, "Oslo", {"dest_id": "-1"})
+        time.sleep(0.1)
+        if expiring.get(RESOLUTION_NAMESPACE, "Oslo") is not None or len(expiring):
+            failures.append("expired resolution was returned")
+
+        await transport.close()
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Behaviour check for the TTL response cache (data_sources.cache)
+
+Exercises ResponseCache and the @cached decorator against both backends:
+
+- hit / miss / coalesced counters and failed results not being cached
+- TTL expiry and per-method ttl_overrides (0 disables caching)
+- LRU eviction by max_entries
+- SQLite entries surviving a new backend instance on the same file
+- caching being off unless cache_backend (EXTERNAL_API_CACHE_BACKEND) enables it
+- --callers concurrent calls sharing one upstream call, each getting its own
+  copy of the result, and cache hits being isolated from caller mutations
+
+Exits non-zero if any check fails.
+
+Usage: python scripts/benchmarks/check_response_cache.py [--callers 10]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+from typing import Any, Dict, List
+
+import stub_server  # noqa: F401
+
+from external_api.data_sources.cache import MISSING, MemoryCacheBackend, ResponseCache, SqliteCacheBackend, cached
+from external_api.data_sources.client import config
+
+
+class Upstream:
+    """计数的假上游调用"""
+
+    def __init__(self, delay: float = 0.0):
+        self.calls = 0
+        self.delay = delay
+
+    async def __call__(self, value: Any = "ok", success: bool = True) -> Dict[str, Any]:
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return {"success": success, "data": {"value": value, "items": [1, 2, 3]}}
+
+
+class FakeSource:
+    source_name = "fake"
+
+    def __init__(self, cache: Any):
+        self.cache = cache
+        self.upstream = Upstream()
+
+    @cached(ttl=60)
+    async def lookup(self, name: str, limit: int = 10) -> Dict[str, Any]:
+        return await self.upstream(f"{name}:{limit}")
+
+
+async def check_backend(label: str, backend_factory, callers: int) -> List[str]:
+    failures = []
+    cache = ResponseCache(backend_factory(max_entries=2), ttl_overrides={"fake.disabled": 0})
+    upstream = Upstream()
+
+    first = await cache.get_or_call("fake.get", "a", 60, lambda: upstream("a"))
+    second = await cache.get_or_call("fake.get", "a", 60, lambda: upstream("a"))
+    if upstream.calls != 1 or first != second:
+        failures.append(f"{label}: second call with the same key was not served from cache")
+    second["data"]["items"].append(4)
+    third = await cache.get_or_call("fake.get", "a", 60, lambda: upstream("a"))
+    if third["data"]["items"] != [1, 2, 3]:
+        failures.append(f"{label}: mutating a cache hit changed the cached value")
+    stats = cache.stats()
+    if (stats["hits"], stats["misses"], stats["methods"]["fake.get"]["hits"]) != (2, 1, 2):
+        failures.append(f"{label}: unexpected hit/miss counters {stats}")
+
+    await cache.get_or_call("fake.fail", "failed", 60, lambda: upstream("x", success=False))
+    await cache.get_or_call("fake.fail", "failed", 60, lambda: upstream("x", success=False))
+    if cache.stats()["methods"]["fake.fail"]["misses"] != 2:
+        failures.append(f"{label}: a failed result was cached")
+
+    before = upstream.calls
+    for _ in range(3):
+        await cache.get_or_call("fake.disabled", "disabled", 60, lambda: upstream("d"))
+    if upstream.calls - before != 3 or "fake.disabled" in cache.stats()["methods"]:
+        failures.append(f"{label}: ttl_overrides=0 did not disable caching")
+
+    await cache.get_or_call("fake.short", "short", 0.2, lambda: upstream("s"))
+    await asyncio.sleep(0.3)
+    before = upstream.calls
+    await cache.get_or_call("fake.short", "short", 0.2, lambda: upstream("s"))
+    if upstream.calls != before + 1:
+        failures.append(f"{label}: entry was served after its TTL expired")
+
+    # max_entries=2: 读取 "b" 之后写入 "c"，最久未访问的 "a" 被淘汰
+    cache.clear()
+    for key in ("a", "b"):
+        await cache.get_or_call("fake.lru", key, 60, lambda: upstream(key))
+        await asyncio.sleep(0.01)
+    await cache.get_or_call("fake.lru", "b", 60, lambda: upstream("b"))
+    await asyncio.sleep(0.01)
+    await cache.get_or_call("fake.lru", "c", 60, lambda: upstream("c"))
+    if len(cache.backend) != 2 or cache.backend.get("a") is not MISSING or cache.backend.get("b") is MISSING:
+        failures.append(f"{label}: LRU eviction did not drop the least recently used entry")
+
+    slow = Upstream(delay=0.05)
+    results = await asyncio.gather(*[cache.get_or_call("fake.burst", "burst", 60, lambda: slow("burst")) for _ in range(callers)])
+    if slow.calls != 1 or cache.stats()["methods"]["fake.burst"]["coalesced"] != callers - 1:
+        failures.append(f"{label}: {callers} concurrent callers made {slow.calls} upstream calls")
+    if len({id(result) for result in results}) != callers or len({id(result["data"]["items"]) for result in results}) != callers:
+        failures.append(f"{label}: concurrent callers share the same result object")
+    results[0]["data"]["items"].clear()
+    if any(result["data"]["items"] != [1, 2, 3] for result in results[1:]):
+        failures.append(f"{label}: mutating one coalesced result changed the others")
+
+    async def mutate_at_once() -> Dict[str, Any]:
+        # 发起调用的一方拿到结果后立即修改，此时等待者还没有恢复执行
+        result = await cache.get_or_call("fake.burst", "mutated", 60, lambda: slow("mutated"))
+        result["data"]["items"].clear()
+        return result
+
+    waiters = [cache.get_or_call("fake.burst", "mutated", 60, lambda: slow("mutated")) for _ in range(callers - 1)]
+    leader, *shared = await asyncio.gather(mutate_at_once(), *waiters)
+    if leader["data"]["items"] or any(result["data"]["items"] != [1, 2, 3] for result in shared):
+        failures.append(f"{label}: the first caller mutating its result changed what coalesced callers received")
+
+    source = FakeSource(cache)
+    await source.lookup("x")
+    await source.lookup("x", limit=10)
+    await source.lookup(name="x")
+    await source.lookup("x", limit=20)
+    if source.upstream.calls != 2:
+        failures.append(f"{label}: @cached did not normalise call arguments ({source.upstream.calls} upstream calls)")
+    uncached = FakeSource(None)
+    await uncached.lookup("x")
+    await uncached.lookup("x")
+    if uncached.upstream.calls != 2:
+        failures.append(f"{label}: @cached without a bound cache did not call through")
+    return failures
+
+
+async def main(callers: int) -> int:
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "responses.sqlite3")
+    failures = await check_backend("memory", MemoryCacheBackend, callers)
+    failures += await check_backend("sqlite", lambda max_entries: SqliteCacheBackend(os.path.join(directory, "check.sqlite3"), max_entries), callers)
+
+    upstream = Upstream()
+    await ResponseCache(SqliteCacheBackend(path)).get_or_call("fake.get", "persisted", 60, lambda: upstream("p"))
+    reopened = ResponseCache(SqliteCacheBackend(path))
+    value = await reopened.get_or_call("fake.get", "persisted", 60, lambda: upstream("p"))
+    if upstream.calls != 1 or value["data"]["value"] != "p" or reopened.stats()["hits"] != 1:
+        failures.append("sqlite: entry did not survive a new backend instance on the same file")
+
+    if ResponseCache.from_config({}) is not None:
+        failures.append("a config without cache_backend enabled caching")
+    if "EXTERNAL_API_CACHE_BACKEND" not in os.environ and ResponseCache.from_config(config) is not None:
+        failures.append("the default client config enabled caching")
+    if not isinstance(ResponseCache.from_config({"cache_backend": "memory"}), ResponseCache):
+        failures.append("cache_backend=memory did not enable caching")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("response cache checks passed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--callers", type=int, default=10)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.callers)))
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Check that per-event-loop session pools do not keep sessions of finished loops
+
+Each of --runs asyncio.run() calls makes a FunctionProxy call through a shared
+ProxySessionPool and a request through a shared HttpTransport, and returns
+without closing either, as scripts calling asyncio.run() repeatedly do. The
+checks: each pool holds at most the session of the last loop, sessions of
+finished loops are closed together with their connectors (no "Unclosed client
+session" at exit), and the exit hook closes the last one.
+
+Exits non-zero if any check fails.
+
+Usage: python scripts/benchmarks/check_session_pools.py [--runs 5]
+"""
+
+import argparse
+import asyncio
+import sys
+from typing import List
+
+import aiohttp
+from stub_server import StubServer
+
+from external_api import function_utils
+from external_api.data_sources import transport as transport_module
+from external_api.data_sources.transport import HttpTransport
+from external_api.function_utils import FunctionProxy, ProxySessionPool
+
+
+def check_sessions(label: str, sessions: List[aiohttp.ClientSession], held: int, failures: List[str]) -> None:
+    open_sessions = [session for session in sessions if not session.closed]
+    print(f"{label}: {len(sessions)} sessions created, {held} held by the pool, {len(open_sessions)} still open")
+    if held > 1:
+        failures.append(f"{label}: the pool holds {held} sessions of finished event loops")
+    if open_sessions[:-1]:
+        failures.append(f"{label}: {len(open_sessions) - 1} sessions of finished event loops were left open")
+
+
+def main(runs: int) -> int:
+    failures: List[str] = []
+    pool = ProxySessionPool()
+    transport = HttpTransport()
+    sessions: List[aiohttp.ClientSession] = []
+    transport_sessions: List[aiohttp.ClientSession] = []
+
+    async def call() -> None:
+        server = StubServer()
+        server.add_json_route("GET", "/ok", {"status": True})
+        async with server:
+            proxy = FunctionProxy({"name": "echo", "parameters": [{"name": "text"}]}, session_pool=pool)
+            proxy.server_port = server.port
+            result = await proxy("hi")
+            if result.is_error:
+                failures.append(f"proxy call failed: {result.message}")
+            sessions.append(pool.get_session())
+            await transport.request_json("GET", f"{server.base_url}/ok", timeout=5)
+            transport_sessions.append(transport.get_session())
+
+    for _ in range(runs):
+        asyncio.run(call())
+    check_sessions("ProxySessionPool", sessions, len(pool._sessions), failures)
+    check_sessions("HttpTransport", transport_sessions, len(transport._sessions), failures)
+
+    function_utils._discard_closed_sessions()
+    transport_module._discard_closed_sessions()
+    for label, owner, created in (("ProxySessionPool", pool, sessions), ("HttpTransport", transport, transport_sessions)):
+        connectors_open = [session for session in created if session.connector is not None and not session.connector.closed]
+        if owner._sessions or any(not session.closed for session in created) or connectors_open:
+            failures.append(f"{label}: the exit hook did not close the session of the last event loop")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    sys.exit(main(args.runs))
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Concurrency check for single-flight request coalescing against a local fake proxy
+
+Runs N concurrent search_hotels_by_dest_name("shanghai", ...) calls with the
+response cache disabled and destination resolutions expiring immediately, and
+asserts that the destination lookup reaches the proxy exactly once per burst
+while every caller still succeeds.
+Exits non-zero if the request counts are off.
+
+Usage: python scripts/benchmarks/check_single_flight.py [--callers 20] [--latency 0.05]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from stub_server import StubServer
+
+from external_api.data_sources.booking_source import BookingSource
+from external_api.data_sources.client import config
+from external_api.data_sources.resolution_index import ResolutionIndex
+
+DESTINATION_PATH = "/api/v1/hotels/searchDestination"
+HOTELS_PATH = "/api/v1/hotels/searchHotels"
+
+DESTINATIONS = {
+    "status": True,
+    "data": [
+        {
+            "dest_id": "-1924465",
+            "search_type": "city",
+            "name": "Shanghai",
+            "city_name": "Shanghai",
+            "label": "Shanghai, Shanghai Area, China",
+            "longitude": 121.4763,
+            "latitude": 31.229422,
+            "country": "China",
+        }
+    ],
+}
+
+HOTELS = {
+    "status": True,
+    "data": {
+        "hotels": [
+            {
+                "hotel_id": 1,
+                "property": {
+                    "name": "Hotel",
+                    "latitude": 31.2,
+                    "longitude": 121.4,
+                    "priceBreakdown": {"grossPrice": {"currency": "CNY", "value": 700.0}},
+                },
+            }
+        ]
+    },
+}
+
+
+async def main(callers: int, latency: float) -> int:
+    server = StubServer(delay=latency)
+    server.add_json_route("GET", DESTINATION_PATH, DESTINATIONS)
+    server.add_json_route("GET", HOTELS_PATH, HOTELS)
+    failures = []
+    async with server:
+        source = BookingSource(config, proxy_url=server.base_url)
+        source.bind_cache(None)
+        # 解析结果立即过期，每一轮都要请求目的地接口
+        source.bind_resolution_index(ResolutionIndex(os.path.join(tempfile.mkdtemp(), "resolutions.sqlite3"), ttl=0))
+
+        for burst in (1, 2):
+            start = time.perf_counter()
+            results = await asyncio.gather(
+                *[source.search_hotels_by_dest_name("shanghai", "2025-04-19", "2025-04-26") for _ in range(callers)]
+            )
+            elapsed = time.perf_counter() - start
+
+            ok = sum(1 for result in results if result["success"])
+            print(
+                f"burst={burst} callers={callers} ok={ok} {DESTINATION_PATH}={server.hits[DESTINATION_PATH]} "
+                f"{HOTELS_PATH}={server.hits[HOTELS_PATH]} elapsed={elapsed:.3f}s"
+            )
+            if ok != callers:
+                failures.append(f"burst {burst}: only {ok}/{callers} calls succeeded")
+            # Without a TTL cache every burst goes upstream again, but only once
+            if server.hits[DESTINATION_PATH] != burst:
+                failures.append(f"burst {burst}: expected {burst} destination requests, got {server.hits[DESTINATION_PATH]}")
+
+        await source.transport.close()
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--callers", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.callers, args.latency)))
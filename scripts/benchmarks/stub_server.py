@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Local stub HTTP server used by the benchmarks
+
+Serves a fake function server (/execute, /execute_stream, and /execute_batch
+unless disabled) and arbitrary JSON routes that mimic the external-api proxy,
+counting hits per path so benchmarks can assert how many upstream requests
+were actually made.
+"""
+
+import asyncio
+import json
+import os
+import sys
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+
+from aiohttp import web
+
+# Allow running benchmarks directly from a checkout
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+Handler = Callable[[web.Request], Awaitable[web.StreamResponse]]
+Payload = Union[Any, Callable[[web.Request], Any]]
+
+
+class StubServer:
+    """Minimal aiohttp server bound to a random localhost port"""
+
+    def __init__(self, delay: float = 0.0, batch: bool = True):
+        self.delay = delay
+        self.hits: Counter = Counter()
+        self.connections = 0
+        self.app = web.Application()
+        self._runner: Optional[web.AppRunner] = None
+        self.port = 0
+        self.add_json_route("POST", "/execute", self._execute)
+        self.add_route("POST", "/execute_stream", self._execute_stream)
+        if batch:
+            self.add_json_route("POST", "/execute_batch", self._execute_batch)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def add_route(self, method: str, path: str, handler: Handler) -> None:
+        async def counted(request: web.Request) -> web.StreamResponse:
+            self.hits[path] += 1
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            return await handler(request)
+
+        self.app.router.add_route(method, path, counted)
+
+    def add_json_route(self, method: str, path: str, payload: Payload) -> None:
+        """Register a route returning a fixed payload or the result of a (sync or async) callable"""
+
+        async def handler(request: web.Request) -> web.StreamResponse:
+            body = payload(request) if callable(payload) else payload
+            if asyncio.iscoroutine(body):
+                body = await body
+            if isinstance(body, web.StreamResponse):
+                return body
+            return web.Response(text=json.dumps(body), content_type="application/json")
+
+        self.add_route(method, path, handler)
+
+    @staticmethod
+    def _execute_one(data: Dict[str, Any]) -> Dict[str, Any]:
+        # Functions named "fail" report an error so per-item errors can be exercised
+        if data["function_name"] == "fail":
+            return {"request_id": data["request_id"], "is_error": True, "message": "fail requested"}
+        # "payload_bytes" pads the message so benchmarks can request large results
+        padding = "x" * int(data["parameters"].get("payload_bytes", 0))
+        return {"request_id": data["request_id"], "is_error": False, "message": f"{data['function_name']} ok{padding}"}
+
+    async def _execute(self, request: web.Request) -> Dict[str, Any]:
+        return self._execute_one(await request.json())
+
+    async def _execute_stream(self, request: web.Request) -> web.StreamResponse:
+        """NDJSON stream of "chunks" output events of "chunk_bytes" each, then the result event"""
+        data = await request.json()
+        parameters = data["parameters"]
+        chunks = int(parameters.get("chunks", 3))
+        chunk = "x" * int(parameters.get("chunk_bytes", 16))
+        interval = float(parameters.get("interval", 0))
+
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await response.prepare(request)
+        await response.write(json.dumps({"type": "progress", "message": "started", "data": {"total": chunks}}).encode() + b"\n")
+        for i in range(chunks):
+            if interval:
+                await asyncio.sleep(interval)
+            await response.write(json.dumps({"type": "output", "message": chunk, "data": {"index": i}}).encode() + b"\n")
+        result = self._execute_one({**data, "parameters": {}})
+        await response.write(json.dumps({"type": "result", **result}).encode() + b"\n")
+        await response.write_eof()
+        return response
+
+    async def _execute_batch(self, request: web.Request) -> Dict[str, Any]:
+        data = await request.json()
+        return {"results": [self._execute_one(item) for item in data["requests"]]}
+
+    async def start(self) -> str:
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+        return self.base_url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "StubServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+
+if __name__ == "__main__":
+    # Standalone mode, so memory benchmarks can keep server allocations out of the measured process
+    async def serve() -> None:
+        async with StubServer(delay=float(sys.argv[1]) if len(sys.argv) > 1 else 0.0) as server:
+            print(server.port, flush=True)
+            await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass